@@ -0,0 +1,122 @@
+"""
+Compares preview decoder backends (ffmpeg subprocess vs in-process PyAV) on a
+synthetic corpus of short clips and sound effects.
+
+    python benchmarks/decoder_benchmark.py [--videos 40] [--sounds 80] [--workers 4]
+
+Reports per-file latency (median / p95) and throughput for each backend,
+single-process and on a process pool like the thumbnail farm uses.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ffmpeg
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.core.decoders import available_decoders  # noqa: E402
+from src.core.preview_generator import PreviewGenerator, init_worker, render_preview_job  # noqa: E402
+
+
+def make_corpus(folder, videos, sounds):
+    """Short overlay-like clips (1-3 s) and SFX (0.3-2 s) in the formats a library usually holds."""
+    files = []
+    for i in range(videos):
+        path = os.path.join(folder, f"clip_{i:03d}.mp4")
+        duration = 1 + (i % 3)
+        (
+            ffmpeg
+            .input(f"testsrc2=size=1280x720:rate=25:duration={duration}", f="lavfi")
+            .output(path, vcodec="libx264", pix_fmt="yuv420p", g=25, loglevel="error")
+            .overwrite_output()
+            .run()
+        )
+        files.append((path, "video"))
+    for i in range(sounds):
+        ext = (".wav", ".mp3", ".m4a")[i % 3]
+        path = os.path.join(folder, f"sfx_{i:03d}{ext}")
+        duration = 0.3 + (i % 6) * 0.35
+        (
+            ffmpeg
+            .input(f"sine=frequency={200 + i * 10}:duration={duration:.2f}", f="lavfi")
+            .output(path, ac=2, loglevel="error")
+            .overwrite_output()
+            .run()
+        )
+        files.append((path, "audio"))
+    return files
+
+
+def run_serial(files, backend, cache_dir):
+    generator = PreviewGenerator(cache_dir, decoder=backend)
+    latencies = []
+    start = time.perf_counter()
+    for path, file_type in files:
+        t = time.perf_counter()
+        if generator.generate_preview(path, file_type, force=True) is None:
+            print(f"  {backend}: no preview for {os.path.basename(path)}")
+        latencies.append(time.perf_counter() - t)
+    return latencies, time.perf_counter() - start
+
+
+def run_pool(files, backend, cache_dir, workers):
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(backend,)) as pool:
+        # Warm the workers up so process start-up isn't counted
+        list(pool.map(init_worker, [backend] * workers))
+        start = time.perf_counter()
+        futures = [pool.submit(render_preview_job, path, file_type, cache_dir, True) for path, file_type in files]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - start
+
+
+def report(label, latencies, elapsed, count):
+    ms = sorted(l * 1000 for l in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"  {label:<24} median {statistics.median(ms):7.1f} ms   p95 {p95:7.1f} ms   {count / elapsed:7.1f} files/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=40)
+    parser.add_argument("--sounds", type=int, default=80)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--keep", action="store_true", help="Keep the corpus and caches")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="qedit_decoder_bench_")
+    try:
+        corpus = os.path.join(root, "corpus")
+        os.makedirs(corpus)
+        print(f"Building corpus in {corpus}...")
+        files = make_corpus(corpus, args.videos, args.sounds)
+        backends = available_decoders()
+        if "pyav" not in backends:
+            print("PyAV is not installed (pip install av): benchmarking ffmpeg only.")
+
+        for kind in ("video", "audio"):
+            subset = [f for f in files if f[1] == kind]
+            if not subset:
+                continue
+            print(f"\n{kind}: {len(subset)} files")
+            for backend in backends:
+                cache_dir = os.path.join(root, backend, "previews")
+                run_serial(subset[:2], backend, cache_dir)  # Warm-up (imports, disk cache)
+                latencies, elapsed = run_serial(subset, backend, cache_dir)
+                report(f"{backend} (1 process)", latencies, elapsed, len(subset))
+                elapsed = run_pool(subset, backend, cache_dir, args.workers)
+                print(f"  {backend + f' ({args.workers} workers)':<24} {'':38}{len(subset) / elapsed:7.1f} files/s")
+    finally:
+        if args.keep:
+            print(f"\nKept {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
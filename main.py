@@ -10,6 +10,11 @@ from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
 
 def main():
+    # Headless maintenance: python main.py --warm-previews [options]
+    if len(sys.argv) > 1 and sys.argv[1] == "--warm-previews":
+        from src.core.preview_warmer import main as warm_previews
+        sys.exit(warm_previews(sys.argv[2:]))
+
     app = QApplication(sys.argv)
 
     # Global Dark Theme Styling
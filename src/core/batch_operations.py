@@ -0,0 +1,259 @@
+import os
+import shutil
+import uuid
+
+try:
+    from src.core.io_scheduler import IOScheduler
+    from src.core.resolve_installer import ResolveInstaller
+except ImportError:
+    # Fallback for direct testing
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.io_scheduler import IOScheduler
+    from src.core.resolve_installer import ResolveInstaller
+
+TRASH_DIR = ".trash"  # Inside the storage folder, so deleting is a rename on the same disk
+JOURNAL_SIZE = 20  # Batches that can be undone
+
+
+def _move_file(src, dst):
+    if os.path.exists(dst):
+        raise FileExistsError(dst)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    shutil.move(src, dst)
+
+
+class JournalEntry:
+    """One finished batch, as undo() needs it."""
+    def __init__(self, operation, label, records, trash_dir=None):
+        self.operation = operation  # 'delete', 'move' or 'favorite'
+        self.label = label
+        self.records = records
+        self.trash_dir = trash_dir  # Deleted files wait here until the entry is dropped
+
+
+class BatchTask:
+    """
+    One batch split by thread: run() does the file work and touches no DB, so
+    it may run on a worker thread; finish() then writes the DB and the journal
+    on the DB's thread and returns what the synchronous call would have.
+    """
+    def __init__(self, operation, total, work, finish):
+        self.operation = operation  # 'delete', 'move', 'install' or 'undo'
+        self.total = total  # Files the work goes over (progress maximum)
+        self._work = work
+        self._finish = finish
+        self._outcome = None
+
+    def run(self, progress_callback=None, should_stop=None):
+        self._outcome = self._work(progress_callback, should_stop)
+
+    def finish(self):
+        return self._finish(self._outcome)
+
+
+class BatchOperations:
+    """
+    Delete, move, favorite and install over many assets at once.
+    File work runs on IOScheduler workers (per-device limits, as for imports)
+    while the calling thread reports progress; the DB is written once per
+    batch. The *_task() methods return a BatchTask so that calling thread
+    can be a background one (BatchRunner); the plain methods run it in place.
+    Every delete, move or favorite batch is one journal entry that undo()
+    reverts. Deleted files stay in the trash until their entry is dropped
+    from the journal or purge_trash() runs.
+    """
+    def __init__(self, db_manager, storage_dir, io_scheduler=None, installer=None, journal_size=JOURNAL_SIZE):
+        self.db = db_manager
+        self.storage_dir = storage_dir
+        self.trash_root = os.path.join(storage_dir, TRASH_DIR)
+        self.io_scheduler = io_scheduler or IOScheduler()
+        self.installer = installer or ResolveInstaller()
+        self.journal_size = journal_size
+        self.journal = []
+
+    def _run(self, fn, items, paths, progress_callback=None, should_stop=None):
+        """fn(item) on worker threads; returns [(item, result)] for the items that succeeded."""
+        done = []
+        processed = 0
+        total = len(items)
+
+        def tick():
+            if progress_callback:
+                progress_callback(processed, total)
+
+        results = self.io_scheduler.map(fn, items, paths=paths, should_stop=should_stop, tick=tick)
+        for item, result, error in results:
+            processed += 1
+            if error:
+                print(f"Batch: {paths(item)[0]}: {error}")
+            else:
+                done.append((item, result))
+            tick()
+        return done
+
+    def _move_files(self, moves, progress_callback=None, should_stop=None):
+        """moves: (key, src, dst) tuples. Returns the ones that were moved."""
+        moved = self._run(
+            lambda move: _move_file(move[1], move[2]), moves,
+            paths=lambda move: (move[1], move[2]),
+            progress_callback=progress_callback,
+            should_stop=should_stop,
+        )
+        return [move for move, _ in moved]
+
+    def _move_task(self, operation, moves, finish):
+        return BatchTask(operation, len(moves),
+                         lambda progress, stop: self._move_files(moves, progress, stop), finish)
+
+    @staticmethod
+    def _run_now(task, progress_callback=None, should_stop=None):
+        task.run(progress_callback, should_stop)
+        return task.finish()
+
+    # --- Operations ---
+    def delete(self, asset_ids, progress_callback=None, should_stop=None):
+        """Moves the files to the trash and deletes the rows. Returns the JournalEntry, or None."""
+        return self._run_now(self.delete_task(asset_ids), progress_callback, should_stop)
+
+    def delete_task(self, asset_ids):
+        rows = self.db.get_assets_by_ids(asset_ids)
+        trash_dir = os.path.join(self.trash_root, uuid.uuid4().hex[:12])
+        moves = []
+        gone_ids = set()
+        for row in rows:
+            path = row.get("file_path")
+            if path and os.path.exists(path):
+                moves.append((row["id"], path, os.path.join(trash_dir, str(row["id"]), os.path.basename(path))))
+            else:
+                gone_ids.add(row["id"])  # Already gone from disk: only the row goes
+
+        def finish(moved):
+            deleted_ids = gone_ids | set(move[0] for move in moved)
+            deleted = [row for row in rows if row["id"] in deleted_ids]
+            if not deleted:
+                shutil.rmtree(trash_dir, ignore_errors=True)
+                return None
+            self.db.delete_assets([row["id"] for row in deleted])
+            entry = JournalEntry("delete", f"Delete {len(deleted)} asset(s)", {"rows": deleted, "moves": moved}, trash_dir)
+            return self._push(entry)
+
+        return self._move_task("delete", moves, finish)
+
+    def move(self, asset_ids, category_name, progress_callback=None, should_stop=None):
+        """Moves the files into the category's folder (None: the storage root). Returns the JournalEntry, or None."""
+        return self._run_now(self.move_task(asset_ids, category_name), progress_callback, should_stop)
+
+    def move_task(self, asset_ids, category_name):
+        category_name = category_name or None
+        dest_dir = os.path.join(self.storage_dir, category_name) if category_name else self.storage_dir
+        rows = {row["id"]: row for row in self.db.get_assets_by_ids(asset_ids)}
+        taken = set()
+        moves = []
+        for row in rows.values():
+            path = row.get("file_path")
+            if not path or not os.path.exists(path):
+                continue
+            if os.path.dirname(os.path.abspath(path)) == os.path.abspath(dest_dir):
+                continue
+            stem, ext = os.path.splitext(os.path.basename(path))
+            dst = os.path.join(dest_dir, stem + ext)
+            while dst in taken or os.path.exists(dst):
+                dst = os.path.join(dest_dir, f"{stem}_{uuid.uuid4().hex[:8]}{ext}")
+            taken.add(dst)
+            moves.append((row["id"], path, dst))
+
+        def finish(moved):
+            if not moved:
+                return None
+            self.db.move_assets([(asset_id, dst, category_name) for asset_id, _, dst in moved])
+            records = [(asset_id, src, rows[asset_id].get("category_name"), dst) for asset_id, src, dst in moved]
+            return self._push(JournalEntry("move", f"Move {len(moved)} asset(s)", records))
+
+        return self._move_task("move", moves, finish)
+
+    def set_favorite(self, asset_ids, is_favorite):
+        """Stars (1) or unstars (0) the assets in one statement. Returns the JournalEntry, or None."""
+        changed = [row["id"] for row in self.db.get_assets_by_ids(asset_ids)
+                   if (row.get("is_favorite") or 0) != is_favorite]
+        if not changed:
+            return None
+        self.db.set_favorites(changed, is_favorite)
+        label = f"{'Add' if is_favorite else 'Remove'} {len(changed)} favorite(s)"
+        return self._push(JournalEntry("favorite", label, {"ids": changed, "is_favorite": is_favorite}))
+
+    def install(self, asset_ids, progress_callback=None, should_stop=None):
+        """
+        Installs the assets into Resolve's template folders in parallel.
+        Not journaled (the copies live outside the library).
+        Returns (installed asset rows, [(asset row, message)] for failures).
+        """
+        return self._run_now(self.install_task(asset_ids), progress_callback, should_stop)
+
+    def install_task(self, asset_ids):
+        rows = self.db.get_assets_by_ids(asset_ids)
+        target = str(self.installer.templates_root or self.storage_dir)
+
+        def work(progress_callback, should_stop):
+            return self._run(
+                self.installer.install_asset, rows,
+                paths=lambda row: (row["file_path"], target),
+                progress_callback=progress_callback,
+                should_stop=should_stop,
+            )
+
+        def finish(results):
+            installed = [row for row, (success, _) in results if success]
+            failed = [(row, message) for row, (success, message) in results if not success]
+            return installed, failed
+
+        return BatchTask("install", len(rows), work, finish)
+
+    # --- Journal ---
+    def _push(self, entry):
+        self.journal.append(entry)
+        while len(self.journal) > self.journal_size:
+            self._drop(self.journal.pop(0))
+        return entry
+
+    def _drop(self, entry):
+        if entry.trash_dir:
+            shutil.rmtree(entry.trash_dir, ignore_errors=True)
+
+    def can_undo(self):
+        return bool(self.journal)
+
+    def undo(self, progress_callback=None):
+        """Reverts the newest batch. Returns its JournalEntry, or None if there is nothing to undo."""
+        task = self.undo_task()
+        return self._run_now(task, progress_callback) if task else None
+
+    def undo_task(self):
+        """The task reverting the newest batch (its finish() returns the JournalEntry), or None."""
+        if not self.journal:
+            return None
+        entry = self.journal.pop()
+        if entry.operation == "delete":
+            def finish(moved_back):
+                lost = set(move[0] for move in entry.records["moves"]) - set(move[0] for move in moved_back)
+                self.db.restore_assets([row for row in entry.records["rows"] if row["id"] not in lost])
+                self._drop(entry)
+                return entry
+            return self._move_task("undo", [(asset_id, dst, src) for asset_id, src, dst in entry.records["moves"]],
+                                   finish)
+        if entry.operation == "move":
+            # records: (asset_id, old path, old category, new path)
+            def finish(moved_back):
+                self.db.move_assets([record[:3] for record, _, _ in moved_back])
+                return entry
+            return self._move_task("undo", [(record, record[3], record[1]) for record in entry.records], finish)
+
+        def finish(_):
+            self.db.set_favorites(entry.records["ids"], 0 if entry.records["is_favorite"] else 1)
+            return entry
+        return BatchTask("undo", 0, lambda progress, stop: None, finish)
+
+    def purge_trash(self):
+        """Empties the trash; nothing before this point can be undone any more."""
+        self.journal.clear()
+        shutil.rmtree(self.trash_root, ignore_errors=True)
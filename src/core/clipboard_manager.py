@@ -1,9 +1,12 @@
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QImage
-from PyQt6.QtCore import QMimeData, QUrl
+from PyQt6.QtGui import QImage, QImageReader
+from PyQt6.QtCore import Qt, QMimeData, QUrl
 import os
 import datetime
 
+THUMB_SIZE = (120, 80)  # History panel thumbnail box
+THUMB_DIR = "thumbs"  # Inside the history folder
+
 class ClipboardManager:
     """
     Handles clipboard interactions, specifically checking for images 
@@ -59,13 +62,49 @@ class ClipboardManager:
             
             # Save to History DB if available
             if self.db_manager:
-                self.db_manager.add_clipboard_item(abs_path, image.width(), image.height())
+                thumb_path = self.save_thumbnail(image, abs_path)
+                self.db_manager.add_clipboard_item(abs_path, image.width(), image.height(), thumb_path)
             
             return abs_path
         except Exception as e:
             print(f"DEBUG: Error saving image: {e}")
             return None
 
+    def save_thumbnail(self, image, file_path):
+        """Writes the small version the history panel shows. Returns its path, or None."""
+        thumbs_dir = os.path.join(os.path.dirname(file_path), THUMB_DIR)
+        thumb_path = os.path.join(thumbs_dir, os.path.basename(file_path))
+        thumb = image.scaled(*THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        try:
+            os.makedirs(thumbs_dir, exist_ok=True)
+            if thumb.save(thumb_path, "PNG"):
+                return thumb_path
+        except OSError as e:
+            print(f"Error saving clipboard thumbnail: {e}")
+        return None
+
+    def thumbnail_path(self, item):
+        """The item's thumbnail, or None while it has none (see make_thumbnail)."""
+        thumb_path = item.get("thumb_path")
+        if thumb_path and os.path.exists(thumb_path):
+            return thumb_path
+        return None
+
+    def make_thumbnail(self, file_path):
+        """
+        Writes the thumbnail of an image saved before thumbnails existed,
+        decoded straight at thumbnail size. Safe off the GUI thread; the
+        caller stores the path. Returns it, or None if the image is unreadable.
+        """
+        reader = QImageReader(file_path)
+        size = reader.size()
+        if size.isValid() and (size.width() > THUMB_SIZE[0] or size.height() > THUMB_SIZE[1]):
+            reader.setScaledSize(size.scaled(*THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None
+        return self.save_thumbnail(image, file_path)
+
     def copy_file_to_clipboard(self, file_path):
         """
         Places the given file path onto the clipboard as a System File Object (List of URLs).
@@ -79,16 +118,17 @@ class ClipboardManager:
         
         clipboard.setMimeData(mime_data)
 
-    def delete_history_item(self, item_id, file_path):
-        """Removes the item from DB and deleting the file."""
+    def delete_history_item(self, item_id, file_path, thumb_path=None):
+        """Removes the item from DB and deleting the file (and its thumbnail)."""
         if self.db_manager:
             self.db_manager.delete_clipboard_item(item_id)
         
-        if file_path and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                print(f"Error deleting history file: {e}")
+        for path in (file_path, thumb_path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    print(f"Error deleting history file: {e}")
 
     def clear_history(self):
         """Clears all history from DB and deletes all files."""
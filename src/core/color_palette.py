@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+
+PALETTE_COLORS = 5
+PALETTE_SAMPLE_SIZE = 64    # The preview is read at this size (4096 pixels) for clustering
+KMEANS_ITERATIONS = 12
+
+# Color search: assets whose best palette match is further than this (CIE76 delta E) are left out.
+# A color that covers little of the image counts as further away, up to WEIGHT_PENALTY extra.
+COLOR_MAX_DISTANCE = 30.0
+WEIGHT_PENALTY = 20.0
+
+# sRGB (D65) -> XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def rgb_to_lab(rgb):
+    """Converts an (..., 3) array of 0-255 sRGB to CIE L*a*b*."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _RGB_TO_XYZ.T / _WHITE
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack((116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])), axis=-1)
+
+
+def kmeans(points, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """
+    Plain vectorized k-means with k-means++ seeding (fixed seed, so the same
+    image always gives the same palette). Returns (centers, counts).
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(points))
+    centers = [points[rng.integers(len(points))]]
+    nearest = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        if nearest.sum() <= 0:
+            break  # Fewer distinct colors than k
+        centers.append(points[rng.choice(len(points), p=nearest / nearest.sum())])
+        nearest = np.minimum(nearest, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        moved = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.allclose(moved, centers):
+            break
+        centers = moved
+
+    labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    counts = np.bincount(labels, minlength=len(centers))
+    keep = counts > 0
+    return centers[keep], counts[keep]
+
+
+def extract_palette(image_path, colors=PALETTE_COLORS):
+    """
+    Returns the dominant colors of an image file as [(r, g, b, weight)], most
+    common first, with weights summing to 1. Transparent pixels are ignored.
+    Meant for cached previews: they are already small. None if unreadable.
+    """
+    from PyQt6.QtCore import QSize, Qt
+    from PyQt6.QtGui import QImage, QImageReader  # Imported lazily: searching doesn't need Qt
+
+    if not image_path or not os.path.exists(image_path):
+        return None
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        reader.setScaledSize(size.scaled(QSize(PALETTE_SAMPLE_SIZE, PALETTE_SAMPLE_SIZE),
+                                         Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+
+    image = image.convertToFormat(QImage.Format.Format_RGBA8888)
+    width, height, stride = image.width(), image.height(), image.bytesPerLine()
+    data = np.frombuffer(image.constBits().asstring(stride * height), dtype=np.uint8)
+    pixels = data.reshape(height, stride)[:, :width * 4].reshape(-1, 4)
+    opaque = pixels[pixels[:, 3] >= 128]
+    pixels = (opaque if len(opaque) else pixels)[:, :3]
+
+    # Cluster in Lab so clusters follow perceived color, then report the mean sRGB of each
+    lab = rgb_to_lab(pixels)
+    centers, counts = kmeans(lab, colors)
+    labels = ((lab[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    palette = []
+    for index in np.argsort(-counts):
+        mean = pixels[labels == index].mean(axis=0)
+        palette.append((int(round(mean[0])), int(round(mean[1])), int(round(mean[2])),
+                        float(counts[index] / counts.sum())))
+    return palette
+
+
+def palette_rows(palette):
+    """Turns extract_palette() output into (rank, r, g, b, lab_l, lab_a, lab_b, weight) rows for storage."""
+    rows = []
+    for rank, (r, g, b, weight) in enumerate(palette):
+        lab_l, lab_a, lab_b = (float(v) for v in rgb_to_lab((r, g, b)))
+        rows.append((rank, r, g, b, lab_l, lab_a, lab_b, weight))
+    return rows
+
+
+def palette_job(preview_path, file_type, cache_dir=None):
+    """Worker entry point: palette of an asset's preview image. Same signature as the other thumbnail jobs."""
+    return extract_palette(preview_path)
+
+
+class ColorIndex:
+    """
+    In-memory palette index for search-by-color. Every stored palette color
+    is one row of a Lab array; a query computes all delta Es at once and keeps
+    each asset's best (weight-adjusted) match.
+    """
+    def __init__(self, rows):
+        """rows: iterable of (asset_id, lab_l, lab_a, lab_b, weight)."""
+        rows = sorted(rows, key=lambda r: r[0])
+        self.asset_ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.lab = np.array([r[1:4] for r in rows], dtype=np.float64).reshape(-1, 3)
+        self.weights = np.array([r[4] for r in rows], dtype=np.float64)
+        # Rows are grouped by asset: where each group starts
+        if len(self.asset_ids):
+            self.starts = np.flatnonzero(np.r_[True, self.asset_ids[1:] != self.asset_ids[:-1]])
+        else:
+            self.starts = np.array([], dtype=np.intp)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def search(self, rgb, max_distance=COLOR_MAX_DISTANCE, limit=500):
+        """Returns [(asset_id, distance)] best match first for an (r, g, b) query color."""
+        if not len(self.starts):
+            return []
+        target = rgb_to_lab(np.array(rgb, dtype=np.float64))
+        distance = np.sqrt(((self.lab - target) ** 2).sum(axis=1)) + (1.0 - self.weights) * WEIGHT_PENALTY
+        best = np.minimum.reduceat(distance, self.starts)
+        match = np.flatnonzero(best <= max_distance)
+        order = match[np.argsort(best[match], kind="stable")][:limit]
+        return [(int(self.asset_ids[self.starts[i]]), float(best[i])) for i in order]
@@ -0,0 +1,117 @@
+import hashlib
+import mmap
+import os
+import shutil
+import time
+
+
+class CopyVerificationError(OSError):
+    """Raised when the destination checksum does not match the source."""
+
+
+class CopyEngine:
+    """
+    Buffered file copier used for imports.
+    The source checksum is computed in the same read pass as the copy, then the
+    destination is read back and compared before the copy is reported as done.
+    """
+    # 8 MiB, a multiple of every common page/sector size
+    DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, buffer_size=None, algorithm="blake2b", verify=True):
+        buffer_size = buffer_size or self.DEFAULT_BUFFER_SIZE
+        # Round up to a whole number of pages so reads stay aligned
+        self.buffer_size = -(-buffer_size // mmap.PAGESIZE) * mmap.PAGESIZE
+        self.algorithm = algorithm
+        self.verify = verify
+
+    def _new_hash(self):
+        return hashlib.new(self.algorithm)
+
+    def _alloc_buffer(self):
+        # Anonymous mmap gives a page-aligned buffer we can readinto() directly
+        return mmap.mmap(-1, self.buffer_size)
+
+    def copy(self, src, dst, progress_callback=None):
+        """
+        Copies src to dst and returns a dict with checksum, checksum_type,
+        bytes, seconds and bytes_per_sec.
+        progress_callback(bytes_done, total_bytes, bytes_per_sec) is called per buffer.
+        """
+        total = os.path.getsize(src)
+        digest = self._new_hash()
+        buf = self._alloc_buffer()
+        view = memoryview(buf)
+        done = 0
+        start = time.perf_counter()
+
+        try:
+            with open(src, "rb", buffering=0) as fin, open(dst, "wb", buffering=0) as fout:
+                while True:
+                    n = fin.readinto(view)
+                    if not n:
+                        break
+                    with view[:n] as chunk:
+                        digest.update(chunk)
+                        written = 0
+                        while written < n:  # raw writes may be short
+                            written += fout.write(chunk[written:])
+                    done += n
+                    if progress_callback:
+                        elapsed = time.perf_counter() - start
+                        progress_callback(done, total, done / elapsed if elapsed > 0 else 0.0)
+            shutil.copystat(src, dst)
+        except BaseException:
+            self._discard(dst)
+            raise
+        finally:
+            view.release()
+            buf.close()
+
+        checksum = digest.hexdigest()
+        if self.verify:
+            dest_checksum = self.hash_file(dst)
+            if dest_checksum != checksum:
+                self._discard(dst)
+                raise CopyVerificationError(
+                    f"Checksum mismatch after copying {src} -> {dst}"
+                )
+
+        seconds = time.perf_counter() - start
+        return {
+            "checksum": checksum,
+            "checksum_type": self.algorithm,
+            "bytes": done,
+            "seconds": seconds,
+            "bytes_per_sec": done / seconds if seconds > 0 else 0.0,
+        }
+
+    def hash_file(self, path):
+        """Returns the hex digest of a file using the engine's buffer and algorithm."""
+        digest = self._new_hash()
+        buf = self._alloc_buffer()
+        view = memoryview(buf)
+        try:
+            with open(path, "rb", buffering=0) as f:
+                while True:
+                    n = f.readinto(view)
+                    if not n:
+                        break
+                    with view[:n] as chunk:
+                        digest.update(chunk)
+        finally:
+            view.release()
+            buf.close()
+        return digest.hexdigest()
+
+    def _discard(self, path):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Error removing partial copy {path}: {e}")
+
+
+def format_throughput(bytes_per_sec):
+    """Formats a byte rate as 'x.x MB/s'."""
+    return f"{bytes_per_sec / (1024 * 1024):.1f} MB/s"
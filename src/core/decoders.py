@@ -0,0 +1,328 @@
+import os
+import subprocess
+from abc import ABC, abstractmethod
+
+import ffmpeg
+import numpy as np
+
+try:
+    from src.core.waveform import _ffmpeg_chunks
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.waveform import _ffmpeg_chunks
+
+try:
+    import av  # Optional: in-process decoding
+except ImportError:
+    av = None
+
+# A preview that takes longer than this is treated as hung and killed
+FFMPEG_TIMEOUT = 60
+
+DEFAULT_DECODER = "ffmpeg"
+
+
+class DecodeError(Exception):
+    """Raised by decoder backends when a file can't be decoded."""
+
+
+class DecoderBackend(ABC):
+    """
+    What PreviewGenerator needs from a decoder. Frames are scaled by the
+    backend; width-only sizes keep the aspect ratio (rounded to even heights).
+    """
+    name = None
+
+    @abstractmethod
+    def keyframes_gray(self, file_path, times, width, height):
+        """Decodes the keyframe at/before each time as grey (n, height, width) uint8. May return fewer frames."""
+
+    @abstractmethod
+    def save_frame(self, file_path, seconds, output_path, width, keyframe=True):
+        """Writes one frame (the keyframe at/before seconds, or the exact frame) as an image file."""
+
+    @abstractmethod
+    def save_filmstrip(self, file_path, duration, frames, frame_width, output_path):
+        """Writes `frames` evenly spaced frames side by side into one image file."""
+
+    @abstractmethod
+    def save_still(self, file_path, output_path, max_width, max_height):
+        """Writes the first frame of a still (e.g. DPX) scaled to fit the box."""
+
+    @abstractmethod
+    def pcm_chunks(self, file_path, sample_rate):
+        """Yields the audio as mono int16 arrays at sample_rate."""
+
+
+def run_ffmpeg(stream, timeout=FFMPEG_TIMEOUT):
+    """
+    Runs an ffmpeg-python stream like .run(capture_stdout=True, capture_stderr=True),
+    but kills it after timeout seconds (a corrupt file can make ffmpeg spin forever).
+    Returns (stdout, stderr); raises ffmpeg.Error on failure or timeout.
+    """
+    process = stream.run_async(pipe_stdout=True, pipe_stderr=True)
+    try:
+        out, err = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        out, err = process.communicate()
+        raise ffmpeg.Error('ffmpeg', out, (err or b'') + f"\nkilled after {timeout}s".encode())
+    if process.returncode:
+        raise ffmpeg.Error('ffmpeg', out, err)
+    return out, err
+
+
+def _ffmpeg_error(e):
+    return DecodeError((e.stderr or b'').decode('utf8', errors='replace').strip() or str(e))
+
+
+class FFmpegBackend(DecoderBackend):
+    """Runs the ffmpeg binary per operation (one process each, killed on timeout)."""
+    name = "ffmpeg"
+
+    def __init__(self, timeout=FFMPEG_TIMEOUT):
+        self.timeout = timeout
+
+    def _keyframe_input(self, file_path, seconds):
+        # -noaccurate_seek lands on the keyframe at/before the time instead of decoding up to it
+        return ffmpeg.input(file_path, ss=seconds, skip_frame='nokey', noaccurate_seek=None)
+
+    def keyframes_gray(self, file_path, times, width, height):
+        streams = [
+            self._keyframe_input(file_path, t).video
+            .filter('scale', width, height)
+            .trim(end_frame=1)
+            .filter('setpts', 'PTS-STARTPTS')
+            for t in times
+        ]
+        try:
+            out, _ = run_ffmpeg(
+                ffmpeg
+                .concat(*streams, v=1, a=0)
+                .output('pipe:', format='rawvideo', pix_fmt='gray', vsync='passthrough'),
+                self.timeout,
+            )
+        except ffmpeg.Error as e:
+            raise _ffmpeg_error(e)
+        frames = np.frombuffer(out, dtype=np.uint8)
+        count = len(frames) // (width * height)
+        return frames[:count * width * height].reshape(count, height, width)
+
+    def save_frame(self, file_path, seconds, output_path, width, keyframe=True):
+        source = self._keyframe_input(file_path, seconds) if keyframe else ffmpeg.input(file_path, ss=seconds)
+        try:
+            run_ffmpeg(
+                source
+                .filter('scale', width, -2)
+                .output(output_path, vframes=1)
+                .overwrite_output(),
+                self.timeout,
+            )
+        except ffmpeg.Error as e:
+            raise _ffmpeg_error(e)
+        return os.path.exists(output_path)
+
+    def save_filmstrip(self, file_path, duration, frames, frame_width, output_path):
+        try:
+            run_ffmpeg(
+                ffmpeg
+                .input(file_path)
+                .filter('fps', fps=f"{frames}/{duration:.3f}")
+                .filter('scale', frame_width, -2)
+                .filter('tile', f"{frames}x1")
+                .output(output_path, vframes=1)
+                .overwrite_output(),
+                self.timeout,
+            )
+        except ffmpeg.Error as e:
+            raise _ffmpeg_error(e)
+        return os.path.exists(output_path)
+
+    def save_still(self, file_path, output_path, max_width, max_height):
+        try:
+            run_ffmpeg(
+                ffmpeg
+                .input(file_path)
+                .filter('scale', max_width, max_height, force_original_aspect_ratio='decrease')
+                .output(output_path, vframes=1)
+                .overwrite_output(),
+                self.timeout,
+            )
+        except ffmpeg.Error as e:
+            raise _ffmpeg_error(e)
+        return os.path.exists(output_path)
+
+    def pcm_chunks(self, file_path, sample_rate):
+        try:
+            yield from _ffmpeg_chunks(file_path, sample_rate)
+        except ffmpeg.Error as e:
+            raise _ffmpeg_error(e)
+
+
+def _even(value):
+    return max(2, int(round(value / 2.0)) * 2)
+
+
+def _save_rgb(pixels, output_path, quality=85):
+    """Writes an (h, w, 3) uint8 array with Qt (format from the extension)."""
+    from PyQt6.QtGui import QImage  # Imported lazily: only needed when writing
+
+    pixels = np.ascontiguousarray(pixels)
+    height, width = pixels.shape[:2]
+    image = QImage(pixels.data, width, height, width * 3, QImage.Format.Format_RGB888)
+    return image.save(output_path, quality=quality)
+
+
+class PyAVBackend(DecoderBackend):
+    """
+    Decodes in-process through PyAV (libav* bindings): no process start-up per
+    file, which dominates for short clips. Requires the optional 'av' package.
+    Hung decoders can't be killed in-process; the thumbnail pool's retries and
+    BrokenProcessPool handling still apply.
+    """
+    name = "pyav"
+
+    def __init__(self):
+        if av is None:
+            raise DecodeError("PyAV is not installed (pip install av)")
+
+    def _open_video(self, file_path):
+        try:
+            container = av.open(file_path)
+        except (av.error.FFmpegError, OSError) as e:
+            raise DecodeError(str(e))
+        if not container.streams.video:
+            container.close()
+            raise DecodeError(f"no video stream in {file_path}")
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        return container, stream
+
+    def _frame_at(self, container, stream, seconds, keyframe):
+        """Seeks to the keyframe at/before seconds; decodes on to the exact frame unless keyframe is set."""
+        if stream.time_base:
+            offset = int(seconds / stream.time_base) + (stream.start_time or 0)
+            container.seek(offset, stream=stream, backward=True, any_frame=False)
+        last = None
+        for frame in container.decode(stream):
+            if keyframe or frame.time is None or frame.time >= seconds:
+                return frame
+            last = frame
+        return last
+
+    def _scaled(self, frame, width, height=None, format="rgb24"):
+        if height is None:
+            height = _even(frame.height * width / max(1, frame.width))
+        return frame.reformat(width=width, height=height, format=format).to_ndarray()
+
+    def keyframes_gray(self, file_path, times, width, height):
+        container, stream = self._open_video(file_path)
+        frames = []
+        try:
+            stream.codec_context.skip_frame = "NONKEY"
+            for t in times:
+                frame = self._frame_at(container, stream, t, keyframe=True)
+                if frame is not None:
+                    frames.append(self._scaled(frame, width, height, "gray"))
+        except av.error.FFmpegError as e:
+            raise DecodeError(str(e))
+        finally:
+            container.close()
+        if not frames:
+            return np.zeros((0, height, width), dtype=np.uint8)
+        return np.stack([f[:height, :width] for f in frames])
+
+    def save_frame(self, file_path, seconds, output_path, width, keyframe=True):
+        container, stream = self._open_video(file_path)
+        try:
+            if keyframe:
+                stream.codec_context.skip_frame = "NONKEY"
+            frame = self._frame_at(container, stream, seconds, keyframe)
+            if frame is None:
+                return False
+            pixels = self._scaled(frame, width)
+        except av.error.FFmpegError as e:
+            raise DecodeError(str(e))
+        finally:
+            container.close()
+        return _save_rgb(pixels, output_path)
+
+    def save_filmstrip(self, file_path, duration, frames, frame_width, output_path):
+        container, stream = self._open_video(file_path)
+        # Middle of each slice, like the fps filter picks; one forward pass, only picked frames are scaled
+        targets = [(i + 0.5) * duration / frames for i in range(frames)]
+        tiles = []
+        try:
+            for frame in container.decode(stream):
+                if frame.time is None or frame.time >= targets[len(tiles)]:
+                    tiles.append(self._scaled(frame, frame_width))
+                    if len(tiles) == frames:
+                        break
+        except av.error.FFmpegError as e:
+            raise DecodeError(str(e))
+        finally:
+            container.close()
+        if not tiles:
+            return False
+        while len(tiles) < frames:
+            tiles.append(np.zeros_like(tiles[0]))
+        return _save_rgb(np.hstack(tiles), output_path)
+
+    def save_still(self, file_path, output_path, max_width, max_height):
+        container, stream = self._open_video(file_path)
+        try:
+            frame = next(container.decode(stream), None)
+            if frame is None:
+                return False
+            scale = min(1.0, max_width / max(1, frame.width), max_height / max(1, frame.height))
+            pixels = self._scaled(frame, _even(frame.width * scale), _even(frame.height * scale))
+        except av.error.FFmpegError as e:
+            raise DecodeError(str(e))
+        finally:
+            container.close()
+        return _save_rgb(pixels, output_path)
+
+    def pcm_chunks(self, file_path, sample_rate):
+        try:
+            container = av.open(file_path)
+        except (av.error.FFmpegError, OSError) as e:
+            raise DecodeError(str(e))
+        try:
+            if not container.streams.audio:
+                raise DecodeError(f"no audio stream in {file_path}")
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+            for frame in container.decode(container.streams.audio[0]):
+                for out in resampler.resample(frame):
+                    yield out.to_ndarray().reshape(-1).astype(np.int16, copy=False)
+            for out in resampler.resample(None):  # Flush
+                yield out.to_ndarray().reshape(-1).astype(np.int16, copy=False)
+        except av.error.FFmpegError as e:
+            raise DecodeError(str(e))
+        finally:
+            container.close()
+
+
+_BACKENDS = {
+    FFmpegBackend.name: FFmpegBackend,
+    PyAVBackend.name: PyAVBackend,
+}
+
+
+def available_decoders():
+    """Names of the backends that can run here."""
+    return [name for name in _BACKENDS if name != PyAVBackend.name or av is not None]
+
+
+def get_decoder(name=None):
+    """Returns a backend instance by name ('ffmpeg' | 'pyav'); unknown or unavailable names fall back to ffmpeg."""
+    name = name or DEFAULT_DECODER
+    backend = _BACKENDS.get(name)
+    if backend is None:
+        print(f"Unknown decoder backend '{name}', using {DEFAULT_DECODER}")
+        return FFmpegBackend()
+    try:
+        return backend()
+    except DecodeError as e:
+        print(f"Decoder backend '{name}' unavailable ({e}), using {DEFAULT_DECODER}")
+        return FFmpegBackend()
@@ -1,76 +1,179 @@
-import shutil
 import uuid
 import zipfile
 import os
 from pathlib import Path
 
-from pathlib import Path
 try:
-    from src.core.preview_generator import PreviewGenerator
+    from src.core.preview_generator import PreviewGenerator, PREVIEW_FILE_TYPES
+    from src.core.copy_engine import CopyEngine
+    from src.core.io_scheduler import IOScheduler, ThroughputMeter
+    from src.core.media_probe import probe_duration
 except ImportError:
      # Fallback for direct testing
     import sys
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-    from src.core.preview_generator import PreviewGenerator
+    from src.core.preview_generator import PreviewGenerator, PREVIEW_FILE_TYPES
+    from src.core.copy_engine import CopyEngine
+    from src.core.io_scheduler import IOScheduler, ThroughputMeter
+    from src.core.media_probe import probe_duration
+
+IMAGE_EXTS = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.dpx'}
 
 class FileManager:
-    def __init__(self, db_manager, storage_dir):
+    def __init__(self, db_manager, storage_dir, copy_engine=None, io_scheduler=None, preview_generator=None):
         self.db_manager = db_manager
         self.storage_dir = storage_dir
-        self.preview_generator = PreviewGenerator()
+        self.io_scheduler = io_scheduler or IOScheduler()
+        self.preview_generator = preview_generator or PreviewGenerator(io_scheduler=self.io_scheduler)
+        self.copy_engine = copy_engine or CopyEngine()
+        # Imports never wait on a decoder: assets are registered with
+        # preview_state 'pending' and a ThumbnailService fills them in afterwards.
+        # Set True for headless use where nothing else will render previews.
+        self.generate_previews = False
         if not os.path.exists(self.storage_dir):
             try:
                 os.makedirs(self.storage_dir, exist_ok=True)
             except OSError as e:
                 print(f"Error creating storage dir: {e}")
 
-    def import_file(self, file_path, category_path=None):
+    def import_file(self, file_path, category_path=None, copy_progress_callback=None):
         """
         Copies file to storage and adds to DB. Expands .drfx.
         category_path: Relative path (e.g. 'Textures/Wood') where the file should go.
+        copy_progress_callback: Optional (bytes_done, total_bytes, bytes_per_sec) callback.
         """
         file_path = Path(file_path)
         if not file_path.exists():
             return None
 
-        # Generate unique filename to avoid collisions
-        ext = file_path.suffix.lower()
-        
         # Handle DRFX specifically
-        if ext == '.drfx':
+        if file_path.suffix.lower() == '.drfx':
             return self._process_drfx(file_path)
 
-        # Standard file import
+        try:
+            dest_path = self._make_dest_path(file_path, category_path)
+            with self.io_scheduler.acquire(str(file_path), dest_path):
+                result = self._copy_and_preview(file_path, dest_path, copy_progress_callback)
+            return self._register_import(file_path, category_path, result)
+        except Exception as e:
+            print(f"Error importing {file_path}: {e}")
+            return None
+
+    def import_files(self, file_paths, category_path=None, progress_callback=None,
+                     copy_progress_callback=None, should_stop=None):
+        """
+        Imports several files in parallel, scheduled per source/destination device.
+        progress_callback(processed, total) and copy_progress_callback(bytes_done,
+        total_bytes, bytes_per_sec) are always called from the calling thread.
+        Returns the number of imported assets.
+        """
+        jobs = [(Path(p), category_path) for p in file_paths]
+        return self._import_batch(jobs, progress_callback, copy_progress_callback, should_stop)
+
+    def _make_dest_path(self, file_path, category_path):
+        # Generate unique filename to avoid collisions
+        ext = file_path.suffix.lower()
         new_filename = f"{file_path.stem}_{uuid.uuid4().hex[:8]}{ext}"
-        
+
         # Determine destination folder
         if category_path:
             dest_dir = os.path.join(self.storage_dir, category_path)
-            if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir)
-            dest_path = os.path.join(dest_dir, new_filename)
-        else:
-            dest_path = os.path.join(self.storage_dir, new_filename)
+            os.makedirs(dest_dir, exist_ok=True)
+            return os.path.join(dest_dir, new_filename)
+        return os.path.join(self.storage_dir, new_filename)
 
-        try:
-            shutil.copy2(file_path, dest_path)
-            
-            # Generate Preview
-            file_type = self._get_file_type(ext)
+    def _copy_and_preview(self, file_path, dest_path, copy_progress_callback=None):
+        """Copy + preview work for one file. Touches no DB state, so it is safe on worker threads."""
+        # Verified copy (checksum computed while copying)
+        copy_result = self.copy_engine.copy(file_path, dest_path, progress_callback=copy_progress_callback)
+
+        # Generate Preview
+        file_type = self._get_file_type(file_path.suffix)
+        preview_path = None
+        if self.generate_previews:
             preview_path = self.preview_generator.generate_preview(dest_path, file_type)
+        return {
+            "dest_path": dest_path,
+            "file_type": file_type,
+            "preview_path": preview_path,
+            "copy": copy_result,
+            # For sorting by duration; headers are parsed in-process for the common formats
+            "duration": probe_duration(dest_path) if file_type in ('video', 'audio') else None,
+        }
 
-            # Add to DB
-            asset_id = self.db_manager.add_asset(
-                dest_path, 
-                file_path.name, 
-                file_type, 
-                preview_path=preview_path,
-                category_name=category_path # Pass the category explicitly
-            )
-            return asset_id
-        except Exception as e:
-            print(f"Error importing {file_path}: {e}")
-            return None
+    def _register_import(self, file_path, category_path, result):
+        preview_state = None
+        if result["preview_path"]:
+            preview_state = 'ready'
+        elif result["file_type"] in PREVIEW_FILE_TYPES:
+            preview_state = 'pending'
+        # Add to DB
+        return self.db_manager.add_asset(
+            result["dest_path"],
+            file_path.name,
+            result["file_type"],
+            preview_path=result["preview_path"],
+            category_name=category_path, # Pass the category explicitly
+            checksum=result["copy"]["checksum"],
+            checksum_type=result["copy"]["checksum_type"],
+            preview_state=preview_state,
+            file_size=result["copy"]["bytes"],
+            duration=result["duration"],
+        )
+
+    def _import_batch(self, jobs, progress_callback=None, copy_progress_callback=None, should_stop=None):
+        """jobs: list of (Path, category_path). DB writes stay on the calling thread."""
+        jobs = [(p, cat) for p, cat in jobs if p.exists()]
+        total = len(jobs)
+        processed = 0
+        imported_count = 0
+        if progress_callback:
+            progress_callback(processed, total)
+
+        # .drfx bundles register many assets themselves; run them here, serially
+        copy_jobs = []
+        for file_path, category_path in jobs:
+            if file_path.suffix.lower() == '.drfx':
+                if self._process_drfx(file_path):
+                    imported_count += 1
+                processed += 1
+                if progress_callback:
+                    progress_callback(processed, total)
+            else:
+                copy_jobs.append((file_path, category_path, self._make_dest_path(file_path, category_path)))
+
+        meter = ThroughputMeter(sum(os.path.getsize(j[0]) for j in copy_jobs))
+
+        def run(job):
+            file_path, _, dest_path = job
+            last = [0]
+
+            def on_bytes(done, total_bytes, rate):
+                meter.add(done - last[0])
+                last[0] = done
+
+            return self._copy_and_preview(file_path, dest_path, on_bytes)
+
+        def tick():
+            if copy_progress_callback:
+                copy_progress_callback(meter.done_bytes, meter.total_bytes, meter.rate())
+
+        results = self.io_scheduler.map(
+            run, copy_jobs,
+            paths=lambda job: (str(job[0]), job[2]),
+            should_stop=should_stop,
+            tick=tick,
+        )
+        for (file_path, category_path, _), result, error in results:
+            if error:
+                print(f"Error importing {file_path}: {error}")
+            elif self._register_import(file_path, category_path, result):
+                imported_count += 1
+            processed += 1
+            if progress_callback:
+                progress_callback(processed, total)
+
+        return imported_count
 
     def _process_drfx(self, file_path):
         """Unzips .drfx and registers internal .setting files."""
@@ -120,7 +223,8 @@ class FileManager:
                             file, # Filename (e.g. Brush 01.setting)
                             file_type, 
                             preview_path=preview_path,
-                            category_name=category_name
+                            category_name=category_name,
+                            preview_state='ready' if preview_path else None
                         )
                         imported_count += 1
             
@@ -129,23 +233,17 @@ class FileManager:
             print(f"Error expanding drfx {file_path}: {e}")
             return None
 
-    def scan_directory(self, dir_path, base_category=None, progress_callback=None):
+    def scan_directory(self, dir_path, base_category=None, progress_callback=None, copy_progress_callback=None,
+                       should_stop=None):
         """
         Recursively scans directory and imports supported files.
         Preserves folder structure relative to dir_path.
         """
-        supported_exts = {'.drfx', '.setting', '.cube', '.mp4', '.mov', '.png', '.jpg', '.wav', '.mp3'}
-        
-        # 1. Count total files for progress (optional but good for UX)
-        total_files = 0
-        for root, _, files in os.walk(dir_path):
-             total_files += len([f for f in files if Path(f).suffix.lower() in supported_exts])
-        
-        imported_count = 0
-        processed = 0
-        
+        supported_exts = {'.drfx', '.setting', '.cube', '.mp4', '.mov', '.wav', '.mp3'} | IMAGE_EXTS
+
         dir_path = os.path.abspath(dir_path)
-        
+        jobs = []
+
         for root, _, files in os.walk(dir_path):
             # Calculate relative folder structure
             rel_path = os.path.relpath(root, dir_path)
@@ -163,23 +261,46 @@ class FileManager:
                     final_category = f"{base_category}/{current_sub_cat}"
                 else:
                     final_category = current_sub_cat
-            
+
             for file in files:
                 if Path(file).suffix.lower() in supported_exts:
-                    full_path = os.path.join(root, file)
-                    if self.import_file(full_path, category_path=final_category):
-                        imported_count += 1
-                    
-                    processed += 1
-                    if progress_callback:
-                        progress_callback(processed, total_files)
-                        
-        return imported_count
+                    jobs.append((Path(root) / file, final_category))
+
+        return self._import_batch(jobs, progress_callback, copy_progress_callback, should_stop)
+
+    def fill_missing_durations(self, progress_callback=None, should_stop=None):
+        """
+        Probes video/audio assets imported before durations were recorded.
+        Unreadable files get 0 so they aren't probed again. Returns how many were filled.
+        """
+        assets = self.db_manager.get_assets_without_duration()
+        total = len(assets)
+        processed = 0
+        durations = []
+
+        def tick():
+            if progress_callback:
+                progress_callback(processed, total)
+
+        results = self.io_scheduler.map(
+            lambda asset: probe_duration(asset["file_path"]), assets,
+            paths=lambda asset: (asset["file_path"], None),
+            should_stop=should_stop,
+            tick=tick,
+        )
+        for asset, duration, error in results:
+            if error:
+                print(f"Error probing {asset['file_path']}: {error}")
+            durations.append((asset["id"], duration or 0))
+            processed += 1
+            tick()
+        self.db_manager.set_durations(durations)
+        return len(durations)
 
     def _get_file_type(self, ext):
         ext = ext.lower()
         if ext in ['.mp4', '.mov']: return 'video'
-        if ext in ['.png', '.jpg']: return 'image'
+        if ext in IMAGE_EXTS: return 'image'
         if ext in ['.wav', '.mp3']: return 'audio'
         if ext == '.drfx': return 'drfx'
         if ext == '.setting': return 'macro'
@@ -0,0 +1,407 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+
+
+# Default concurrent jobs per device class. Spinning disks and card readers
+# fall apart under parallel reads; NVMe needs several requests in flight.
+DEFAULT_KIND_LIMITS = {
+    'rotational': 1,
+    'removable': 2,
+    'network': 4,
+    'ssd': max(2, min(8, os.cpu_count() or 2)),
+    'unknown': 2,
+}
+
+
+class DeviceInfo:
+    """A storage device as seen by the scheduler."""
+    def __init__(self, dev_id, kind, limit, label=""):
+        self.dev_id = dev_id
+        self.kind = kind
+        self.limit = max(1, int(limit))
+        self.label = label
+
+    @property
+    def rotational(self):
+        return self.kind == 'rotational'
+
+    def __repr__(self):
+        return f"DeviceInfo({self.label or self.dev_id}, {self.kind}, limit={self.limit})"
+
+
+class IOScheduler:
+    """
+    Groups file work by source/destination device and enforces a concurrency
+    limit per device, so a slow card reader and a fast SSD can both be kept busy
+    without thrashing either.
+
+    kind_limits: overrides for DEFAULT_KIND_LIMITS, e.g. {'rotational': 1}.
+    device_limits: per-mount overrides keyed by a path on the device, e.g. {'E:/': 1}.
+    """
+    def __init__(self, kind_limits=None, device_limits=None):
+        self.kind_limits = dict(DEFAULT_KIND_LIMITS)
+        if kind_limits:
+            self.kind_limits.update(kind_limits)
+        self.device_limits = device_limits or {}
+
+        self._devices = {}          # st_dev -> DeviceInfo
+        self._in_flight = {}        # st_dev -> running job count
+        self._cond = threading.Condition()
+        self._overrides = None      # st_dev -> limit, resolved lazily
+        self._local = threading.local()  # devices already held by the current thread
+
+    # --- Device discovery ---
+    def device_for(self, path):
+        """Returns the DeviceInfo for the device holding path (or its nearest existing parent)."""
+        dev_id = self._st_dev(path)
+        with self._cond:
+            info = self._devices.get(dev_id)
+            if info is None:
+                kind = self._classify(path, dev_id)
+                limit = self._resolve_overrides().get(dev_id, self.kind_limits.get(kind, 2))
+                info = DeviceInfo(dev_id, kind, limit, label=self._existing_parent(path))
+                self._devices[dev_id] = info
+            return info
+
+    def _existing_parent(self, path):
+        path = os.path.abspath(path)
+        while not os.path.exists(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        return path
+
+    def _st_dev(self, path):
+        try:
+            return os.stat(self._existing_parent(path)).st_dev
+        except OSError:
+            return -1
+
+    def _resolve_overrides(self):
+        if self._overrides is None:
+            self._overrides = {}
+            for path, limit in self.device_limits.items():
+                try:
+                    self._overrides[os.stat(path).st_dev] = int(limit)
+                except (OSError, ValueError) as e:
+                    print(f"IOScheduler: ignoring device limit for {path}: {e}")
+        return self._overrides
+
+    def _classify(self, path, dev_id):
+        try:
+            if sys.platform.startswith('linux'):
+                return self._classify_linux(path, dev_id)
+            if os.name == 'nt':
+                return self._classify_windows(path)
+        except Exception as e:
+            print(f"IOScheduler: could not classify device for {path}: {e}")
+        return 'unknown'
+
+    def _classify_linux(self, path, dev_id):
+        major, minor = os.major(dev_id), os.minor(dev_id)
+        if major == 0:
+            # Anonymous devices: NFS, CIFS, FUSE, tmpfs... check the mount table
+            fstype = self._linux_fstype(self._existing_parent(path))
+            if fstype in ('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'sshfs', 'fuse.sshfs', '9p'):
+                return 'network'
+            if fstype in ('tmpfs', 'ramfs'):
+                return 'ssd'
+            return 'unknown'
+
+        sys_dir = f"/sys/dev/block/{major}:{minor}"
+        if os.path.exists(os.path.join(sys_dir, 'partition')):
+            sys_dir = os.path.join(sys_dir, '..')  # Partition -> parent disk
+        sys_dir = os.path.realpath(sys_dir)
+
+        def read_flag(name):
+            try:
+                with open(os.path.join(sys_dir, name)) as f:
+                    return f.read().strip() == '1'
+            except OSError:
+                return None
+
+        if read_flag('removable') or '/usb' in sys_dir:
+            return 'removable'
+        rotational = read_flag('queue/rotational')
+        if rotational is None:
+            return 'unknown'
+        return 'rotational' if rotational else 'ssd'
+
+    def _linux_fstype(self, path):
+        best, fstype = "", None
+        try:
+            with open('/proc/mounts') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 3:
+                        continue
+                    mount_point = parts[1].replace('\\040', ' ')
+                    if path == mount_point or path.startswith(mount_point.rstrip('/') + '/'):
+                        if len(mount_point) > len(best):
+                            best, fstype = mount_point, parts[2]
+        except OSError:
+            pass
+        return fstype
+
+    def _classify_windows(self, path):
+        """
+        Drive type first (network / removable), then the disk behind a fixed
+        volume via IOCTL_STORAGE_QUERY_PROPERTY: USB/SD bus -> removable,
+        seek penalty -> rotational, none -> ssd. Needs no admin rights.
+        """
+        import ctypes
+        drive = os.path.splitdrive(os.path.abspath(path))[0]
+        if not drive or drive.startswith('\\\\'):
+            return 'network' if drive else 'unknown'  # UNC paths are shares
+        drive_type = ctypes.windll.kernel32.GetDriveTypeW(drive + '\\')
+        if drive_type == 4:  # DRIVE_REMOTE
+            return 'network'
+        if drive_type == 2:  # DRIVE_REMOVABLE
+            return 'removable'
+        if drive_type != 3:  # Not DRIVE_FIXED (RAM disk, optical...)
+            return 'unknown'
+        bus_type, seek_penalty = self._windows_storage_properties(drive)
+        if bus_type in (7, 12, 13):  # BusTypeUsb, BusTypeSd, BusTypeMmc: external disk shown as fixed
+            return 'removable'
+        if seek_penalty is None:
+            return 'unknown'
+        return 'rotational' if seek_penalty else 'ssd'
+
+    def _windows_storage_properties(self, drive):
+        """(bus type, incurs seek penalty) of the disk behind a volume like 'C:'; None where unknown."""
+        import ctypes
+        from ctypes import wintypes
+
+        class STORAGE_PROPERTY_QUERY(ctypes.Structure):
+            _fields_ = [('PropertyId', wintypes.DWORD), ('QueryType', wintypes.DWORD),
+                        ('AdditionalParameters', wintypes.BYTE * 1)]
+
+        class STORAGE_DEVICE_DESCRIPTOR(ctypes.Structure):
+            _fields_ = [('Version', wintypes.DWORD), ('Size', wintypes.DWORD),
+                        ('DeviceType', wintypes.BYTE), ('DeviceTypeModifier', wintypes.BYTE),
+                        ('RemovableMedia', wintypes.BOOLEAN), ('CommandQueueing', wintypes.BOOLEAN),
+                        ('VendorIdOffset', wintypes.DWORD), ('ProductIdOffset', wintypes.DWORD),
+                        ('ProductRevisionOffset', wintypes.DWORD), ('SerialNumberOffset', wintypes.DWORD),
+                        ('BusType', wintypes.DWORD), ('RawPropertiesLength', wintypes.DWORD),
+                        ('RawDeviceProperties', wintypes.BYTE * 1)]
+
+        class DEVICE_SEEK_PENALTY_DESCRIPTOR(ctypes.Structure):
+            _fields_ = [('Version', wintypes.DWORD), ('Size', wintypes.DWORD),
+                        ('IncursSeekPenalty', wintypes.BOOLEAN)]
+
+        IOCTL_STORAGE_QUERY_PROPERTY = 0x2D1400
+        STORAGE_DEVICE_PROPERTY, STORAGE_DEVICE_SEEK_PENALTY_PROPERTY = 0, 7
+        FILE_SHARE_READ_WRITE, OPEN_EXISTING = 0x1 | 0x2, 3
+
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        kernel32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                         wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+        kernel32.DeviceIoControl.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD,
+                                             wintypes.LPVOID, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                             wintypes.LPVOID]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+        # Access 0: property queries don't need read rights (or admin)
+        handle = kernel32.CreateFileW(f"\\\\.\\{drive}", 0, FILE_SHARE_READ_WRITE, None, OPEN_EXISTING, 0, None)
+        if handle in (None, wintypes.HANDLE(-1).value):
+            return None, None
+
+        def query(property_id, descriptor):
+            request = STORAGE_PROPERTY_QUERY(property_id, 0)
+            returned = wintypes.DWORD()
+            ok = kernel32.DeviceIoControl(handle, IOCTL_STORAGE_QUERY_PROPERTY,
+                                          ctypes.byref(request), ctypes.sizeof(request),
+                                          ctypes.byref(descriptor), ctypes.sizeof(descriptor),
+                                          ctypes.byref(returned), None)
+            return descriptor if ok else None
+
+        try:
+            device = query(STORAGE_DEVICE_PROPERTY, STORAGE_DEVICE_DESCRIPTOR())
+            penalty = query(STORAGE_DEVICE_SEEK_PENALTY_PROPERTY, DEVICE_SEEK_PENALTY_DESCRIPTOR())
+        finally:
+            kernel32.CloseHandle(handle)
+        return (device.BusType if device else None,
+                bool(penalty.IncursSeekPenalty) if penalty else None)
+
+    # --- Slot handling ---
+    def _devices_for_paths(self, paths):
+        devices = {}
+        for p in paths:
+            if p:
+                info = self.device_for(p)
+                devices[info.dev_id] = info
+        return sorted(devices.values(), key=lambda d: d.dev_id)
+
+    def _has_capacity(self, devices):
+        return all(self._in_flight.get(d.dev_id, 0) < d.limit for d in devices)
+
+    def _take(self, devices):
+        for d in devices:
+            self._in_flight[d.dev_id] = self._in_flight.get(d.dev_id, 0) + 1
+
+    def _give_back(self, devices):
+        with self._cond:
+            for d in devices:
+                self._in_flight[d.dev_id] -= 1
+            self._cond.notify_all()
+
+    def _held(self):
+        held = getattr(self._local, 'held', None)
+        if held is None:
+            held = self._local.held = set()
+        return held
+
+    @contextmanager
+    def acquire(self, *paths):
+        """
+        Blocks until every device touched by paths has a free slot.
+        Re-entrant: devices already held by this thread are not counted twice.
+        """
+        held = self._held()
+        devices = [d for d in self._devices_for_paths(paths) if d.dev_id not in held]
+        with self._cond:
+            while not self._has_capacity(devices):
+                self._cond.wait()
+            self._take(devices)
+        held.update(d.dev_id for d in devices)
+        try:
+            yield
+        finally:
+            held.difference_update(d.dev_id for d in devices)
+            self._give_back(devices)
+
+    def try_acquire(self, *paths):
+        """
+        Non-blocking acquire for dispatchers that hand work to other processes.
+        Returns a token to pass to release(), or None if a device is saturated.
+        """
+        devices = self._devices_for_paths(paths)
+        with self._cond:
+            if not self._has_capacity(devices):
+                return None
+            self._take(devices)
+        return devices
+
+    def release(self, token):
+        """Releases slots taken with try_acquire()."""
+        if token:
+            self._give_back(token)
+
+    def _run_holding(self, devices, fn, item):
+        held = self._held()
+        held.update(d.dev_id for d in devices)
+        try:
+            return fn(item)
+        finally:
+            held.difference_update(d.dev_id for d in devices)
+
+    # --- Batches ---
+    def map(self, fn, items, paths, should_stop=None, tick=None, tick_interval=0.25):
+        """
+        Runs fn(item) for every item on worker threads, respecting device limits.
+        paths(item) -> (source_path, destination_path) used to group the work.
+        Yields (item, result, error) in the calling thread as jobs complete.
+        tick() is called from the calling thread while waiting (for progress UI).
+        should_stop() returning True stops dispatching new jobs.
+        """
+        groups = {}
+        group_order = []
+        for item in items:
+            src, dst = paths(item)
+            devices = self._devices_for_paths((src, dst))
+            key = tuple(d.dev_id for d in devices)
+            if key not in groups:
+                groups[key] = (devices, [])
+                group_order.append(key)
+            groups[key][1].append((item, src))
+
+        # Keep reads sequential on spinning disks: directory order, then inode order
+        queues = deque()
+        for key in group_order:
+            devices, jobs = groups[key]
+            if any(d.rotational for d in devices):
+                jobs.sort(key=lambda job: self._disk_order(job[1]))
+            queues.append((devices, deque(item for item, _ in jobs)))
+
+        total_slots = sum(d.limit for d in self._devices.values()) or 1
+        running = {}
+        pool = ThreadPoolExecutor(max_workers=total_slots)
+        try:
+            while queues or running:
+                stopping = should_stop is not None and should_stop()
+                if stopping:
+                    queues.clear()
+
+                # Round-robin over groups so every device gets work
+                dispatched = True
+                while dispatched and queues:
+                    dispatched = False
+                    for _ in range(len(queues)):
+                        devices, jobs = queues[0]
+                        queues.rotate(-1)
+                        with self._cond:
+                            if not self._has_capacity(devices):
+                                continue
+                            self._take(devices)
+                        item = jobs.popleft()
+                        running[pool.submit(self._run_holding, devices, fn, item)] = (item, devices)
+                        dispatched = True
+                    queues = deque(q for q in queues if q[1])
+
+                if not running:
+                    if queues:
+                        # Slots are held by acquire() callers elsewhere; wait for them
+                        with self._cond:
+                            self._cond.wait(tick_interval)
+                        if tick:
+                            tick()  # Their holders may need the calling thread's event loop to finish
+                    continue
+
+                done, _ = wait(list(running), timeout=tick_interval, return_when=FIRST_COMPLETED)
+                if tick:
+                    tick()
+                for future in done:
+                    item, devices = running.pop(future)
+                    self._give_back(devices)
+                    error = future.exception()
+                    yield item, (None if error else future.result()), error
+        finally:
+            # Consumer stopped early: let running jobs finish and release their slots
+            pool.shutdown(wait=True)
+            for item, devices in running.values():
+                self._give_back(devices)
+
+    def _disk_order(self, path):
+        try:
+            return (os.path.dirname(path), os.stat(path).st_ino)
+        except OSError:
+            return (os.path.dirname(path), 0)
+
+    def describe(self):
+        """Returns the devices seen so far (for logging/diagnostics)."""
+        with self._cond:
+            return list(self._devices.values())
+
+
+class ThroughputMeter:
+    """Thread-safe byte counter used to report aggregate MB/s across parallel copies."""
+    def __init__(self, total_bytes=0):
+        self.total_bytes = total_bytes
+        self.done_bytes = 0
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, n):
+        with self._lock:
+            self.done_bytes += n
+
+    def rate(self):
+        elapsed = time.perf_counter() - self._start
+        return self.done_bytes / elapsed if elapsed > 0 else 0.0
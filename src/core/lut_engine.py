@@ -0,0 +1,244 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from src.core.preview_cache import PreviewCache
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.preview_cache import PreviewCache
+
+
+LUT_TABLE_VERSION = 1
+LOADED_LUTS_MAX = 64
+
+
+class LutParseError(ValueError):
+    """Raised for .cube files that can't be understood."""
+
+
+class Lut:
+    """
+    A parsed 1D or 3D LUT. 3D tables are (N, N, N, 3) float32 indexed [r][g][b];
+    1D tables are (N, 3).
+    """
+    def __init__(self, table, domain_min=(0.0, 0.0, 0.0), domain_max=(1.0, 1.0, 1.0), title=""):
+        self.table = table
+        self.domain_min = np.asarray(domain_min, dtype=np.float32)
+        self.domain_max = np.asarray(domain_max, dtype=np.float32)
+        self.title = title
+
+    @property
+    def is_3d(self):
+        return self.table.ndim == 4
+
+    @property
+    def size(self):
+        return self.table.shape[0]
+
+    def apply(self, rgb, method="tetrahedral"):
+        """
+        Applies the LUT to a float (..., 3) RGB array in the LUT's domain and
+        returns a new float32 array. method: 'tetrahedral' | 'trilinear' (3D only).
+        """
+        rgb = np.asarray(rgb, dtype=np.float32)
+        shape = rgb.shape
+        span = np.where(self.domain_max > self.domain_min, self.domain_max - self.domain_min, 1.0)
+        pos = np.clip((rgb.reshape(-1, 3) - self.domain_min) / span, 0.0, 1.0) * (self.size - 1)
+
+        if not self.is_3d:
+            grid = np.arange(self.size, dtype=np.float32)
+            out = np.stack([np.interp(pos[:, c], grid, self.table[:, c]) for c in range(3)], axis=1)
+            return out.astype(np.float32).reshape(shape)
+
+        n = self.size
+        base = np.minimum(pos.astype(np.intp), n - 2)
+        frac = pos - base
+        flat = self.table.reshape(-1, 3)
+        strides = np.array((n * n, n, 1), dtype=np.intp)
+        origin = base @ strides
+
+        if method == "trilinear":
+            out = np.zeros_like(pos)
+            for dr in (0, 1):
+                wr = frac[:, 0] if dr else 1.0 - frac[:, 0]
+                for dg in (0, 1):
+                    wg = frac[:, 1] if dg else 1.0 - frac[:, 1]
+                    for db in (0, 1):
+                        wb = frac[:, 2] if db else 1.0 - frac[:, 2]
+                        corner = flat[origin + dr * strides[0] + dg * strides[1] + db * strides[2]]
+                        out += corner * (wr * wg * wb)[:, None]
+            return out.reshape(shape)
+
+        # Tetrahedral: walk from the cell origin along axes in order of decreasing fraction
+        order = np.argsort(-frac, axis=1)
+        f = np.take_along_axis(frac, order, axis=1)
+        step1 = strides[order[:, 0]]
+        step2 = step1 + strides[order[:, 1]]
+        out = (
+            flat[origin] * (1.0 - f[:, 0])[:, None]
+            + flat[origin + step1] * (f[:, 0] - f[:, 1])[:, None]
+            + flat[origin + step2] * (f[:, 1] - f[:, 2])[:, None]
+            + flat[origin + strides.sum()] * f[:, 2][:, None]
+        )
+        return out.reshape(shape)
+
+
+def parse_cube(path):
+    """Parses an Adobe/Resolve .cube file into a Lut."""
+    title = ""
+    size_3d = size_1d = None
+    domain_min, domain_max = (0.0, 0.0, 0.0), (1.0, 1.0, 1.0)
+    data_lines = []
+
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == "#":
+                continue
+            head = line[0]
+            if head.isdigit() or head in "-+.":
+                data_lines.append(line)
+                continue
+            parts = line.split()
+            keyword = parts[0].upper()
+            try:
+                if keyword == "TITLE":
+                    title = line[5:].strip().strip('"')
+                elif keyword == "LUT_3D_SIZE":
+                    size_3d = int(parts[1])
+                elif keyword == "LUT_1D_SIZE":
+                    size_1d = int(parts[1])
+                elif keyword == "DOMAIN_MIN":
+                    domain_min = tuple(float(v) for v in parts[1:4])
+                elif keyword == "DOMAIN_MAX":
+                    domain_max = tuple(float(v) for v in parts[1:4])
+            except (IndexError, ValueError):
+                raise LutParseError(f"Bad {keyword} line in {path}")
+
+    # One C-level parse of every number instead of a float() per value
+    values = np.array(" ".join(data_lines).split(), dtype=np.float32)
+    if size_3d:
+        expected = size_3d ** 3 * 3
+        if len(values) != expected or size_3d < 2:
+            raise LutParseError(f"{path}: expected {expected} values for LUT_3D_SIZE {size_3d}, got {len(values)}")
+        # Red varies fastest in the file, so rows come out [b][g][r]
+        table = values.reshape(size_3d, size_3d, size_3d, 3).transpose(2, 1, 0, 3)
+        return Lut(np.ascontiguousarray(table), domain_min, domain_max, title)
+    if size_1d:
+        if len(values) != size_1d * 3 or size_1d < 2:
+            raise LutParseError(f"{path}: expected {size_1d * 3} values for LUT_1D_SIZE {size_1d}")
+        return Lut(values.reshape(size_1d, 3), domain_min, domain_max, title)
+    raise LutParseError(f"{path}: no LUT_3D_SIZE or LUT_1D_SIZE")
+
+
+class LutEngine:
+    """
+    Loads LUTs through a binary table cache: each .cube is parsed once and
+    stored as a .npy (header row, domain rows, table rows) that later loads
+    memory-mapped without any text parsing.
+    """
+    def __init__(self, cache_dir="cache/luts"):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._loaded = OrderedDict()  # cube path -> (cache key, Lut)
+
+    def _table_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npy")
+
+    def load(self, cube_path):
+        """Returns a Lut for cube_path, or None if it can't be parsed."""
+        key = PreviewCache.make_key(cube_path, {"kind": "lut-table", "version": LUT_TABLE_VERSION})
+        hit = self._loaded.get(cube_path)
+        if hit and hit[0] == key:
+            self._loaded.move_to_end(cube_path)
+            return hit[1]
+
+        table_path = self._table_path(key)
+        lut = None
+        if os.path.exists(table_path):
+            try:
+                lut = self._from_array(np.load(table_path, mmap_mode="r"))
+            except (OSError, ValueError) as e:
+                print(f"LUT cache: discarding unreadable {table_path}: {e}")
+        if lut is None:
+            try:
+                lut = parse_cube(cube_path)
+            except (OSError, LutParseError) as e:
+                print(f"LUT parse error: {e}")
+                return None
+            self._store(table_path, lut)
+
+        self._loaded[cube_path] = (key, lut)
+        while len(self._loaded) > LOADED_LUTS_MAX:
+            self._loaded.popitem(last=False)
+        return lut
+
+    def _store(self, table_path, lut):
+        header = np.array([[lut.table.ndim - 1, lut.size, 0]], dtype=np.float32)  # dims: 3 or 1
+        rows = np.concatenate((header, lut.domain_min[None], lut.domain_max[None], lut.table.reshape(-1, 3)))
+        os.makedirs(os.path.dirname(table_path), exist_ok=True)
+        tmp_path = table_path + ".tmp.npy"
+        np.save(tmp_path, rows)
+        os.replace(tmp_path, table_path)
+
+    @staticmethod
+    def _from_array(rows):
+        dims, size = int(rows[0, 0]), int(rows[0, 1])
+        body = rows[3:]
+        if dims == 3 and len(body) == size ** 3:
+            return Lut(body.reshape(size, size, size, 3), rows[1], rows[2])
+        if dims == 1 and len(body) == size:
+            return Lut(body, rows[1], rows[2])
+        raise ValueError("table shape does not match header")
+
+
+def reference_still(width=320, height=180):
+    """
+    Synthetic reference frame for LUT previews, as float32 (h, w, 3) in 0..1:
+    a hue sweep (saturation rising, then value falling, top to bottom),
+    a row of skin-tone patches and a grey ramp.
+    """
+    sweep_h = int(height * 0.65)
+    skin_h = int(height * 0.15)
+    ramp_h = height - sweep_h - skin_h
+
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)
+    y = np.linspace(0.0, 1.0, sweep_h, dtype=np.float32)[:, None]
+    hue = np.broadcast_to(x * 6.0, (sweep_h, width))
+    sat = np.clip(y * 2.0, 0.0, 1.0)
+    val = np.clip(2.0 - y * 2.0, 0.0, 1.0) * 0.9 + 0.1
+    # HSV -> RGB, vectorized
+    k = (np.array([5.0, 3.0, 1.0], dtype=np.float32) + hue[..., None]) % 6.0
+    sweep = val[..., None] - (val * sat)[..., None] * np.clip(np.minimum(k, 4.0 - k), 0.0, 1.0)
+
+    skin_tones = np.array([
+        (0.96, 0.80, 0.69), (0.89, 0.68, 0.55), (0.78, 0.56, 0.42),
+        (0.63, 0.43, 0.30), (0.47, 0.31, 0.21), (0.33, 0.22, 0.15),
+    ], dtype=np.float32)
+    skin = skin_tones[np.minimum((x * len(skin_tones)).astype(np.intp), len(skin_tones) - 1)]
+    skin = np.broadcast_to(skin, (skin_h, width, 3))
+
+    ramp = np.broadcast_to(x[None, :, None], (ramp_h, width, 3))
+    return np.ascontiguousarray(np.concatenate((sweep, skin, ramp)), dtype=np.float32)
+
+
+def rgb_to_qimage(rgb):
+    """Converts a float (h, w, 3) 0..1 array to a QImage (RGB888)."""
+    from PyQt6.QtGui import QImage  # Imported lazily: the engine itself doesn't need Qt
+
+    pixels = np.ascontiguousarray((np.clip(rgb, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8))
+    height, width = pixels.shape[:2]
+    return QImage(pixels.data, width, height, width * 3, QImage.Format.Format_RGB888).copy()
+
+
+def qimage_to_rgb(image):
+    """Converts a QImage to a float32 (h, w, 3) 0..1 array."""
+    from PyQt6.QtGui import QImage
+
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    width, height, stride = image.width(), image.height(), image.bytesPerLine()
+    data = np.frombuffer(image.constBits().asstring(stride * height), dtype=np.uint8)
+    return data.reshape(height, stride)[:, :width * 3].reshape(height, width, 3).astype(np.float32) / 255.0
@@ -0,0 +1,356 @@
+import json
+import os
+import struct
+import subprocess
+
+# Header parsers read at most this much from the start of a file (the MP4 moov atom is found by seeking)
+HEADER_READ_BYTES = 64 * 1024
+MOOV_MAX_BYTES = 64 * 1024 * 1024
+FFPROBE_TIMEOUT = 30
+
+# MPEG audio: bitrate (kbit/s) by [version is MPEG1][layer], sample rates by version
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# JPEG start-of-frame markers (C4 DHT, C8 JPG and CC DAC share the range but aren't frames)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def probe(file_path):
+    """
+    Returns basic media info as a dict: format, duration (seconds), width, height,
+    sample_rate, channels and source ('header' or 'ffprobe'). Missing values are None.
+    MP4/MOV, WAV, MP3, PNG and JPEG are read from their headers in-process;
+    anything else (or a header we can't make sense of) goes to ffprobe.
+    Returns None if the file can't be read at all.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(HEADER_READ_BYTES)
+            parser = _parser_for(head, os.path.splitext(file_path)[1].lower())
+            if parser is not None:
+                info = parser(f, head, os.fstat(f.fileno()).st_size)
+                if info is not None:
+                    return _result(info, "header")
+    except OSError as e:
+        print(f"Probe error for {file_path}: {e}")
+        return None
+    except (struct.error, ValueError, IndexError):
+        pass  # Malformed header: let ffprobe have a go
+    return ffprobe(file_path)
+
+
+def probe_duration(file_path):
+    """Duration in seconds, or None if unknown."""
+    info = probe(file_path)
+    return info["duration"] if info else None
+
+
+def _result(values, source):
+    info = {"format": None, "duration": None, "width": None, "height": None,
+            "sample_rate": None, "channels": None}
+    info.update(values)
+    info["source"] = source
+    return info
+
+
+def _parser_for(head, ext):
+    """Picks a parser by magic bytes, then by extension."""
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return _probe_png
+    if head[:3] == b"\xff\xd8\xff":
+        return _probe_jpeg
+    if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+        return _probe_wav
+    if head[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip"):
+        return _probe_mp4
+    if head[:3] == b"ID3" or ext == ".mp3":
+        return _probe_mp3
+    return None
+
+
+# --- Stills ---
+def _probe_png(f, head, file_size):
+    if head[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", head[16:24])
+    return {"format": "png", "width": width, "height": height}
+
+
+def _probe_jpeg(f, head, file_size):
+    # Segments before the frame header can be large (EXIF thumbnails), so walk them by seeking
+    pos = 2
+    while pos + 4 <= file_size:
+        f.seek(pos)
+        segment = f.read(9)
+        if len(segment) < 4 or segment[0] != 0xFF:
+            return None
+        marker = segment[1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:  # No length field
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):  # End of image / start of scan before any frame header
+            return None
+        if marker in _JPEG_SOF:
+            if len(segment) < 9:
+                return None
+            height, width = struct.unpack(">HH", segment[5:9])
+            return {"format": "jpeg", "width": width, "height": height}
+        pos += 2 + struct.unpack(">H", segment[2:4])[0]
+    return None
+
+
+# --- Audio ---
+def _probe_wav(f, head, file_size):
+    pos = 12
+    fmt = None
+    data_size = None
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack("<HHIIHH", f.read(16))
+        elif chunk_id == b"ds64":  # RF64: real sizes live here
+            data_size = struct.unpack("<QQ", f.read(16))[1]
+        elif chunk_id == b"data":
+            if data_size is None or size != 0xFFFFFFFF:
+                data_size = size
+            # Truncated files (or streamed WAVs with a placeholder size) end early
+            data_size = min(data_size, file_size - pos - 8)
+            break
+        pos += 8 + size + (size & 1)  # Chunks are word aligned
+
+    if fmt is None:
+        return None
+    _, channels, sample_rate, byte_rate, _, _ = fmt
+    duration = data_size / byte_rate if data_size is not None and byte_rate else None
+    return {"format": "wav", "duration": duration, "sample_rate": sample_rate, "channels": channels}
+
+
+def _mp3_frame(header):
+    """Decodes a 4-byte MPEG audio frame header: (is_mpeg1, layer, bitrate, sample_rate, padding, mono) or None."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3
+    layer = 4 - ((header[1] >> 1) & 3)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    is_mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(is_mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    return is_mpeg1, layer, bitrate, sample_rate, (header[2] >> 1) & 1, header[3] >> 6 == 3
+
+
+def _mp3_frame_length(is_mpeg1, layer, bitrate, sample_rate, padding):
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4
+    if layer == 3 and not is_mpeg1:
+        return 72 * bitrate // sample_rate + padding
+    return 144 * bitrate // sample_rate + padding
+
+
+def _probe_mp3(f, head, file_size):
+    start = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        # Synchsafe tag size, plus the optional 10-byte footer
+        size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        start = 10 + size + (10 if head[5] & 0x10 else 0)
+        f.seek(start)
+        head = f.read(HEADER_READ_BYTES)
+        if len(head) < 4:
+            return None
+
+    # Find a frame header whose successor is also a frame header (guards against false syncs)
+    offset = head.find(b"\xff")
+    frame = None
+    while 0 <= offset < len(head) - 4:
+        frame = _mp3_frame(head[offset:offset + 4])
+        if frame:
+            length = _mp3_frame_length(*frame[:5])
+            following = head[offset + length:offset + length + 4]
+            if len(following) < 4 or _mp3_frame(following):
+                break
+        frame = None
+        offset = head.find(b"\xff", offset + 1)
+    if frame is None:
+        return None
+
+    is_mpeg1, layer, bitrate, sample_rate, _, mono = frame
+    samples_per_frame = 384 if layer == 1 else (1152 if layer == 2 or is_mpeg1 else 576)
+    frame_count = None
+
+    # VBR files carry a frame count in a Xing/Info or VBRI header inside the first frame
+    side_info = (17 if mono else 32) if is_mpeg1 else (9 if mono else 17)
+    xing = offset + 4 + side_info
+    if head[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", head[xing + 4:xing + 8])[0]
+        if flags & 1:
+            frame_count = struct.unpack(">I", head[xing + 8:xing + 12])[0]
+    elif head[offset + 36:offset + 40] == b"VBRI":
+        frame_count = struct.unpack(">I", head[offset + 50:offset + 54])[0]
+
+    if frame_count:
+        duration = frame_count * samples_per_frame / sample_rate
+    else:
+        audio_bytes = file_size - start - offset
+        f.seek(max(0, file_size - 128))
+        if f.read(3) == b"TAG":  # ID3v1 trailer
+            audio_bytes -= 128
+        duration = audio_bytes * 8 / bitrate
+    return {"format": "mp3", "duration": duration, "sample_rate": sample_rate, "channels": 1 if mono else 2}
+
+
+# --- MP4 / QuickTime ---
+def _atoms(data, start=0, end=None):
+    """Yields (type, payload start, payload end) for the atoms in data[start:end]."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[pos + 8:pos + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _find_moov(f, file_size):
+    """Walks the top-level atoms by seeking (mdat is never read) and returns the moov payload."""
+    pos = 0
+    major_brand = None
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            return None, major_brand
+        size, kind = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header_size:
+            return None, major_brand
+        if kind == b"ftyp":
+            major_brand = header[8:12]
+        elif kind == b"moov":
+            if size > MOOV_MAX_BYTES:
+                return None, major_brand
+            f.seek(pos + header_size)
+            return f.read(size - header_size), major_brand
+        pos += size
+    return None, major_brand
+
+
+def _probe_mp4(f, head, file_size):
+    moov, major_brand = _find_moov(f, file_size)
+    if moov is None:
+        return None
+    info = {"format": "mov" if major_brand == b"qt  " else "mp4"}
+
+    for kind, start, end in _atoms(moov):
+        if kind == b"mvhd":
+            if moov[start] == 1:
+                timescale, duration = struct.unpack(">IQ", moov[start + 20:start + 32])
+            else:
+                timescale, duration = struct.unpack(">II", moov[start + 12:start + 20])
+            if timescale and duration not in (0, 0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+                info["duration"] = duration / timescale
+        elif kind == b"trak":
+            _read_track(moov, start, end, info)
+    return info
+
+
+def _read_track(data, start, end, info):
+    width = height = 0
+    handler = None
+    sample_entry = None
+    for kind, s, e in _atoms(data, start, end):
+        if kind == b"tkhd":
+            # Width/height are the last 8 bytes, as 16.16 fixed point
+            width, height = struct.unpack(">II", data[e - 8:e])
+            width, height = width >> 16, height >> 16
+        elif kind == b"mdia":
+            for mkind, ms, me in _atoms(data, s, e):
+                if mkind == b"hdlr":
+                    handler = data[ms + 8:ms + 12]
+                elif mkind == b"minf":
+                    sample_entry = _sample_entry(data, ms, me)
+
+    if handler == b"vide" and width and height and info.get("width") is None:
+        info["width"], info["height"] = width, height
+    elif handler == b"soun" and sample_entry and info.get("sample_rate") is None:
+        # AudioSampleEntry: 8 reserved/ref bytes, version, revision, vendor, then channels ... rate (16.16)
+        channels = struct.unpack(">H", sample_entry[16:18])[0]
+        rate = struct.unpack(">I", sample_entry[24:28])[0] >> 16
+        info["channels"] = channels or None
+        info["sample_rate"] = rate or None
+
+
+def _sample_entry(data, start, end):
+    """Returns the first stsd sample entry payload under minf/stbl, or None."""
+    for kind, s, e in _atoms(data, start, end):
+        if kind == b"stbl":
+            for skind, ss, se in _atoms(data, s, e):
+                if skind == b"stsd":
+                    # version/flags (4), entry count (4), then size (4) + format (4) of the first entry
+                    entry = ss + 8
+                    if entry + 8 <= se:
+                        return data[entry + 8:se]
+    return None
+
+
+# --- Fallback ---
+def ffprobe(file_path, timeout=FFPROBE_TIMEOUT):
+    """Probes with the ffprobe binary (slow: one process per file). Returns the same dict as probe(), or None."""
+    cmd = ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", file_path]
+    # On Windows, prevent cmd window from popping up
+    startupinfo = None
+    if os.name == "nt":
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout, startupinfo=startupinfo)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"ffprobe failed for {file_path}: {e}")
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return None
+
+    info = {"format": (data.get("format", {}).get("format_name") or "").split(",")[0] or None}
+    try:
+        info["duration"] = float(data["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and "width" not in info:
+            info["width"], info["height"] = stream.get("width"), stream.get("height")
+        elif stream.get("codec_type") == "audio" and "sample_rate" not in info:
+            info["sample_rate"] = int(stream.get("sample_rate") or 0) or None
+            info["channels"] = stream.get("channels")
+    return _result(info, "ffprobe")
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class PreviewCache:
+    """
+    Content-keyed, sharded preview cache with an LRU byte budget.
+
+    Keys are derived from the source path, size and mtime plus the render
+    parameters, so renamed/edited sources never collide or go stale.
+    Files live under cache_dir/ab/cd/<key><ext>; an SQLite index (WAL, safe to
+    share between processes) tracks sizes, last access and hit/miss stats.
+    Lookups only note their access time and counters in memory; they are
+    written in one transaction every FLUSH_EVERY lookups / FLUSH_INTERVAL
+    seconds, and before anything reads them (evict, stats, close).
+    Evicted files are listed in the index until take_evicted() hands them to
+    whoever keeps paths to them (the library DB).
+    """
+    DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+    FLUSH_EVERY = 64
+    FLUSH_INTERVAL = 2.0  # Seconds
+    RESYNC_EVERY = 256  # Records between re-reading the byte total other processes add to
+
+    def __init__(self, cache_dir="cache/previews", max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending_touches = {}  # entry key -> (path, last access)
+        self._pending_counts = {}  # stat name -> increment
+        self._pending_lookups = 0
+        self._last_flush = time.monotonic()
+
+        self.conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.db"), timeout=30, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                rel_path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO stats (name, value) VALUES (?, 0)',
+            [(name,) for name in ("hits", "misses", "evictions")],
+        )
+        self.conn.execute('CREATE TABLE IF NOT EXISTS evicted (rel_path TEXT PRIMARY KEY)')
+        self.conn.commit()
+        self._bytes = self._sum_bytes()  # Running total, so record() needn't SUM the index
+        self._records = 0
+
+    # --- Keys & paths ---
+    @staticmethod
+    def make_key(file_path, params=None):
+        """Returns the cache key for a source file and render parameters."""
+        abs_path = os.path.abspath(file_path)
+        try:
+            st = os.stat(abs_path)
+            size, mtime = st.st_size, st.st_mtime_ns
+        except OSError:
+            size, mtime = -1, -1
+        fingerprint = json.dumps(
+            [abs_path.replace("\\", "/"), size, mtime, params or {}], sort_keys=True
+        )
+        return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+    def path_for_key(self, key, ext=".jpg", create=True):
+        """Sharded location for a key; parent folders are created on demand."""
+        shard = os.path.join(self.cache_dir, key[:2], key[2:4])
+        if create:
+            os.makedirs(shard, exist_ok=True)
+        return os.path.join(shard, key + ext)
+
+    # --- Lookup / store ---
+    def lookup(self, key, ext=".jpg"):
+        """Returns the cached file path for key, or None on a miss."""
+        path = self.path_for_key(key, ext, create=False)
+        hit = os.path.exists(path)
+        with self._lock:
+            if hit:
+                self._pending_touches[os.path.basename(path)] = (path, time.time())
+            self._add_count("hits" if hit else "misses")
+            self._pending_lookups += 1
+            if (self._pending_lookups >= self.FLUSH_EVERY
+                    or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+                self._flush_locked()
+        return path if hit else None
+
+    def record(self, key, path):
+        """Registers a freshly written cache file and enforces the byte budget."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        rel_path = os.path.relpath(path, self.cache_dir)
+        entry_key = os.path.basename(path)
+        with self._lock:
+            old = self.conn.execute('SELECT size FROM entries WHERE key = ?', (entry_key,)).fetchone()
+            # Indexed by file name: one key can own several renders (poster, filmstrip...)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO entries (key, rel_path, size, last_access) VALUES (?, ?, ?, ?)',
+                (entry_key, rel_path, size, time.time()),
+            )
+            self.conn.execute('DELETE FROM evicted WHERE rel_path = ?', (rel_path,))
+            self._flush_locked()  # Buffered lookups ride along in the same transaction
+            self.conn.commit()
+            self._bytes += size - (old[0] if old else 0)
+            self._records += 1
+            if self._records >= self.RESYNC_EVERY:
+                self._flush_locked()
+                self._bytes = self._sum_bytes()
+                self._records = 0
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def flush(self):
+        """Writes the buffered access times and counters to the index."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        touches, self._pending_touches = self._pending_touches, {}
+        counts, self._pending_counts = self._pending_counts, {}
+        self._pending_lookups = 0
+        self._last_flush = time.monotonic()
+        if not touches and not counts:
+            return
+        for entry_key, (path, last_access) in touches.items():
+            cur = self.conn.execute(
+                'UPDATE entries SET last_access = ? WHERE key = ?', (last_access, entry_key)
+            )
+            if cur.rowcount == 0:
+                # File written by another process/older build: adopt it into the index
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue  # Evicted since the lookup
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, rel_path, size, last_access) VALUES (?, ?, ?, ?)',
+                    (entry_key, os.path.relpath(path, self.cache_dir), size, last_access),
+                )
+                self._bytes += size
+        self.conn.executemany(
+            'UPDATE stats SET value = value + ? WHERE name = ?', [(n, name) for name, n in counts.items()]
+        )
+        self.conn.commit()
+
+    # --- Eviction ---
+    def _sum_bytes(self):
+        return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def total_bytes(self):
+        """Size of every indexed file, including what other processes added."""
+        with self._lock:
+            self._flush_locked()  # Adopted files count too
+            self._bytes = self._sum_bytes()
+            self._records = 0
+        return self._bytes
+
+    def evict(self, max_bytes=None):
+        """
+        Deletes least recently used entries until the cache fits the budget.
+        Their paths are kept for take_evicted().
+        """
+        budget = max_bytes if max_bytes is not None else self.max_bytes
+        total = self.total_bytes()
+        if total <= budget:
+            return 0
+
+        # Evict down to 90% so we don't churn on every new preview
+        target = int(budget * 0.9)
+        removed = 0
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT key, rel_path, size FROM entries ORDER BY last_access ASC'
+            ).fetchall()
+            doomed = []
+            for key, rel_path, size in rows:
+                if total <= target:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, rel_path))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Preview cache: could not evict {rel_path}: {e}")
+                    continue
+                doomed.append((key, rel_path))
+                total -= size
+                removed += 1
+            self.conn.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key, _ in doomed])
+            self.conn.executemany('INSERT OR IGNORE INTO evicted (rel_path) VALUES (?)',
+                                  [(rel_path,) for _, rel_path in doomed])
+            self._add_count("evictions", removed)
+            self.conn.commit()
+            self._bytes = total
+        return removed
+
+    def take_evicted(self):
+        """
+        Paths (as path_for_key builds them) of files evicted since the last
+        call, by any process sharing the index. Each is handed out once.
+        """
+        with self._lock:
+            rows = self.conn.execute('SELECT rel_path FROM evicted').fetchall()
+            if not rows:
+                return []
+            self.conn.executemany('DELETE FROM evicted WHERE rel_path = ?', rows)
+            self.conn.commit()
+        paths = (os.path.join(self.cache_dir, rel_path) for rel_path, in rows)
+        return [path for path in paths if not os.path.exists(path)]  # Not rendered again meanwhile
+
+    # --- Stats ---
+    def _add_count(self, name, n=1):
+        # Caller holds the lock
+        if n:
+            self._pending_counts[name] = self._pending_counts.get(name, 0) + n
+
+    def get_stats(self):
+        """Returns a dict with hits, misses, evictions, hit_rate, entries and bytes."""
+        with self._lock:
+            self._flush_locked()
+            stats = dict(self.conn.execute('SELECT name, value FROM stats').fetchall())
+            entries, size = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = stats.get("hits", 0) / lookups if lookups else 0.0
+        stats["entries"] = entries
+        stats["bytes"] = size
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+        self.conn.close()
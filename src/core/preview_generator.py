@@ -1,47 +1,117 @@
 import os
+import uuid
 import zipfile
-import ffmpeg
+from multiprocessing import util as mp_util
+import numpy as np
+from contextlib import nullcontext
 from pathlib import Path
 
+try:
+    from src.core.preview_cache import PreviewCache
+    from src.core.waveform import compute_peaks, PEAKS_EXT, PEAKS_SAMPLE_RATE, PEAKS_BASE_BLOCK
+    from src.core.lut_engine import LutEngine, reference_still, rgb_to_qimage
+    from src.core.media_probe import probe_duration
+    from src.core.decoders import DecodeError, get_decoder
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.preview_cache import PreviewCache
+    from src.core.waveform import compute_peaks, PEAKS_EXT, PEAKS_SAMPLE_RATE, PEAKS_BASE_BLOCK
+    from src.core.lut_engine import LutEngine, reference_still, rgb_to_qimage
+    from src.core.media_probe import probe_duration
+    from src.core.decoders import DecodeError, get_decoder
+
+# Render parameters are part of the cache key: changing them invalidates old previews
+VIDEO_PREVIEW_PARAMS = {"kind": "poster", "width": 320, "select": "keyframes-scored", "candidates": 6}
+AUDIO_PREVIEW_PARAMS = {"kind": "peaks", "rate": PEAKS_SAMPLE_RATE, "block": PEAKS_BASE_BLOCK}
+IMAGE_PREVIEW_PARAMS = {"kind": "still", "max_width": 320, "max_height": 240}
+LUT_PREVIEW_PARAMS = {"kind": "lut-still", "width": 320, "height": 180, "method": "tetrahedral"}
+FILMSTRIP_FRAMES = 10
+FILMSTRIP_FRAME_WIDTH = 180
+
+# Smart poster: candidate positions (fraction of duration) and the tiny grey size they are scored at
+POSTER_CANDIDATES = (0.1, 0.25, 0.4, 0.55, 0.7, 0.85)
+POSTER_FALLBACK_TIMES = (0, 1, 3, 6, 12, 30)  # Seconds, when duration is unknown (seeks clamp at the end)
+POSTER_SCORE_SIZE = (64, 36)
+
+PREVIEW_FILE_TYPES = ('video', 'audio', 'image', 'lut')
+
+# Stills that commonly carry alpha (overlays, lower thirds) keep it in a PNG thumbnail
+ALPHA_IMAGE_EXTS = {'.png', '.tif', '.tiff'}
+
 class PreviewGenerator:
-    def __init__(self, cache_dir="cache/previews"):
+    def __init__(self, cache_dir="cache/previews", io_scheduler=None, max_cache_bytes=None, decoder=None):
         self.cache_dir = cache_dir
+        self.io_scheduler = io_scheduler
+        # Backend name from config ('ffmpeg' | 'pyav') or a DecoderBackend instance
+        self.decoder = decoder if hasattr(decoder, 'save_frame') else get_decoder(decoder)
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        self.cache = PreviewCache(self.cache_dir, max_bytes=max_cache_bytes)
+        # Parsed LUT tables live beside the preview cache (cache/luts for cache/previews)
+        self.lut_engine = LutEngine(os.path.join(os.path.dirname(os.path.abspath(self.cache_dir)), "luts"))
+        self._reference_still = None
+
+    def _io_slot(self, file_path):
+        """Reserves a per-device I/O slot for reading file_path and writing the cache."""
+        if self.io_scheduler is None:
+            return nullcontext()
+        return self.io_scheduler.acquire(file_path, self.cache_dir)
 
-    def generate_preview(self, file_path, file_type):
-        """Generates a preview image for the file and returns the path to the image."""
+    def _preview_key(self, file_path, file_type):
+        """Returns (cache key, extension) for the current render params, or None if the type has no preview."""
+        params = {
+            'video': VIDEO_PREVIEW_PARAMS,
+            'audio': AUDIO_PREVIEW_PARAMS,
+            'image': IMAGE_PREVIEW_PARAMS,
+            'lut': LUT_PREVIEW_PARAMS,
+        }.get(file_type)
+        if params is None:
+            return None
+        out_ext = '.jpg'
+        if file_type == 'image' and Path(file_path).suffix.lower() in ALPHA_IMAGE_EXTS:
+            out_ext = '.png'
+        elif file_type == 'audio':
+            out_ext = PEAKS_EXT
+        return self.cache.make_key(file_path, params), out_ext
+
+    def expected_preview_path(self, file_path, file_type):
+        """Where the current settings put this file's preview (it may not exist yet), or None."""
+        key = self._preview_key(file_path, file_type)
+        if key is None:
+            return None
+        return self.cache.path_for_key(key[0], key[1], create=False)
+
+    def generate_preview(self, file_path, file_type, force=False):
+        """
+        Generates a preview image for the file and returns the path to the image.
+        force: render again even if the cache already has this preview.
+        """
         filename = Path(file_path).name
-        output_path = os.path.join(self.cache_dir, f"{filename}.jpg")
-        
-        if os.path.exists(output_path):
-            return output_path
+        key = self._preview_key(file_path, file_type)
+        render_path = None
+        if key is not None:
+            key, out_ext = key
+            cached = None if force else self.cache.lookup(key, out_ext)
+            if cached:
+                return cached
+            output_path = self.cache.path_for_key(key, out_ext)
+            # Rendered beside it and swapped in on success: a failed (forced) render keeps the old preview
+            render_path = f"{os.path.splitext(output_path)[0]}.{uuid.uuid4().hex[:8]}{out_ext}"
 
         try:
             if file_type == 'video':
-                # Generate thumbnail at 1 second mark or 00:00:01
-                (
-                    ffmpeg
-                    .input(file_path, ss='00:00:01')
-                    .filter('scale', 320, -1)
-                    .output(output_path, vframes=1)
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
-                return output_path
-                return output_path
+                with self._io_slot(file_path):
+                    ok = self._generate_video_poster(file_path, render_path)
+                if not ok:
+                    return None
+                return self._publish(key, render_path, output_path)
             
             elif file_type == 'audio':
-                # Generate waveform using showwavespic
-                # Colors: cyan on dark background (or transparent)
-                # s=320x120 to match grid aspect ratio roughly
-                (
-                    ffmpeg
-                    .input(file_path)
-                    .filter('showwavespic', s='320x240', colors='#007acc')
-                    .output(output_path, vframes=1)
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
-                return output_path
+                # Peak data instead of a picture: drawn at whatever size the view needs
+                with self._io_slot(file_path):
+                    compute_peaks(file_path, decoder=self.decoder).save(render_path)
+                return self._publish(key, render_path, output_path)
                 try:
                     with zipfile.ZipFile(file_path, 'r') as z:
                         file_list = z.namelist()
@@ -79,14 +149,199 @@ class PreviewGenerator:
                     return None
             
             elif file_type == 'image':
-                # Just return the original path or copy it (resizing would be better but keep it simple)
-                return file_path
+                with self._io_slot(file_path):
+                    ok = self._generate_image_thumbnail(file_path, render_path)
+                if not ok:
+                    return None
+                return self._publish(key, render_path, output_path)
+
+            elif file_type == 'lut':
+                if not self._generate_lut_preview(file_path, render_path):
+                    return None
+                return self._publish(key, render_path, output_path)
                 
-        except ffmpeg.Error as e:
-            print(f"FFmpeg error for {file_path}: {e.stderr.decode('utf8')}")
+        except DecodeError as e:
+            print(f"Decode error ({self.decoder.name}) for {file_path}: {e}")
             return None
         except Exception as e:
             print(f"Preview generation error for {file_path}: {e}")
             return None
+        finally:
+            if render_path and os.path.exists(render_path):
+                os.remove(render_path)  # Failed half-way
         
         return None
+
+    def _publish(self, key, render_path, output_path):
+        """Moves a finished render over the cached preview and indexes it."""
+        if not os.path.exists(render_path):
+            return None
+        os.replace(render_path, output_path)
+        self.cache.record(key, output_path)
+        return output_path
+
+    def _generate_video_poster(self, file_path, output_path):
+        """
+        Picks a poster among a few keyframes (decoded with skip_frame=nokey, so no
+        GOP is walked) and writes it. Falls back to a plain seek for odd files.
+        """
+        duration = probe_duration(file_path)
+        if duration:
+            times = [round(duration * f, 3) for f in POSTER_CANDIDATES]
+        else:
+            times = list(POSTER_FALLBACK_TIMES)
+
+        try:
+            best = times[self._pick_poster_frame(file_path, times)]
+            if self.decoder.save_frame(file_path, best, output_path, VIDEO_PREVIEW_PARAMS["width"]):
+                return True
+        except (DecodeError, ValueError) as e:
+            print(f"Smart poster failed for {file_path}, using a plain seek: {e}")
+
+        # Sub-second clips have nothing at 1s: retry from the first frame
+        for seek in (1, 0):
+            try:
+                if self.decoder.save_frame(file_path, seek, output_path, VIDEO_PREVIEW_PARAMS["width"], keyframe=False):
+                    return True
+            except DecodeError:
+                continue
+        return False
+
+    def _pick_poster_frame(self, file_path, times):
+        """Returns the index into times of the best-looking keyframe."""
+        width, height = POSTER_SCORE_SIZE
+        frames = self.decoder.keyframes_gray(file_path, times, width, height)
+        if not len(frames):
+            raise ValueError("no keyframes decoded")
+        return int(np.argmax(score_poster_frames(frames)))
+
+    def _generate_image_thumbnail(self, file_path, output_path):
+        """
+        Writes a downscaled still. Qt decodes straight to the target size
+        (JPEG uses DCT scaling), so a 6K frame never lands in memory at full size.
+        Formats Qt can't read (e.g. DPX) go through the decoder backend.
+        """
+        # Imported lazily: Qt isn't needed for video/audio previews
+        from PyQt6.QtGui import QImageReader
+        from PyQt6.QtCore import QSize, Qt
+
+        max_size = QSize(IMAGE_PREVIEW_PARAMS["max_width"], IMAGE_PREVIEW_PARAMS["max_height"])
+        reader = QImageReader(file_path)
+        reader.setAutoTransform(True)
+        if reader.canRead():
+            size = reader.size()
+            if size.isValid() and (size.width() > max_size.width() or size.height() > max_size.height()):
+                reader.setScaledSize(size.scaled(max_size, Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+            if not image.isNull():
+                # Readers that ignore setScaledSize still hand back a full frame
+                if image.width() > max_size.width() or image.height() > max_size.height():
+                    image = image.scaled(
+                        max_size, Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation
+                    )
+                return image.save(output_path, quality=85)
+            print(f"Qt could not decode {file_path}: {reader.errorString()}")
+
+        return self.decoder.save_still(file_path, output_path, max_size.width(), max_size.height())
+
+    def _generate_lut_preview(self, file_path, output_path):
+        """Renders the LUT applied to the reference still."""
+        lut = self.lut_engine.load(file_path)
+        if lut is None:
+            return False
+        if self._reference_still is None:
+            self._reference_still = reference_still(LUT_PREVIEW_PARAMS["width"], LUT_PREVIEW_PARAMS["height"])
+        graded = lut.apply(self._reference_still, LUT_PREVIEW_PARAMS["method"])
+        return rgb_to_qimage(graded).save(output_path, quality=90)
+
+    def generate_filmstrip(self, file_path, frames=FILMSTRIP_FRAMES, frame_width=FILMSTRIP_FRAME_WIDTH):
+        """
+        Renders `frames` evenly spaced frames of a video into one horizontal
+        sprite sheet (one ffmpeg pass, or one seek per frame in-process).
+        Stored next to the poster.
+        Returns the sheet path, or None.
+        """
+        key = self.cache.make_key(file_path, VIDEO_PREVIEW_PARAMS)
+        ext = f".strip{frames}x{frame_width}.jpg"
+        cached = self.cache.lookup(key, ext)
+        if cached:
+            return cached
+        output_path = self.cache.path_for_key(key, ext)
+
+        duration = probe_duration(file_path)
+        if not duration or duration <= 0:
+            print(f"Filmstrip: could not read duration of {file_path}")
+            return None
+
+        try:
+            with self._io_slot(file_path):
+                self.decoder.save_filmstrip(file_path, duration, frames, frame_width, output_path)
+        except DecodeError as e:
+            print(f"Filmstrip decode error ({self.decoder.name}) for {file_path}: {e}")
+            return None
+        if not os.path.exists(output_path):
+            return None
+        self.cache.record(key, output_path)
+        return output_path
+
+
+def score_poster_frames(frames):
+    """
+    Scores (n, h, w) uint8 luma frames for use as a poster; higher is better.
+    Detail (std. deviation) counts most; near-black/white frames (fades, slates
+    on black, flash frames) and flat frames are pushed to the back.
+    """
+    luma = frames.reshape(len(frames), -1).astype(np.float32)
+    mean = luma.mean(axis=1)
+    std = luma.std(axis=1)
+    # Mid-tones are preferred: 1.0 at mid-grey, 0.0 at pure black/white
+    exposure = 1.0 - np.abs(mean - 128.0) / 128.0
+    score = std * (0.5 + exposure)
+    unusable = (mean < 16) | (mean > 240) | (std < 8)
+    return np.where(unusable, score - 1000.0, score)
+
+
+_worker_generator = None
+_worker_decoder = None
+_worker_max_cache_bytes = None
+
+def init_worker(decoder=None, max_cache_bytes=None):
+    """
+    Process pool initializer: picks the decoder backend and the preview cache
+    budget (preview_cache_max_bytes) of the worker's PreviewGenerator.
+    """
+    global _worker_decoder, _worker_max_cache_bytes
+    _worker_decoder = decoder
+    _worker_max_cache_bytes = max_cache_bytes
+    # Worker processes skip atexit; multiprocessing finalizers still run on a clean exit
+    mp_util.Finalize(None, _flush_worker_cache, exitpriority=10)
+
+
+def _flush_worker_cache():
+    if _worker_generator is not None:
+        _worker_generator.cache.flush()
+
+
+def _generator_for(cache_dir):
+    global _worker_generator
+    if _worker_generator is None or _worker_generator.cache_dir != cache_dir:
+        _flush_worker_cache()
+        _worker_generator = PreviewGenerator(cache_dir, max_cache_bytes=_worker_max_cache_bytes,
+                                             decoder=_worker_decoder)
+    return _worker_generator
+
+
+def render_preview_job(file_path, file_type, cache_dir="cache/previews", force=False):
+    """
+    Entry point for thumbnail worker processes.
+    Keeps one PreviewGenerator per process so the cache index connection is reused.
+    """
+    return _generator_for(cache_dir).generate_preview(file_path, file_type, force=force)
+
+
+def render_filmstrip_job(file_path, file_type, cache_dir="cache/previews"):
+    """Worker entry point for hover-scrub filmstrips (video only)."""
+    if file_type != 'video':
+        return None
+    return _generator_for(cache_dir).generate_filmstrip(file_path)
@@ -0,0 +1,199 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from src.core.preview_generator import PreviewGenerator, render_preview_job, init_worker, PREVIEW_FILE_TYPES
+    from src.core.io_scheduler import IOScheduler
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.preview_generator import PreviewGenerator, render_preview_job, init_worker, PREVIEW_FILE_TYPES
+    from src.core.io_scheduler import IOScheduler
+
+
+class PreviewWarmer:
+    """
+    Bulk preview (re)generation for a selection, a category subtree or the
+    whole library. Assets whose preview is already what the current render
+    settings would produce are skipped unless force is set; the rest are
+    rendered on a process pool and written back to the database. Jobs are
+    only handed to the pool while their source device has a free IOScheduler
+    slot, so a warm-up keeps to the same per-device limits as the thumbnail
+    service (and shares them when given the app's scheduler).
+    """
+    def __init__(self, db_manager, preview_generator=None, max_workers=None, io_scheduler=None):
+        self.db = db_manager
+        self.preview_generator = preview_generator or PreviewGenerator()
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.io_scheduler = io_scheduler or self.preview_generator.io_scheduler or IOScheduler()
+
+    # --- Selection ---
+    def collect(self, asset_ids=None, category=None):
+        """Assets with a preview type: by id, by category subtree, or everything when neither is given."""
+        if asset_ids:
+            assets = [self.db.get_asset_by_id(asset_id) for asset_id in asset_ids]
+        elif category:
+            assets = self.db.get_assets_in_category_tree(category)
+        else:
+            assets = self.db.get_all_assets()
+        return [a for a in assets if a and a.get('file_type') in PREVIEW_FILE_TYPES]
+
+    def is_current(self, asset):
+        """True if the asset's preview exists and matches the current render settings."""
+        preview_path = asset.get('preview_path')
+        if not preview_path or not os.path.exists(preview_path):
+            return False
+        expected = self.preview_generator.expected_preview_path(asset['file_path'], asset['file_type'])
+        if expected and os.path.abspath(preview_path) == os.path.abspath(expected):
+            return True
+        # Hand-picked previews (Set Preview Image...) live outside the cache: leave them alone
+        cache_root = os.path.abspath(self.preview_generator.cache_dir) + os.sep
+        return not os.path.abspath(preview_path).startswith(cache_root) and preview_path != asset['file_path']
+
+    # --- Run ---
+    def run(self, assets, force=False, progress_callback=None, should_stop=None):
+        """
+        Renders previews for assets in parallel.
+        progress_callback(done, total, eta_seconds) is called from the calling thread
+        (eta_seconds is None until the first result is in).
+        Returns a dict with rendered, skipped, failed, cancelled, seconds and
+        previews ({asset_id: preview_path} of what was rendered).
+        """
+        start = time.perf_counter()
+        todo = [a for a in assets if os.path.exists(a['file_path']) and (force or not self.is_current(a))]
+        summary = {
+            'rendered': 0,
+            'skipped': len(assets) - len(todo),
+            'failed': 0,
+            'cancelled': False,
+            'seconds': 0.0,
+            'previews': {},
+        }
+        total = len(todo)
+        done = 0
+        if progress_callback:
+            progress_callback(done, total, None)
+
+        cache_dir = self.preview_generator.cache_dir
+        pending = list(reversed(todo))
+        running = {}
+        # Spawned, not forked: by now the UI (or the thumbnail pool) has threads holding locks
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                 initializer=init_worker,
+                                 initargs=(self.preview_generator.decoder.name,
+                                           self.preview_generator.cache.max_bytes)) as pool:
+            while pending or running:
+                if should_stop is not None and should_stop():
+                    summary['cancelled'] = True
+                    pending.clear()
+                # Keep the queue short so cancelling doesn't have to wait for a long backlog
+                deferred = []
+                while pending and len(running) < self.max_workers * 2:
+                    asset = pending.pop()
+                    token = self.io_scheduler.try_acquire(asset['file_path'], cache_dir)
+                    if token is None:
+                        deferred.append(asset)  # Its device is saturated: try the next asset
+                        continue
+                    future = pool.submit(render_preview_job, asset['file_path'], asset['file_type'], cache_dir, force)
+                    running[future] = (asset, token)
+                pending.extend(reversed(deferred))
+                if not running:
+                    if not pending:
+                        break
+                    # Every device is busy with other work (imports, thumbnails); the progress
+                    # callback below keeps the caller's event loop turning so they can finish
+                    time.sleep(0.05)
+
+                finished, _ = wait(list(running), timeout=0.5, return_when=FIRST_COMPLETED) if running else ((), ())
+                for future in finished:
+                    asset, token = running.pop(future)
+                    self.io_scheduler.release(token)
+                    error = future.exception()
+                    preview_path = None if error else future.result()
+                    if preview_path:
+                        self.db.update_asset_preview(asset['id'], preview_path)
+                        summary['previews'][asset['id']] = preview_path
+                        summary['rendered'] += 1
+                    else:
+                        print(f"Preview failed for {asset['file_path']}: {error or 'no preview produced'}")
+                        old_path = asset.get('preview_path')
+                        if not (old_path and os.path.exists(old_path)):
+                            # A failed re-render leaves the old preview in place: keep showing it
+                            self.db.set_preview_state(asset['id'], 'failed')
+                        summary['failed'] += 1
+                    done += 1
+
+                if progress_callback:
+                    elapsed = time.perf_counter() - start
+                    eta = elapsed / done * (total - done) if done else None
+                    progress_callback(done, total, eta)
+
+        # Renders stored by the workers may have evicted other assets' previews
+        self.db.forget_cache_files(self.preview_generator.cache.take_evicted())
+        summary['seconds'] = time.perf_counter() - start
+        return summary
+
+
+def format_eta(seconds):
+    """Formats an ETA in seconds as 'm:ss' or 'h:mm:ss' ('--:--' if unknown)."""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds + 0.5)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def main(argv=None):
+    """Headless entry point: python main.py --warm-previews [--category X | --ids 1,2] [--force]"""
+    parser = argparse.ArgumentParser(prog="main.py --warm-previews",
+                                     description="Generate or refresh asset previews without the UI.")
+    parser.add_argument("--category", help="Only this folder and its subfolders (e.g. 'Textures/Wood')")
+    parser.add_argument("--ids", help="Comma-separated asset ids")
+    parser.add_argument("--force", action="store_true", help="Re-render previews that are already up to date")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--db", default="app_data.db", help="Library database (default: app_data.db)")
+    parser.add_argument("--cache-dir", default="cache/previews", help="Preview cache folder")
+    parser.add_argument("--decoder", default=None,
+                        help="Decoder backend: ffmpeg or pyav (default: decoder_backend in config.json)")
+    args = parser.parse_args(argv)
+
+    from src.database.db_manager import DBManager
+    from src.core.config import ConfigManager
+
+    db = DBManager(args.db)
+    config = ConfigManager()
+    decoder = args.decoder or config.get("decoder_backend")
+    io_scheduler = IOScheduler(
+        kind_limits=config.get("io_kind_limits"),
+        device_limits=config.get("io_device_limits"),
+    )
+    generator = PreviewGenerator(args.cache_dir, io_scheduler=io_scheduler, decoder=decoder)
+    warmer = PreviewWarmer(db, generator, max_workers=args.workers)
+    asset_ids = [int(i) for i in args.ids.split(",") if i.strip()] if args.ids else None
+    assets = warmer.collect(asset_ids=asset_ids, category=args.category)
+    print(f"Checking {len(assets)} assets...")
+
+    last_report = [0.0]
+
+    def report(done, total, eta):
+        now = time.perf_counter()
+        if done == total or now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(f"  {done}/{total}  ETA {format_eta(eta)}", flush=True)
+
+    try:
+        summary = warmer.run(assets, force=args.force, progress_callback=report)
+    except KeyboardInterrupt:
+        print("Interrupted.")
+        return 1
+    finally:
+        db.close()
+
+    print(f"Done in {summary['seconds']:.1f}s: {summary['rendered']} rendered, "
+          f"{summary['skipped']} already up to date, {summary['failed']} failed.")
+    return 1 if summary['failed'] else 0
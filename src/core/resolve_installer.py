@@ -67,7 +67,8 @@ class ResolveInstaller:
             # Also try to copy preview if it exists and follows Resolve naming convention?
             # Resolve uses .png sidecars sometimes.
             preview_path = asset_data.get('preview_path')
-            if preview_path and os.path.exists(preview_path):
+            if preview_path and os.path.exists(preview_path) and \
+                    Path(preview_path).suffix.lower() in ('.png', '.jpg', '.jpeg'):
                  dest_preview = target_dir / (file_path.stem + Path(preview_path).suffix)
                  shutil.copy2(preview_path, dest_preview)
             
@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, Qt
+
+try:
+    from src.core.preview_generator import render_preview_job, render_filmstrip_job, init_worker
+    from src.core.image_hash import hash_preview_job
+    from src.core.color_palette import palette_job
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.preview_generator import render_preview_job, render_filmstrip_job, init_worker
+    from src.core.image_hash import hash_preview_job
+    from src.core.color_palette import palette_job
+
+
+# Lower value = served first
+PRIORITY_VISIBLE = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BACKGROUND = 20
+
+# Job kinds -> worker entry point
+JOB_PREVIEW = 'preview'
+JOB_FILMSTRIP = 'filmstrip'
+JOB_HASH = 'hash'
+JOB_PALETTE = 'palette'
+_JOB_FUNCTIONS = {
+    JOB_PREVIEW: render_preview_job,
+    JOB_FILMSTRIP: render_filmstrip_job,
+    JOB_HASH: hash_preview_job,
+    JOB_PALETTE: palette_job,
+}
+
+# Failed previews are retried after 5s, 10s, 20s... up to MAX_ATTEMPTS tries in total
+RETRY_BASE_DELAY_MS = 5000
+MAX_ATTEMPTS = 4
+
+
+class ThumbnailService(QObject):
+    """
+    Background thumbnail farm around PreviewGenerator.
+
+    Requests go into a priority queue (visible items first), duplicates of
+    queued or running requests are merged, and jobs run on a process pool sized
+    to the CPU. Results arrive on the GUI thread through preview_ready /
+    preview_failed. Failed previews are retried with exponential backoff;
+    preview_failed is only emitted once the last attempt has failed.
+    """
+    preview_ready = pyqtSignal(int, str)   # asset_id, preview_path
+    preview_failed = pyqtSignal(int, str)  # asset_id, reason
+    preview_retry_scheduled = pyqtSignal(int, int, int)  # asset_id, failed attempts, delay_ms
+    filmstrip_ready = pyqtSignal(int, str) # asset_id, filmstrip_path
+    hash_ready = pyqtSignal(int, object)   # asset_id, (dhash, phash)
+    palette_ready = pyqtSignal(int, object) # asset_id, [(r, g, b, weight)]
+    queue_drained = pyqtSignal()
+
+    _job_finished = pyqtSignal(object, object, object, object)  # job, result, error, pool (worker -> GUI thread)
+
+    def __init__(self, cache_dir="cache/previews", io_scheduler=None, max_workers=None,
+                 max_attempts=MAX_ATTEMPTS, retry_delay_ms=RETRY_BASE_DELAY_MS, decoder=None,
+                 max_cache_bytes=None, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.decoder = decoder  # Decoder backend name for the workers (None = default)
+        self.max_cache_bytes = max_cache_bytes  # Preview cache budget for the workers (None = default)
+        self.io_scheduler = io_scheduler
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay_ms = retry_delay_ms
+
+        self._pool = None
+        self._heap = []                 # (priority, seq, job)
+        self._queued = {}               # job -> [priority, file_path, file_type]
+        self._running = {}              # job -> io token; job = (kind, asset_id)
+        self._job_args = {}             # running job -> (file_path, file_type, priority), kept for retries
+        self._attempts = {}             # job -> failed attempts so far
+        self._crashes = {}              # job -> times it was lost to a dead worker
+        self._retrying = set()          # jobs waiting out a backoff delay
+        self._seq = itertools.count()
+        self._closed = False
+
+        self._job_finished.connect(self._on_job_finished, Qt.ConnectionType.QueuedConnection)
+
+    # --- Public API ---
+    def request(self, asset_id, file_path, file_type, priority=PRIORITY_NORMAL, kind=JOB_PREVIEW):
+        """Queues a job. Re-requesting a queued job only raises its priority."""
+        job = (kind, asset_id)
+        if job in self._running or job in self._retrying:
+            return
+        entry = self._queued.get(job)
+        if entry:
+            if priority < entry[0]:
+                entry[0] = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), job))
+        else:
+            self._queued[job] = [priority, file_path, file_type]
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+        self._pump()
+
+    def request_filmstrip(self, asset_id, file_path):
+        """Queues a hover-scrub filmstrip behind all pending posters."""
+        self.request(asset_id, file_path, 'video', priority=PRIORITY_BACKGROUND, kind=JOB_FILMSTRIP)
+
+    def request_hash(self, asset_id, preview_path, file_type):
+        """Queues perceptual hashing of an asset's preview image behind all pending posters."""
+        self.request(asset_id, preview_path, file_type, priority=PRIORITY_BACKGROUND, kind=JOB_HASH)
+
+    def request_palette(self, asset_id, preview_path, file_type):
+        """Queues dominant-color extraction from an asset's preview image at background priority."""
+        self.request(asset_id, preview_path, file_type, priority=PRIORITY_BACKGROUND, kind=JOB_PALETTE)
+
+    def prioritize(self, asset_ids):
+        """Moves previews of the given (e.g. currently visible) assets to the front of the queue."""
+        for asset_id in asset_ids:
+            job = (JOB_PREVIEW, asset_id)
+            entry = self._queued.get(job)
+            if entry and entry[0] > PRIORITY_VISIBLE:
+                entry[0] = PRIORITY_VISIBLE
+                heapq.heappush(self._heap, (PRIORITY_VISIBLE, next(self._seq), job))
+        self._pump()
+
+    def is_pending(self, asset_id, kind=JOB_PREVIEW):
+        job = (kind, asset_id)
+        return job in self._queued or job in self._running or job in self._retrying
+
+    def pending_count(self):
+        return len(self._queued) + len(self._running) + len(self._retrying)
+
+    def shutdown(self):
+        self._closed = True
+        self._heap.clear()
+        self._queued.clear()
+        self._retrying.clear()
+        self._crashes.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # --- Dispatch ---
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             initializer=init_worker,
+                                             initargs=(self.decoder, self.max_cache_bytes))
+        return self._pool
+
+    def _pump(self):
+        deferred = []
+        while self._heap and len(self._running) < self.max_workers:
+            priority, seq, job = heapq.heappop(self._heap)
+            entry = self._queued.get(job)
+            if entry is None or entry[0] != priority:
+                continue  # Stale heap entry (re-prioritized or already dispatched)
+
+            token = True
+            if self.io_scheduler is not None:
+                token = self.io_scheduler.try_acquire(entry[1], self.cache_dir)
+                if token is None:
+                    # Source device is saturated; try the next item, keep this one queued
+                    deferred.append((priority, seq, job))
+                    continue
+
+            del self._queued[job]
+            self._running[job] = token
+            self._job_args[job] = (entry[1], entry[2], priority)
+            pool = self._ensure_pool()
+            future = pool.submit(_JOB_FUNCTIONS[job[0]], entry[1], entry[2], self.cache_dir)
+            future.add_done_callback(
+                lambda f, job=job, pool=pool: self._job_finished.emit(
+                    job,
+                    None if f.cancelled() or f.exception() else f.result(),
+                    "cancelled" if f.cancelled() else f.exception(),
+                    pool,
+                )
+            )
+
+        for item in deferred:
+            heapq.heappush(self._heap, item)
+        if deferred and not self._running:
+            # Nothing of ours will finish to wake us up; poll until the device frees up
+            QTimer.singleShot(250, self._pump)
+
+    def _on_job_finished(self, job, result, error, pool):
+        token = self._running.pop(job, None)
+        if self.io_scheduler is not None and token not in (None, True):
+            self.io_scheduler.release(token)
+        args = self._job_args.pop(job, None)
+        if self._closed:
+            return
+        if isinstance(error, BrokenProcessPool):
+            # A worker died (e.g. a decoder crashed) and took every job on that pool with it.
+            # The first of them replaces the pool; later ones must not touch its successor.
+            if pool is not None and pool is self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._requeue_lost(job, args):
+                return
+        else:
+            self._crashes.pop(job, None)
+
+        kind, asset_id = job
+        if kind == JOB_FILMSTRIP:
+            if result:
+                self.filmstrip_ready.emit(asset_id, result)
+            elif error:
+                print(f"Filmstrip failed for asset {asset_id}: {error}")
+        elif kind == JOB_HASH:
+            if result:
+                self.hash_ready.emit(asset_id, result)
+            elif error:
+                print(f"Hashing failed for asset {asset_id}: {error}")
+        elif kind == JOB_PALETTE:
+            if result:
+                self.palette_ready.emit(asset_id, result)
+            elif error:
+                print(f"Palette extraction failed for asset {asset_id}: {error}")
+        elif error or not result:
+            self._handle_failure(job, args, str(error or "no preview produced"))
+        else:
+            self._attempts.pop(job, None)
+            self.preview_ready.emit(asset_id, result)
+
+        self._pump()
+        if not self._running and not self._queued and not self._retrying:
+            self.queue_drained.emit()
+
+    def _requeue_lost(self, job, args):
+        """
+        Sends a job lost to a dead worker again at its old priority. Which job
+        killed the worker is unknown, so each one gets max_attempts tries.
+        """
+        crashes = self._crashes.get(job, 0) + 1
+        if args is None or crashes >= self.max_attempts:
+            self._crashes.pop(job, None)
+            return False
+        self._crashes[job] = crashes
+        kind, asset_id = job
+        self.request(asset_id, args[0], args[1], priority=args[2], kind=kind)
+        return True
+
+    def _handle_failure(self, job, args, reason):
+        kind, asset_id = job
+        attempts = self._attempts.get(job, 0) + 1
+        if attempts >= self.max_attempts or args is None:
+            self._attempts.pop(job, None)
+            self.preview_failed.emit(asset_id, reason)
+            return
+
+        self._attempts[job] = attempts
+        delay = self.retry_delay_ms * 2 ** (attempts - 1)
+        self._retrying.add(job)
+        self.preview_retry_scheduled.emit(asset_id, attempts, delay)
+        QTimer.singleShot(delay, lambda: self._retry(job, args))
+
+    def _retry(self, job, args):
+        if job not in self._retrying:
+            return  # Shut down meanwhile
+        self._retrying.discard(job)
+        kind, asset_id = job
+        self.request(asset_id, args[0], args[1], priority=PRIORITY_BACKGROUND, kind=kind)
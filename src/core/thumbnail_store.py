@@ -0,0 +1,350 @@
+import hashlib
+import mmap
+import os
+import threading
+
+from PyQt6 import sip
+from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+try:
+    from src.core.waveform import WaveformPeaks, render_waveform, PEAKS_EXT
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from src.core.waveform import WaveformPeaks, render_waveform, PEAKS_EXT
+
+
+# Icon sizes used by AssetGrid.set_view_mode
+VIEW_MODE_SIZES = {
+    'list': QSize(40, 40),
+    'icon': QSize(180, 120),
+    'large': QSize(280, 180),
+}
+
+PIXEL_FORMAT = QImage.Format.Format_ARGB32_Premultiplied  # Native raster format: no conversion on paint
+BYTES_PER_PIXEL = 4
+SLOT_ALIGN = 64
+GROW_STEP = 8 * 1024 * 1024
+# Packs only append: past this share of dead bytes a pack is compacted when it is opened
+COMPACT_DEAD_RATIO = 0.5
+COMPACT_MIN_BYTES = 16 * 1024 * 1024
+# Per mode; the current pack rotates into the previous generation at half of it
+MAX_PACK_BYTES = 1024 * 1024 * 1024
+
+
+class ThumbnailPack:
+    """
+    One memory-mapped pack file of raw premultiplied ARGB thumbnails for a view mode.
+    {mode}.pack holds the pixels, {mode}.idx is an append-only 'key offset width height' log
+    (later lines win; an offset of -1 drops the key).
+    """
+    def __init__(self, store_dir, mode, name=None):
+        self.mode = mode
+        name = name or mode
+        self.pack_path = os.path.join(store_dir, f"{name}.pack")
+        self.index_path = os.path.join(store_dir, f"{name}.idx")
+        self.index = {}     # key -> (offset, width, height)
+        self.end = 0        # first free byte
+        self._mm = None
+        self._file = None
+        self._load_index()
+        if self.end > COMPACT_MIN_BYTES and self._live_bytes() < self.end * (1 - COMPACT_DEAD_RATIO):
+            self._compact()
+        self._open()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='ascii', errors='ignore') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 4:
+                    continue  # Torn write from a crash
+                key, offset, width, height = parts[0], int(parts[1]), int(parts[2]), int(parts[3])
+                if offset < 0:
+                    self.index.pop(key, None)
+                    continue
+                self.index[key] = (offset, width, height)
+                self.end = max(self.end, self._aligned(offset + width * height * BYTES_PER_PIXEL))
+
+    def _live_bytes(self):
+        return sum(self._aligned(w * h * BYTES_PER_PIXEL) for _, w, h in self.index.values())
+
+    def _compact(self):
+        """Rewrites the pack with only the indexed thumbnails, back to back."""
+        tmp_pack, tmp_index = self.pack_path + ".tmp", self.index_path + ".tmp"
+        index = {}
+        end = 0
+        try:
+            with open(self.pack_path, 'rb') as src, open(tmp_pack, 'wb') as dst, \
+                    open(tmp_index, 'w', encoding='ascii') as idx:
+                for key, (offset, width, height) in sorted(self.index.items(), key=lambda item: item[1][0]):
+                    nbytes = width * height * BYTES_PER_PIXEL
+                    src.seek(offset)
+                    data = src.read(nbytes)
+                    if len(data) != nbytes:
+                        continue  # Truncated pack
+                    dst.seek(end)
+                    dst.write(data)
+                    idx.write(f"{key} {end} {width} {height}\n")
+                    index[key] = (end, width, height)
+                    end = self._aligned(end + nbytes)
+                dst.truncate(end)
+            # Index goes first: a crash in between leaves an empty index (icons re-packed), never wrong offsets
+            os.remove(self.index_path)
+            os.replace(tmp_pack, self.pack_path)
+            os.replace(tmp_index, self.index_path)
+        except OSError as e:
+            print(f"Thumbnail store: could not compact {self.pack_path}: {e}")
+            return
+        self.index, self.end = index, end
+
+    def _open(self):
+        if not os.path.exists(self.pack_path):
+            open(self.pack_path, 'wb').close()
+        self._file = open(self.pack_path, 'r+b')
+        size = os.path.getsize(self.pack_path)
+        if size < self.end:
+            # Pack was truncated behind our back; drop what no longer fits
+            self.index = {k: v for k, v in self.index.items()
+                          if v[0] + v[1] * v[2] * BYTES_PER_PIXEL <= size}
+            self.end = size
+        self._map()
+
+    def _map(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if os.path.getsize(self.pack_path) > 0:
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    @staticmethod
+    def _aligned(n):
+        return -(-n // SLOT_ALIGN) * SLOT_ALIGN
+
+    def _read(self, key, convert):
+        entry = self.index.get(key)
+        if entry is None or self._mm is None:
+            return None
+        offset, width, height = entry
+        nbytes = width * height * BYTES_PER_PIXEL
+        view = memoryview(self._mm)[offset:offset + nbytes]
+        try:
+            # Zero-copy view over the mapping; convert() makes the only copy
+            return convert(QImage(sip.voidptr(view), width, height, width * BYTES_PER_PIXEL, PIXEL_FORMAT))
+        finally:
+            view.release()
+
+    def pixmap(self, key):
+        """Returns a QPixmap painted straight from the mapped pack, or None."""
+        return self._read(key, QPixmap.fromImage)
+
+    def image(self, key):
+        """Returns a QImage copied out of the pack (usable off the GUI thread), or None."""
+        return self._read(key, QImage.copy)
+
+    def put(self, key, image):
+        """Appends image (already sized for this mode) and indexes it under key."""
+        image = image.convertToFormat(PIXEL_FORMAT)
+        width, height = image.width(), image.height()
+        nbytes = width * height * BYTES_PER_PIXEL
+        if image.bytesPerLine() != width * BYTES_PER_PIXEL:
+            image = image.copy()  # Ensure tightly packed rows
+        data = image.constBits().asstring(nbytes)
+
+        offset = self.end
+        needed = offset + nbytes
+        size = os.path.getsize(self.pack_path)
+        if needed > size:
+            # Unmap first: Windows refuses to resize a file with a live mapping
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            self._file.truncate(max(needed, size + GROW_STEP))
+            self._map()
+        self._mm[offset:needed] = data
+
+        with open(self.index_path, 'a', encoding='ascii') as f:
+            f.write(f"{key} {offset} {width} {height}\n")
+        self.index[key] = (offset, width, height)
+        self.end = self._aligned(needed)
+
+    def drop(self, key):
+        """Forgets key (its source was re-rendered in place); the next put() re-packs it."""
+        if self.index.pop(key, None) is None:
+            return
+        with open(self.index_path, 'a', encoding='ascii') as f:
+            f.write(f"{key} -1 0 0\n")
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def delete(self):
+        self.close()
+        for path in (self.pack_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ThumbnailStore:
+    """
+    Per-view-mode thumbnail packs. Once a preview has been packed, the grid
+    paints it from the mapped buffer without opening or decoding any file.
+    image() may be called from worker threads; pack access is serialized.
+
+    Each mode has a current pack and the previous generation. When the current
+    one reaches half of max_pack_bytes, the previous one is deleted and the
+    current one takes its place; icons still in use are copied forward on
+    their next hit, so stale ones age out.
+    """
+    def __init__(self, store_dir="cache/thumbstore", immutable_dirs=("cache/previews",),
+                 max_pack_bytes=MAX_PACK_BYTES):
+        self.store_dir = store_dir
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.max_pack_bytes = max_pack_bytes
+        self._packs = {}
+        self._previous = {}
+        self._lock = threading.Lock()
+        # Files under these dirs never change in place (content-keyed preview cache),
+        # so their path alone is a valid key and no stat() is needed per icon
+        self.immutable_dirs = tuple(os.path.abspath(d) + os.sep for d in immutable_dirs)
+
+    def _pack(self, mode):
+        pack = self._packs.get(mode)
+        if pack is None:
+            pack = self._packs[mode] = ThumbnailPack(self.store_dir, mode)
+            self._previous[mode] = ThumbnailPack(self.store_dir, mode, name=f"{mode}.previous")
+        return pack
+
+    def _lookup(self, mode, key, convert):
+        """Reads key from the current pack, or promotes it from the previous generation."""
+        value = convert(self._pack(mode), key)
+        if value is not None:
+            return value
+        image = self._previous[mode].image(key)
+        if image is None:
+            return None
+        self._put(mode, key, image)
+        return convert(self._pack(mode), key)
+
+    def _put(self, mode, key, image):
+        pack = self._pack(mode)
+        if pack.end + image.width() * image.height() * BYTES_PER_PIXEL > self.max_pack_bytes // 2:
+            # Rotate: the current pack becomes the previous generation, the old one goes
+            previous = self._previous[mode]
+            previous.delete()
+            pack.close()
+            os.replace(pack.pack_path, previous.pack_path)
+            if os.path.exists(pack.index_path):
+                os.replace(pack.index_path, previous.index_path)
+            self._previous[mode] = ThumbnailPack(self.store_dir, mode, name=f"{mode}.previous")
+            pack = self._packs[mode] = ThumbnailPack(self.store_dir, mode)
+        pack.put(key, image)
+
+    def key_for(self, preview_path):
+        """Packs are keyed by preview path (+ size and mtime outside the preview cache)."""
+        abs_path = os.path.abspath(preview_path)
+        if abs_path.startswith(self.immutable_dirs):
+            raw = abs_path
+        else:
+            try:
+                st = os.stat(abs_path)
+            except OSError:
+                return None
+            raw = f"{abs_path}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def invalidate(self, preview_path):
+        """
+        Drops every mode's packed icon of a preview rewritten at the same path
+        (a forced re-render), which its path-only key can't tell apart.
+        """
+        key = self.key_for(preview_path)
+        if key is None:
+            return
+        with self._lock:
+            for mode in VIEW_MODE_SIZES:
+                self._pack(mode).drop(key)
+                self._previous[mode].drop(key)
+
+    def pixmap(self, mode, preview_path):
+        """
+        Returns a pixmap of preview_path sized for mode, packing it on first use.
+        Returns None if the preview can't be read.
+        """
+        key = self.key_for(preview_path)
+        if key is None:
+            return None
+        with self._lock:
+            pixmap = self._lookup(mode, key, ThumbnailPack.pixmap)
+        if pixmap is not None:
+            return pixmap
+
+        image = self._decode(preview_path, VIEW_MODE_SIZES[mode])
+        if image is None:
+            return None
+        with self._lock:
+            self._put(mode, key, image)
+            return self._pack(mode).pixmap(key)
+
+    def image(self, mode, preview_path):
+        """
+        Like pixmap() but returns a QImage, so icon loader threads can read packs
+        and decode misses off the GUI thread. Returns None if unreadable.
+        """
+        key = self.key_for(preview_path)
+        if key is None:
+            return None
+        with self._lock:
+            image = self._lookup(mode, key, ThumbnailPack.image)
+        if image is not None:
+            return image
+
+        image = self._decode(preview_path, VIEW_MODE_SIZES[mode])
+        if image is None:
+            return None
+        with self._lock:
+            self._put(mode, key, image)
+        return image.convertToFormat(PIXEL_FORMAT)
+
+    def _decode(self, path, target):
+        if path.endswith(PEAKS_EXT):
+            peaks = WaveformPeaks.load(path)
+            if peaks is None:
+                print(f"Thumbnail store: could not read peaks {path}")
+                return None
+            return waveform_image(peaks, target.width(), target.height())
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            print(f"Thumbnail store: could not decode {path}: {reader.errorString()}")
+            return None
+        if image.width() > target.width() or image.height() > target.height():
+            image = image.scaled(target, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        return image
+
+    def close(self):
+        with self._lock:
+            for pack in list(self._packs.values()) + list(self._previous.values()):
+                pack.close()
+            self._packs.clear()
+            self._previous.clear()
+
+
+def waveform_image(peaks, width, height):
+    """Renders WaveformPeaks to a QImage of exactly width x height."""
+    pixels = render_waveform(peaks, width, height)
+    # copy() detaches the image from the numpy buffer before it goes away
+    return QImage(pixels.data, width, height, width * 4, QImage.Format.Format_ARGB32).copy()
@@ -0,0 +1,247 @@
+import os
+import struct
+import threading
+import wave
+
+import ffmpeg
+import numpy as np
+
+
+PEAKS_EXT = ".peaks"
+PEAKS_MAGIC = b"QEWP"
+PEAKS_VERSION = 1
+# magic, version, sample_rate, total_samples, base_block, level_factor, levels
+_HEADER = struct.Struct("<4sHIQIHH")
+_LEVEL = struct.Struct("<II")  # block_size, count
+
+PEAKS_SAMPLE_RATE = 22050   # Plenty for drawing; halves the decode work of 44.1k sources
+PEAKS_BASE_BLOCK = 64       # Samples per block at the finest level
+PEAKS_LEVEL_FACTOR = 4      # Each coarser level merges this many blocks
+PEAKS_MIN_BLOCKS = 256      # Stop adding levels once one is this small
+READ_SAMPLES = 1 << 18      # Samples per streamed chunk (512 KiB of s16 PCM)
+DECODE_STALL_TIMEOUT = 30   # Seconds without PCM before the decoder is considered hung
+
+
+class WaveformPeaks:
+    """
+    Multi-resolution min/max/RMS peaks of a mono mix, stored as int16.
+    levels[i] is an (n, 3) array of [min, max, rms] per block of
+    base_block * level_factor**i samples.
+    """
+    def __init__(self, sample_rate, total_samples, base_block, level_factor, levels):
+        self.sample_rate = sample_rate
+        self.total_samples = total_samples
+        self.base_block = base_block
+        self.level_factor = level_factor
+        self.levels = levels
+
+    @property
+    def duration(self):
+        return self.total_samples / self.sample_rate if self.sample_rate else 0.0
+
+    # --- Serialization ---
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(PEAKS_MAGIC, PEAKS_VERSION, self.sample_rate, self.total_samples,
+                                 self.base_block, self.level_factor, len(self.levels)))
+            for i, level in enumerate(self.levels):
+                f.write(_LEVEL.pack(self.base_block * self.level_factor ** i, len(level)))
+            for level in self.levels:
+                f.write(np.ascontiguousarray(level, dtype="<i2").tobytes())
+        os.replace(tmp_path, path)  # Readers never see a half-written file
+
+    @classmethod
+    def load(cls, path):
+        """Reads a .peaks file; returns None if it is missing or not a peaks file."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, sample_rate, total, base_block, factor, count = _HEADER.unpack_from(data)
+        if magic != PEAKS_MAGIC or version != PEAKS_VERSION:
+            return None
+        offset = _HEADER.size
+        counts = []
+        for _ in range(count):
+            counts.append(_LEVEL.unpack_from(data, offset)[1])
+            offset += _LEVEL.size
+        levels = []
+        for n in counts:
+            # Views over the file bytes: no per-level copy
+            levels.append(np.frombuffer(data, dtype="<i2", count=n * 3, offset=offset).reshape(n, 3))
+            offset += n * 6
+        return cls(sample_rate, total, base_block, factor, levels)
+
+    # --- Queries ---
+    def columns(self, width, start=0.0, end=1.0):
+        """
+        Returns (mins, maxs, rms) float arrays in -1..1 with one entry per pixel
+        column for the [start, end] fraction of the clip. Empty clips give zeros.
+        """
+        if width <= 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        if not self.levels or not len(self.levels[0]):
+            zeros = np.zeros(width)
+            return zeros, zeros, zeros
+
+        span = max(1, int((end - start) * self.total_samples))
+        # Coarsest level that still has at least one block per column
+        level_index = 0
+        for i in range(len(self.levels)):
+            if span / (self.base_block * self.level_factor ** i) >= width:
+                level_index = i
+        level = self.levels[level_index]
+        block = self.base_block * self.level_factor ** level_index
+
+        first = min(len(level) - 1, int(start * self.total_samples) // block)
+        last = max(first + 1, min(len(level), -(-int(end * self.total_samples) // block)))
+        blocks = level[first:last].astype(np.float32) / 32767.0
+
+        edges = np.linspace(0, len(blocks), width + 1)
+        starts = np.minimum(edges[:-1].astype(np.intp), len(blocks) - 1)
+        mins = np.minimum.reduceat(blocks[:, 0], starts)
+        maxs = np.maximum.reduceat(blocks[:, 1], starts)
+        # RMS of merged blocks is the root of the mean of squares
+        sq = np.add.reduceat(blocks[:, 2] ** 2, starts)
+        counts = np.maximum(1, np.diff(np.append(starts, len(blocks))))
+        rms = np.sqrt(sq / counts)
+        return mins, maxs, rms
+
+
+def compute_peaks(file_path, sample_rate=PEAKS_SAMPLE_RATE, base_block=PEAKS_BASE_BLOCK,
+                  level_factor=PEAKS_LEVEL_FACTOR, decoder=None):
+    """
+    Decodes file_path once as streamed mono PCM and returns WaveformPeaks.
+    Plain 16-bit WAVs are read directly; everything else goes through the
+    decoder backend (piped through ffmpeg if none is given).
+    """
+    mins, maxs, sums = [], [], []
+    carry = np.zeros(0, dtype=np.int16)
+    total = 0
+
+    chunks, rate = _pcm_chunks(file_path, sample_rate, decoder)
+    for chunk in chunks:
+        total += len(chunk)
+        samples = np.concatenate((carry, chunk)) if len(carry) else chunk
+        whole = len(samples) // base_block * base_block
+        carry = samples[whole:]
+        if whole:
+            _reduce_blocks(samples[:whole].reshape(-1, base_block), mins, maxs, sums)
+    if len(carry):
+        _reduce_blocks(carry.reshape(1, -1), mins, maxs, sums)
+
+    if mins:
+        base = np.column_stack((np.concatenate(mins), np.concatenate(maxs), np.concatenate(sums)))
+    else:
+        base = np.zeros((0, 3), dtype=np.int16)
+    levels = [base]
+    while len(levels[-1]) > PEAKS_MIN_BLOCKS:
+        levels.append(_merge_level(levels[-1], level_factor))
+    return WaveformPeaks(rate, total, base_block, level_factor, levels)
+
+
+def _reduce_blocks(blocks, mins, maxs, sums):
+    mins.append(blocks.min(axis=1))
+    maxs.append(blocks.max(axis=1))
+    rms = np.sqrt(np.mean(blocks.astype(np.float32) ** 2, axis=1))
+    sums.append(np.minimum(rms, 32767).astype(np.int16))
+
+
+def _merge_level(level, factor):
+    n = -(-len(level) // factor)
+    padded = np.empty((n * factor, 3), dtype=np.int16)
+    padded[:len(level)] = level
+    # Pad with the last block so min/max/rms of the tail aren't skewed
+    padded[len(level):] = level[-1]
+    grouped = padded.reshape(n, factor, 3)
+    rms = np.sqrt(np.mean(grouped[:, :, 2].astype(np.float32) ** 2, axis=1))
+    return np.column_stack((grouped[:, :, 0].min(axis=1), grouped[:, :, 1].max(axis=1),
+                            rms.astype(np.int16)))
+
+
+def _pcm_chunks(file_path, sample_rate, decoder=None):
+    """Returns (iterator of mono int16 arrays, sample rate of those arrays)."""
+    try:
+        with wave.open(file_path, "rb") as w:
+            if w.getsampwidth() == 2 and w.getcomptype() == "NONE":
+                return _wav_chunks(file_path), w.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+    if decoder is not None:
+        return decoder.pcm_chunks(file_path, sample_rate), sample_rate
+    return _ffmpeg_chunks(file_path, sample_rate), sample_rate
+
+
+def _wav_chunks(file_path):
+    with wave.open(file_path, "rb") as w:
+        channels = w.getnchannels()
+        while True:
+            frames = w.readframes(READ_SAMPLES)
+            if not frames:
+                break
+            data = np.frombuffer(frames, dtype="<i2")
+            if channels > 1:
+                data = data[:len(data) // channels * channels].reshape(-1, channels)
+                data = data.mean(axis=1).astype(np.int16)
+            yield data
+
+
+def _ffmpeg_chunks(file_path, sample_rate):
+    process = (
+        ffmpeg
+        .input(file_path)
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate)
+        .global_args("-nostdin", "-loglevel", "error")
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+    watchdog = None
+    try:
+        leftover = b""
+        while True:
+            # Killing ffmpeg unblocks the read below if the decoder stalls
+            watchdog = threading.Timer(DECODE_STALL_TIMEOUT, process.kill)
+            watchdog.start()
+            data = process.stdout.read(READ_SAMPLES * 2)
+            watchdog.cancel()
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) // 2 * 2
+            leftover = data[usable:]
+            yield np.frombuffer(data[:usable], dtype="<i2")
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise ffmpeg.Error("ffmpeg", b"", stderr)
+
+
+def render_waveform(peaks, width, height, color=(0, 122, 204), rms_color=(102, 184, 235),
+                    background=(0, 0, 0, 0)):
+    """
+    Rasterizes peaks into a (height, width, 4) uint8 BGRA array (QImage ARGB32
+    byte order): min/max envelope in color, RMS body in rms_color.
+    """
+    width, height = max(1, int(width)), max(1, int(height))
+    mins, maxs, rms = peaks.columns(width)
+    mid = (height - 1) / 2.0
+    ys = np.arange(height, dtype=np.float32)[:, None]
+
+    top = np.floor(mid - maxs * mid)
+    bottom = np.ceil(mid - mins * mid)
+    envelope = (ys >= top) & (ys <= bottom)
+    body = (ys >= np.floor(mid - rms * mid)) & (ys <= np.ceil(mid + rms * mid)) & envelope
+
+    out = np.empty((height, width, 4), dtype=np.uint8)
+    out[:] = (background[2], background[1], background[0], background[3])
+    out[envelope] = (color[2], color[1], color[0], 255)
+    out[body] = (rms_color[2], rms_color[1], rms_color[0], 255)
+    out[int(mid)][~envelope[int(mid)]] = (color[2], color[1], color[0], 255)  # Center line through silence
+    return out
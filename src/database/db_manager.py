@@ -1,5 +1,34 @@
 import sqlite3
 import os
+import re
+
+# Grid sort modes -> ORDER BY over indexed columns (ties fall back to name, then id)
+SORT_ORDERS = {
+    'name': 'sort_key, id',
+    'date': 'date_added DESC, id DESC',
+    'type': 'file_type, sort_key, id',
+    'size': 'file_size DESC, sort_key, id',
+    'duration': 'duration DESC, sort_key, id',
+}
+DEFAULT_ORDER = 'date_added DESC'
+
+_DIGITS = re.compile(r'\d+')
+
+
+def natural_sort_key(name):
+    """
+    Case-insensitive key where digit runs compare by value ("Shot 2" < "Shot 10"):
+    each run is written as its length (two digits) followed by the digits.
+    """
+    def number(match):
+        digits = match.group().lstrip('0') or '0'
+        return f"{len(digits):02d}{digits}"
+    return _DIGITS.sub(number, (name or '').casefold())
+
+
+def _order_by(sort):
+    return SORT_ORDERS.get(sort, DEFAULT_ORDER)
+
 
 class DBManager:
     def __init__(self, db_path="app_data.db"):
@@ -69,6 +98,18 @@ class DBManager:
                 is_deleted BOOLEAN DEFAULT 0
             )
         ''')
+        # Create Asset Colors Table (dominant palette of the preview, most common color first)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS asset_colors (
+                asset_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                r INTEGER, g INTEGER, b INTEGER,
+                lab_l REAL, lab_a REAL, lab_b REAL,
+                weight REAL,
+                FOREIGN KEY(asset_id) REFERENCES assets(id),
+                PRIMARY KEY (asset_id, rank)
+            )
+        ''')
         # Create AssetCategories Association (or just a column in assets, keeping it simple)
         # For this version, let's add category_id to assets
         try:
@@ -88,31 +129,143 @@ class DBManager:
         except sqlite3.OperationalError:
             pass # Column likely exists
 
+        # Migration: Add checksum columns (verified copy engine)
+        for column_def in ('checksum TEXT', 'checksum_type TEXT'):
+            try:
+                self.cursor.execute(f'ALTER TABLE assets ADD COLUMN {column_def}')
+            except sqlite3.OperationalError:
+                pass # Column likely exists
+
+        # Migration: Add filmstrip_path (hover-scrub sheets for video)
+        try:
+            self.cursor.execute('ALTER TABLE assets ADD COLUMN filmstrip_path TEXT')
+        except sqlite3.OperationalError:
+            pass # Column likely exists
+
+        # Migration: Add preview state (previews are generated after import)
+        for column_def in ('preview_state TEXT', 'preview_attempts INTEGER DEFAULT 0'):
+            try:
+                self.cursor.execute(f'ALTER TABLE assets ADD COLUMN {column_def}')
+            except sqlite3.OperationalError:
+                pass # Column likely exists
+        self.cursor.execute('''
+            UPDATE assets SET preview_state = CASE
+                WHEN preview_path IS NOT NULL THEN 'ready'
+                WHEN file_type IN ('video', 'audio', 'image', 'lut') THEN 'pending'
+            END
+            WHERE preview_state IS NULL
+        ''')
+
+        # Migration: Add perceptual hashes of the preview image (signed 64-bit, see image_hash.to_signed)
+        for column_def in ('dhash INTEGER', 'phash INTEGER'):
+            try:
+                self.cursor.execute(f'ALTER TABLE assets ADD COLUMN {column_def}')
+            except sqlite3.OperationalError:
+                pass # Column likely exists
+
+        # Migration: Add clipboard thumbnails (made when an image is saved, so the panel never decodes originals)
+        try:
+            self.cursor.execute('ALTER TABLE clipboard_items ADD COLUMN thumb_path TEXT')
+        except sqlite3.OperationalError:
+            pass # Column likely exists
+
+        # Migration: Add sort columns (natural name key, size in bytes, media duration in seconds)
+        for column_def in ('sort_key TEXT', 'file_size INTEGER', 'duration REAL'):
+            try:
+                self.cursor.execute(f'ALTER TABLE assets ADD COLUMN {column_def}')
+            except sqlite3.OperationalError:
+                pass # Column likely exists
+        self.cursor.execute('SELECT id, file_name FROM assets WHERE sort_key IS NULL')
+        self.cursor.executemany('UPDATE assets SET sort_key = ? WHERE id = ?',
+                                [(natural_sort_key(row['file_name']), row['id']) for row in self.cursor.fetchall()])
+        self.cursor.execute('SELECT id, file_path FROM assets WHERE file_size IS NULL')
+        self.cursor.executemany('UPDATE assets SET file_size = ? WHERE id = ?',
+                                [(self._file_size(row['file_path']), row['id']) for row in self.cursor.fetchall()])
+        for columns in ('sort_key', 'date_added', 'file_type, sort_key', 'file_size', 'duration', 'category_name'):
+            name = 'idx_assets_' + columns.replace(', ', '_')
+            self.cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON assets ({columns})')
+
         self.conn.commit()
 
-    def get_favorite_assets(self):
-        self.cursor.execute('SELECT * FROM assets WHERE is_favorite = 1 ORDER BY date_added DESC')
+    @staticmethod
+    def _file_size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except (OSError, TypeError):
+            return 0  # Missing: sorts with the empty files, and isn't stat'ed again
+
+    def get_favorite_assets(self, sort=None):
+        self.cursor.execute(f'SELECT * FROM assets WHERE is_favorite = 1 ORDER BY {_order_by(sort)}')
         return [dict(row) for row in self.cursor.fetchall()]
 
-    def add_asset(self, file_path, file_name, file_type, category_id=None, preview_path=None, category_name=None):
+    def count_favorites(self):
+        self.cursor.execute('SELECT COUNT(*) FROM assets WHERE is_favorite = 1')
+        return self.cursor.fetchone()[0]
+
+    def add_asset(self, file_path, file_name, file_type, category_id=None, preview_path=None, category_name=None,
+                  checksum=None, checksum_type=None, preview_state=None, file_size=None, duration=None):
+        if file_size is None:
+            file_size = self._file_size(file_path)
         try:
             self.cursor.execute('''
-                INSERT INTO assets (file_path, file_name, file_type, category_id, preview_path, category_name)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (file_path, file_name, file_type, category_id, preview_path, category_name))
+                INSERT INTO assets (file_path, file_name, file_type, category_id, preview_path, category_name,
+                                    checksum, checksum_type, preview_state, sort_key, file_size, duration)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (file_path, file_name, file_type, category_id, preview_path, category_name,
+                  checksum, checksum_type, preview_state, natural_sort_key(file_name), file_size, duration))
             self.conn.commit()
             return self.cursor.lastrowid
         except sqlite3.IntegrityError:
             return None # Already exists
 
-    def get_all_assets(self):
-        self.cursor.execute('SELECT * FROM assets ORDER BY date_added DESC')
+    def get_all_assets(self, sort=None):
+        """sort: a SORT_ORDERS key (default: newest first)."""
+        self.cursor.execute(f'SELECT * FROM assets ORDER BY {_order_by(sort)}')
         return [dict(row) for row in self.cursor.fetchall()]
     
-    def search_assets(self, query):
-        self.cursor.execute('SELECT * FROM assets WHERE file_name LIKE ?', (f'%{query}%',))
+    def search_assets(self, query, conn=None, sort=None):
+        """
+        Assets whose name contains query (ASCII case-insensitive, like LIKE).
+        % and _ are matched literally. conn: a reader_connection() to search from another thread.
+        """
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        cursor = (conn or self.conn).execute(
+            f"SELECT * FROM assets WHERE file_name LIKE ? ESCAPE '\\' ORDER BY {_order_by(sort)}", (pattern,)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_assets_without_duration(self, file_types=('video', 'audio')):
+        self.cursor.execute(
+            f'SELECT id, file_path FROM assets WHERE duration IS NULL AND file_type IN ({",".join("?" * len(file_types))})',
+            tuple(file_types)
+        )
         return [dict(row) for row in self.cursor.fetchall()]
 
+    def set_durations(self, durations):
+        """durations: (asset_id, seconds) pairs."""
+        self.cursor.executemany('UPDATE assets SET duration = ? WHERE id = ?',
+                                [(seconds, asset_id) for asset_id, seconds in durations])
+        self.conn.commit()
+
+    def get_sorted_ids(self, asset_ids, sort):
+        """The ids in sort order, without loading the rows (re-sorting what the grid already shows)."""
+        self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS sort_ids (id INTEGER PRIMARY KEY)')
+        self.cursor.execute('DELETE FROM sort_ids')
+        self.cursor.executemany('INSERT OR IGNORE INTO sort_ids (id) VALUES (?)', ((i,) for i in asset_ids))
+        self.cursor.execute(
+            f'SELECT id FROM assets WHERE id IN (SELECT id FROM sort_ids) ORDER BY {_order_by(sort)}'
+        )
+        ids = [row[0] for row in self.cursor.fetchall()]
+        self.cursor.execute('DELETE FROM sort_ids')
+        self.conn.commit()
+        return ids
+
+    def reader_connection(self):
+        """A separate connection for read-only queries run off the GUI thread."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
     def toggle_favorite(self, asset_id):
         # proper toggle and return new state
         self.cursor.execute('SELECT is_favorite FROM assets WHERE id = ?', (asset_id,))
@@ -126,10 +279,126 @@ class DBManager:
         return 0
 
     def update_asset_preview(self, asset_id, preview_path):
-        self.cursor.execute('UPDATE assets SET preview_path = ? WHERE id = ?', (preview_path, asset_id))
+        # Hashes and palettes describe the old preview image: drop them if it changes
+        self.cursor.execute('''
+            DELETE FROM asset_colors
+            WHERE asset_id = ? AND EXISTS (SELECT 1 FROM assets WHERE id = ? AND preview_path IS NOT ?)
+        ''', (asset_id, asset_id, preview_path))
+        self.cursor.execute('''
+            UPDATE assets SET
+                dhash = CASE WHEN preview_path IS ? THEN dhash END,
+                phash = CASE WHEN preview_path IS ? THEN phash END,
+                preview_path = ?, preview_state = 'ready'
+            WHERE id = ?
+        ''', (preview_path, preview_path, preview_path, asset_id))
         self.conn.commit()
 
+    def update_asset_hashes(self, asset_id, dhash, phash):
+        """Stores perceptual hashes (signed 64-bit ints)."""
+        self.cursor.execute('UPDATE assets SET dhash = ?, phash = ? WHERE id = ?', (dhash, phash, asset_id))
+        self.conn.commit()
+
+    def get_assets_without_hash(self, file_types=('image', 'video')):
+        """Returns assets of the given types with a preview but no perceptual hash yet."""
+        placeholders = ', '.join('?' for _ in file_types)
+        self.cursor.execute(
+            f'''SELECT * FROM assets
+                WHERE phash IS NULL AND preview_path IS NOT NULL AND preview_state = 'ready'
+                  AND file_type IN ({placeholders})''',
+            tuple(file_types)
+        )
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def set_asset_palette(self, asset_id, rows):
+        """Replaces an asset's palette. rows: (rank, r, g, b, lab_l, lab_a, lab_b, weight) tuples."""
+        self.cursor.execute('DELETE FROM asset_colors WHERE asset_id = ?', (asset_id,))
+        self.cursor.executemany(
+            'INSERT INTO asset_colors (asset_id, rank, r, g, b, lab_l, lab_a, lab_b, weight) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(asset_id,) + tuple(row) for row in rows]
+        )
+        self.conn.commit()
+
+    def get_asset_palette(self, asset_id):
+        """Returns [(r, g, b, weight)] for an asset, most common first."""
+        self.cursor.execute('SELECT r, g, b, weight FROM asset_colors WHERE asset_id = ? ORDER BY rank', (asset_id,))
+        return [tuple(row) for row in self.cursor.fetchall()]
+
+    def get_palette_rows(self):
+        """Returns (asset_id, lab_l, lab_a, lab_b, weight) for every stored palette color."""
+        self.cursor.execute('SELECT asset_id, lab_l, lab_a, lab_b, weight FROM asset_colors ORDER BY asset_id')
+        return [tuple(row) for row in self.cursor.fetchall()]
+
+    def get_assets_without_palette(self, file_types=('image', 'video')):
+        """Returns assets of the given types with a preview but no palette yet."""
+        placeholders = ', '.join('?' for _ in file_types)
+        self.cursor.execute(
+            f'''SELECT * FROM assets
+                WHERE preview_path IS NOT NULL AND preview_state = 'ready'
+                  AND file_type IN ({placeholders})
+                  AND NOT EXISTS (SELECT 1 FROM asset_colors WHERE asset_colors.asset_id = assets.id)''',
+            tuple(file_types)
+        )
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def get_asset_hashes(self):
+        """Returns (id, dhash, phash) for every hashed asset."""
+        self.cursor.execute('SELECT id, dhash, phash FROM assets WHERE phash IS NOT NULL AND dhash IS NOT NULL')
+        return [tuple(row) for row in self.cursor.fetchall()]
+
+    def set_preview_state(self, asset_id, state, attempts=None):
+        """state: 'pending' | 'ready' | 'failed'. attempts: failed tries so far (unchanged if None)."""
+        if attempts is None:
+            self.cursor.execute('UPDATE assets SET preview_state = ? WHERE id = ?', (state, asset_id))
+        else:
+            self.cursor.execute(
+                'UPDATE assets SET preview_state = ?, preview_attempts = ? WHERE id = ?', (state, attempts, asset_id)
+            )
+        self.conn.commit()
+
+    def update_asset_filmstrip(self, asset_id, filmstrip_path):
+        self.cursor.execute('UPDATE assets SET filmstrip_path = ? WHERE id = ?', (filmstrip_path, asset_id))
+        self.conn.commit()
+
+    def forget_cache_files(self, paths):
+        """
+        Cache files evicted by the preview cache: assets showing one go back to
+        'pending' (the path stays, so the same render keeps its hashes) and
+        filmstrips are cleared. Returns (preview asset ids, filmstrip asset ids).
+        """
+        preview_ids, filmstrip_ids = [], []
+        for chunk in self._chunks(paths):
+            marks = ",".join("?" * len(chunk))
+            self.cursor.execute(f"SELECT id FROM assets WHERE preview_path IN ({marks}) AND preview_state = 'ready'", chunk)
+            preview_ids.extend(row[0] for row in self.cursor.fetchall())
+            self.cursor.execute(f'SELECT id FROM assets WHERE filmstrip_path IN ({marks})', chunk)
+            filmstrip_ids.extend(row[0] for row in self.cursor.fetchall())
+            self.cursor.execute(
+                f"UPDATE assets SET preview_state = 'pending' WHERE preview_path IN ({marks}) AND preview_state = 'ready'",
+                chunk
+            )
+            self.cursor.execute(f'UPDATE assets SET filmstrip_path = NULL WHERE filmstrip_path IN ({marks})', chunk)
+        self.conn.commit()
+        return preview_ids, filmstrip_ids
+
+    def get_assets_without_preview(self, file_types=('video', 'audio', 'image', 'lut'), include_failed=False):
+        """Returns assets of the given types that have no preview yet (failed ones only if asked)."""
+        placeholders = ', '.join('?' for _ in file_types)
+        skip_failed = '' if include_failed else "AND COALESCE(preview_state, '') != 'failed'"
+        # Stills imported before thumbnails existed point at the original file;
+        # audio rendered to a fixed-size picture is upgraded to peak data
+        self.cursor.execute(
+            f'''SELECT * FROM assets
+                WHERE (preview_path IS NULL
+                       OR (file_type = 'image' AND preview_path = file_path)
+                       OR (file_type = 'audio' AND preview_path LIKE 'cache/previews%'
+                           AND preview_path NOT LIKE '%.peaks'))
+                  AND file_type IN ({placeholders}) {skip_failed}''',
+            tuple(file_types)
+        )
+        return [dict(row) for row in self.cursor.fetchall()]
+
     def delete_asset(self, asset_id):
+        self.cursor.execute('DELETE FROM asset_colors WHERE asset_id = ?', (asset_id,))
         self.cursor.execute('DELETE FROM assets WHERE id = ?', (asset_id,))
         self.conn.commit()
 
@@ -143,6 +412,15 @@ class DBManager:
         self.cursor.execute('SELECT * FROM assets WHERE category_name = ? ORDER BY file_name', (category_name,))
         return [dict(row) for row in self.cursor.fetchall()]
 
+    def get_assets_in_category_tree(self, category_name, sort='name'):
+        """Returns assets in category_name and all of its subfolders."""
+        prefix = category_name.rstrip('/') + '/'
+        self.cursor.execute(
+            f'SELECT * FROM assets WHERE category_name = ? OR substr(category_name, 1, ?) = ? ORDER BY {_order_by(sort)}',
+            (category_name, len(prefix), prefix)
+        )
+        return [dict(row) for row in self.cursor.fetchall()]
+
     def get_category_counts(self):
         """Returns a dictionary of category_name: count."""
         self.cursor.execute('SELECT category_name, COUNT(*) as count FROM assets WHERE category_name IS NOT NULL GROUP BY category_name')
@@ -154,24 +432,79 @@ class DBManager:
         row = self.cursor.fetchone()
         return dict(row) if row else None
 
+    # --- Batch operations (one transaction each) ---
+    @staticmethod
+    def _chunks(ids, size=500):
+        ids = list(ids)
+        for start in range(0, len(ids), size):
+            yield ids[start:start + size]
+
+    def get_assets_by_ids(self, asset_ids):
+        rows = []
+        for chunk in self._chunks(asset_ids):
+            self.cursor.execute(f'SELECT * FROM assets WHERE id IN ({",".join("?" * len(chunk))})', chunk)
+            rows.extend(dict(row) for row in self.cursor.fetchall())
+        return rows
+
+    def delete_assets(self, asset_ids):
+        for chunk in self._chunks(asset_ids):
+            marks = ",".join("?" * len(chunk))
+            self.cursor.execute(f'DELETE FROM asset_colors WHERE asset_id IN ({marks})', chunk)
+            self.cursor.execute(f'DELETE FROM assets WHERE id IN ({marks})', chunk)
+        self.conn.commit()
+
+    def restore_assets(self, rows):
+        """Re-inserts deleted asset rows as they were (same ids)."""
+        if not rows:
+            return
+        columns = list(rows[0])
+        self.cursor.executemany(
+            f'INSERT OR REPLACE INTO assets ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+            [[row[c] for c in columns] for row in rows]
+        )
+        self.conn.commit()
+
+    def move_assets(self, moves):
+        """moves: (asset_id, file_path, category_name) for files that were moved on disk."""
+        self.cursor.executemany(
+            'UPDATE assets SET file_path = ?, category_name = ? WHERE id = ?',
+            [(file_path, category_name, asset_id) for asset_id, file_path, category_name in moves]
+        )
+        self.conn.commit()
+
+    def set_favorites(self, asset_ids, is_favorite):
+        for chunk in self._chunks(asset_ids):
+            self.cursor.execute(
+                f'UPDATE assets SET is_favorite = ? WHERE id IN ({",".join("?" * len(chunk))})',
+                [is_favorite] + chunk
+            )
+        self.conn.commit()
+
     # --- Clipboard History Methods ---
-    def add_clipboard_item(self, file_path, width, height):
+    def add_clipboard_item(self, file_path, width, height, thumb_path=None):
         self.cursor.execute('''
-            INSERT INTO clipboard_items (file_path, width, height)
-            VALUES (?, ?, ?)
-        ''', (file_path, width, height))
+            INSERT INTO clipboard_items (file_path, width, height, thumb_path)
+            VALUES (?, ?, ?, ?)
+        ''', (file_path, width, height, thumb_path))
         self.conn.commit()
         return self.cursor.lastrowid
 
-    def get_clipboard_history(self, limit=50):
+    def get_clipboard_history(self, limit=50, after_id=None):
+        """Newest first. limit=None: all of them. after_id: only items saved after that one."""
         self.cursor.execute('''
             SELECT * FROM clipboard_items 
-            WHERE is_deleted = 0 
-            ORDER BY created_at DESC 
+            WHERE is_deleted = 0 AND id > ?
+            ORDER BY created_at DESC, id DESC
             LIMIT ?
-        ''', (limit,))
+        ''', (after_id or 0, -1 if limit is None else limit))
         return [dict(row) for row in self.cursor.fetchall()]
 
+    def set_clipboard_thumbs(self, thumbs):
+        """thumbs: (item_id, thumb_path) pairs, stored in one transaction."""
+        self.cursor.executemany('UPDATE clipboard_items SET thumb_path = ? WHERE id = ?',
+                                [(thumb_path, item_id) for item_id, thumb_path in thumbs])
+        self.conn.commit()
+
     def delete_clipboard_item(self, item_id):
         # Soft delete or hard delete? The spec said "Clean Up", usually soft delete is safer initially but file cleanup is needed.
         # Let's do hard delete from DB + file_path return so manager can delete file.
@@ -180,8 +513,8 @@ class DBManager:
 
     def clear_clipboard_history(self):
         # Get all file paths first to delete them
-        self.cursor.execute('SELECT file_path FROM clipboard_items')
-        files = [row['file_path'] for row in self.cursor.fetchall()]
+        self.cursor.execute('SELECT file_path, thumb_path FROM clipboard_items')
+        files = [path for row in self.cursor.fetchall() for path in (row['file_path'], row['thumb_path']) if path]
         
         self.cursor.execute('DELETE FROM clipboard_items')
         self.conn.commit()
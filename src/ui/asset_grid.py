@@ -1,344 +1,715 @@
 from PyQt6.QtWidgets import (
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QAbstractItemView,
+    QStyledItemDelegate,
+    QStyle,
     QMenu,
     QFileDialog,
     QMessageBox,
-    QStyle,
 )
-from PyQt6.QtCore import Qt, QMimeData, QUrl, QSize, pyqtSignal
-from PyQt6.QtGui import QDrag, QIcon, QPixmap
+from PyQt6.QtCore import Qt, QSize, QRect, QPoint, QTimer, QItemSelection, QItemSelectionModel, pyqtSignal
+from PyQt6.QtGui import QCursor, QDrag, QPixmap, QPainter, QColor, QFont, QPen, QRegion
 import os
 
 try:
-    from src.core.resolve_installer import ResolveInstaller
+    from src.core.thumbnail_store import ThumbnailStore
+    from src.core.preview_generator import FILMSTRIP_FRAMES
+    from src.ui.asset_model import AssetListModel, FILE_PATH_ROLE, display_name, preview_path
+    from src.ui.icon_loader import IconLoader
+    from src.ui.asset_mime import AssetMimeData, SettingTextCache
 except ImportError:
     # Fallback or running directly
     import sys
 
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-    from src.core.resolve_installer import ResolveInstaller
-
-
-class AssetGrid(QListWidget):
-    item_deleted = pyqtSignal() # Optional: create for deletes too
-    favorite_changed = pyqtSignal(int) # Emits asset_id
-
-    def __init__(self, parent=None):
+    from src.core.thumbnail_store import ThumbnailStore
+    from src.core.preview_generator import FILMSTRIP_FRAMES
+    from src.ui.asset_model import AssetListModel, FILE_PATH_ROLE, display_name, preview_path
+    from src.ui.icon_loader import IconLoader
+    from src.ui.asset_mime import AssetMimeData, SettingTextCache
+
+# mode -> (icon size, grid size, spacing); list mode has no grid
+VIEW_MODES = {
+    'list': (QSize(40, 40), QSize(), 2),
+    'icon': (QSize(180, 120), QSize(200, 160), 10),
+    'large': (QSize(280, 180), QSize(300, 220), 15),
+}
+LIST_ROW_PADDING = 6
+LAYOUT_BATCH_SIZE = 2000
+# Icons are decoded this many screens ahead in the scroll direction (and half a screen behind)
+PREFETCH_SCREENS = 2
+
+
+class AssetDelegate(QStyledItemDelegate):
+    """
+    Paints one tile: background, the icon from the model and the elided name.
+    Every tile has the same size, so the view never measures rows.
+    """
+    def __init__(self, grid):
+        super().__init__(grid)
+        self.grid = grid
+
+    def sizeHint(self, option, index):
+        icon_size = self.grid.iconSize()
+        if self.grid.view_mode == 'list':
+            return QSize(200, icon_size.height() + 2 * LIST_ROW_PADDING)
+        return self.grid.gridSize()
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        painter.setPen(QPen(QColor("#007acc"), 2) if selected else Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#404040" if selected else "#383838" if hovered else "#2b2b2b"))
+        painter.drawRoundedRect(rect, 6, 6)
+
+        icon_size = self.grid.iconSize()
+        if self.grid.view_mode == 'list':
+            icon_rect = QRect(rect.left() + LIST_ROW_PADDING,
+                              rect.top() + (rect.height() - icon_size.height()) // 2,
+                              icon_size.width(), icon_size.height())
+            text_rect = QRect(icon_rect.right() + 10, rect.top(),
+                              rect.right() - icon_rect.right() - 16, rect.height())
+            alignment = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        else:
+            icon_rect = QRect(rect.left() + (rect.width() - icon_size.width()) // 2, rect.top() + 8,
+                              icon_size.width(), icon_size.height())
+            text_rect = QRect(rect.left() + 6, icon_rect.bottom() + 4,
+                              rect.width() - 12, rect.bottom() - icon_rect.bottom() - 6)
+            alignment = Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop
+
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            size = pixmap.deviceIndependentSize().toSize()
+            if size.width() > icon_rect.width() or size.height() > icon_rect.height():
+                size = size.scaled(icon_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(QPoint(0, 0), size)
+            target.moveCenter(icon_rect.center())
+            painter.drawPixmap(target, pixmap)
+
+        painter.setPen(QColor("#e0e0e0"))
+        text = option.fontMetrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole) or "",
+                                             Qt.TextElideMode.ElideMiddle, text_rect.width())
+        painter.drawText(text_rect, alignment, text)
+        painter.restore()
+
+
+class AssetGrid(QListView):
+    visible_assets_changed = pyqtSignal(list) # Emits asset_ids currently on screen
+    filmstrip_requested = pyqtSignal(int, str) # asset_id, file_path of a video without a filmstrip
+    preview_requested = pyqtSignal(int, str, str) # asset_id, file_path, file_type of an evicted preview
+    lut_compare_requested = pyqtSignal(list, str) # LUT paths, image path ('' = reference still)
+    regenerate_previews_requested = pyqtSignal(list) # asset_ids
+    find_similar_requested = pyqtSignal(int) # asset_id
+    batch_requested = pyqtSignal(str, list) # 'delete', 'install', 'move', 'favorite' or 'unfavorite'; asset_ids
+    selection_changed = pyqtSignal()
+
+    def __init__(self, parent=None, thumbnail_store=None, filmstrip_frames=FILMSTRIP_FRAMES, icon_cache_bytes=None):
         super().__init__(parent)
-        self.setViewMode(QListWidget.ViewMode.IconMode)
-        self.setIconSize(QSize(180, 120))
-        self.setResizeMode(QListWidget.ResizeMode.Adjust)
-        self.setSpacing(10)
-        # Fix: Enforce strict grid size to prevent items from shifting due to long names
-        self.setGridSize(QSize(200, 160)) 
-        self.setWordWrap(True)
-        self.setTextElideMode(Qt.TextElideMode.ElideMiddle)
-        
+        self.view_mode = 'icon'
+        self.filmstrip_frames = filmstrip_frames
+        self._scrub_asset_id = None
+        self._scrub_frames = None
+        self._scrub_frame = -1
+        self._filmstrips_requested = set()  # Asset ids already asked for, success or not
+        self._previews_requested = set()  # Evicted previews asked for again, until they are back
+        self._placeholders = {}  # (view mode, file_type, preview_state) -> QPixmap
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+        # Icons are painted from memory-mapped packs instead of opening each preview file
+        self.thumbnail_store = thumbnail_store or ThumbnailStore()
+        # ...read (or decoded and packed) on worker threads; tiles show placeholders meanwhile
+        self.icon_loader = IconLoader(self.thumbnail_store, icon_cache_bytes, parent=self)
+        self.icon_loader.icon_ready.connect(self._on_icon_ready)
+        self.icon_loader.filmstrip_ready.connect(self._on_filmstrip_ready)
+        self._last_scroll = 0
+        self._scroll_direction = 1
+        self._anchor = None  # (asset_id, viewport y) to scroll back to once laid out
+
+        # Rows are the DB dicts; icons and text are only produced for painted tiles
+        self.asset_model = AssetListModel(self)
+        self.asset_model.icon_provider = self._icon_for_row
+        self.setModel(self.asset_model)
+        self.setItemDelegate(AssetDelegate(self))
+        self.setUniformItemSizes(True)
+        # Huge listings are laid out a batch per event loop pass, so the first screen paints at once
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(LAYOUT_BATCH_SIZE)
+        self._apply_view_mode('icon')
+
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.setDragEnabled(True)
-        self.setAcceptDrops(True)  # Allow internal reordering if needed
-        self.setDropIndicatorShown(True)
 
-        self.installer = ResolveInstaller()
+        self.setting_cache = SettingTextCache()  # Drag payloads for .setting macros
 
         # Context Menu
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
 
         # Handle Double Click
-        self.itemDoubleClicked.connect(self.on_item_double_clicked)
-
-        # Style for the grid
+        self.doubleClicked.connect(self.on_item_double_clicked)
+
+        # Report visible items (debounced) so the thumbnail service can serve them first
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(50)
+        self._visible_timer.timeout.connect(self._on_visible_changed)
+        self.verticalScrollBar().valueChanged.connect(self._visible_timer.start)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.asset_model.modelReset.connect(self._visible_timer.start)
+        self.asset_model.rowsInserted.connect(self._visible_timer.start)
+        self.asset_model.rowsRemoved.connect(self._visible_timer.start)
+
+        # After a diff the batched layout may not have reached the anchor tile yet: retry
+        self._anchor_timer = QTimer(self)
+        self._anchor_timer.setSingleShot(True)
+        self._anchor_timer.setInterval(10)
+        self._anchor_timer.timeout.connect(self._restore_anchor)
+        self.verticalScrollBar().actionTriggered.connect(self._drop_anchor)
+
+        # Tiles are painted by AssetDelegate; only the background is styled here
         self.setStyleSheet(
             """
-            QListWidget {
+            QListView {
                 background-color: #1e1e1e;
                 border: none;
                 outline: none;
             }
-            QListWidget::item {
-                background-color: #2b2b2b;
-                border-radius: 6px;
-                padding: 10px;
-                color: #e0e0e0;
-            }
-            QListWidget::item:selected {
-                background-color: #404040;
-                border: 2px solid #007acc;
-            }
-            QListWidget::item:hover {
-                background-color: #383838;
-            }
         """
         )
 
+    def _apply_view_mode(self, mode):
+        icon_size, grid_size, spacing = VIEW_MODES[mode]
+        self.view_mode = mode
+        if mode == 'list':
+            self.setViewMode(QListView.ViewMode.ListMode)
+        else:
+            self.setViewMode(QListView.ViewMode.IconMode)
+            # Static movement keeps the uniform-size layout path (no free item positions to track)
+            self.setMovement(QListView.Movement.Static)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragOnly)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setIconSize(icon_size)
+        self.setGridSize(grid_size)
+        self.setSpacing(spacing)
+
     def set_view_mode(self, mode):
         """
-        Switches the view mode of the list widget.
+        Switches the view mode of the grid.
         mode: 'list' | 'icon' | 'large'
         """
-        if mode == 'list':
-            self.setViewMode(QListWidget.ViewMode.ListMode)
-            self.setIconSize(QSize(40, 40))
-            self.setGridSize(QSize()) # Reset grid size for list view (dynamic height)
-            self.setSpacing(2)
-        elif mode == 'icon':
-            self.setViewMode(QListWidget.ViewMode.IconMode)
-            self.setIconSize(QSize(180, 120))
-            self.setGridSize(QSize(200, 160))
-            self.setSpacing(10)
-        elif mode == 'large':
-            self.setViewMode(QListWidget.ViewMode.IconMode)
-            self.setIconSize(QSize(280, 180))
-            self.setGridSize(QSize(300, 220))
-            self.setSpacing(15)
+        if mode not in VIEW_MODES:
+            return
 
-    def add_asset_item(self, asset_data):
+        if mode != self.view_mode:
+            self._stop_scrub()
+            self._apply_view_mode(mode)
+            self.asset_model.refresh_icons()
+        self._visible_timer.start()
+
+    def _on_visible_changed(self):
+        asset_ids = self.visible_asset_ids()
+        # Evicted previews are only re-rendered once they scroll into view (queued first, then prioritized)
+        for asset_id in asset_ids:
+            self._request_preview(self.asset_model.asset(asset_id))
+        self.visible_assets_changed.emit(asset_ids)
+        self._schedule_icons()
+        # Filmstrips are only worth making for clips the user can actually hover
+        for asset_id in asset_ids:
+            self._request_filmstrip(self.asset_model.asset(asset_id))
+
+    def _request_preview(self, asset):
+        # 'pending' with a path: the render was done once but its cache file is gone
+        if asset is None or asset.get("preview_state") != 'pending' or not asset.get("preview_path"):
+            return
+        if asset["id"] not in self._previews_requested:
+            self._previews_requested.add(asset["id"])
+            self.preview_requested.emit(asset["id"], asset["file_path"], asset["file_type"])
+
+    def _request_filmstrip(self, asset):
+        if asset is None or asset.get("file_type") != 'video' or asset.get("filmstrip_path"):
+            return
+        if asset["id"] not in self._filmstrips_requested:
+            self._filmstrips_requested.add(asset["id"])
+            self.filmstrip_requested.emit(asset["id"], asset["file_path"])
+
+    def _pixmap_for(self, preview_path):
+        """Returns the decoded icon for the current view mode, or None (and queues it) if not loaded yet."""
+        if not preview_path:
+            return None
+        key = (self.view_mode, preview_path)
+        pixmap = self.icon_loader.cached(key)
+        if pixmap is None:
+            self.icon_loader.request(key)
+        return pixmap
+
+    def _on_icon_ready(self, mode, preview_path):
+        if mode == self.view_mode:
+            self.viewport().update()  # Coalesced by Qt into the next paint of the visible tiles
+
+    def _on_scrolled(self, value):
+        if value != self._last_scroll:
+            self._scroll_direction = 1 if value > self._last_scroll else -1
+            self._last_scroll = value
+        self._schedule_icons()
+
+    def _schedule_icons(self):
+        """Hands the icon loader the visible tiles, then the ones the user is scrolling towards."""
+        visible = self._visible_row_range()
+        if visible is None:
+            self.icon_loader.want([])
+            return
+        first, last = visible
+        count = self.asset_model.rowCount()
+        span = last - first + 1
+        ahead, behind = span * PREFETCH_SCREENS, span // 2
+        if self._scroll_direction > 0:
+            rows = list(range(first, min(count, last + 1 + ahead)))
+            rows += range(first - 1, max(-1, first - 1 - behind), -1)
+        else:
+            rows = list(range(last, max(-1, first - 1 - ahead), -1))
+            rows += range(last + 1, min(count, last + 1 + behind))
+
+        keys = []
+        for row in rows:
+            path = preview_path(self.asset_model.asset_at(row))
+            if path:
+                keys.append((self.view_mode, path))
+        self.icon_loader.want(keys)
+
+    def _placeholder_for(self, file_type, preview_state):
+        """Type label on a tile, marked while the preview is pending or after it failed."""
+        key = (self.view_mode, file_type, preview_state)
+        pixmap = self._placeholders.get(key)
+        if pixmap is None:
+            size = self.iconSize()
+            pixmap = QPixmap(size)
+            pixmap.fill(QColor("#333333"))
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            font = QFont()
+            font.setBold(True)
+            font.setPixelSize(max(8, size.height() // 7))
+            painter.setFont(font)
+            painter.setPen(QColor("#888888"))
+            label = (file_type or "file").upper()
+            if size.height() >= 80:
+                painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, label)
+            marker = {"pending": "…", "failed": "!"}.get(preview_state)
+            if marker:
+                painter.setPen(QColor("#e0a030") if preview_state == "failed" else QColor("#007acc"))
+                painter.drawText(pixmap.rect().adjusted(4, 2, -4, -2),
+                                 Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignBottom, marker)
+            painter.end()
+            self._placeholders[key] = pixmap
+        return pixmap
+
+    def _icon_for_row(self, asset):
+        """DecorationRole of the model: scrub frame, preview or placeholder."""
+        if asset["id"] == self._scrub_asset_id and self._scrub_frame >= 0:
+            return self._scrub_frames[self._scrub_frame]
+        pixmap = self._pixmap_for(preview_path(asset))
+        if pixmap is None:
+            pixmap = self._placeholder_for(asset.get("file_type"), asset.get("preview_state"))
+        return pixmap
+
+    def clear(self):
+        self._stop_scrub()
+        self.asset_model.clear()
+
+    def set_assets(self, assets):
+        """Shows exactly these assets (dicts from the DB), in order."""
+        self._stop_scrub()
+        self._drop_anchor()
+        self.asset_model.set_assets(assets)
+
+    def apply_assets(self, assets):
         """
-        Adds an item to the grid.
-        asset_data: dict from DB (id, file_path, file_name, is_favorite, etc.)
+        Like set_assets, but as a diff against what is shown: only inserted,
+        removed and changed rows are touched. The selection, the current item
+        and the first visible tile that stays keep their place, also when the
+        model has to fall back to a reset.
         """
-        display_name = asset_data["file_name"]
-        is_favorite = asset_data.get("is_favorite", 0)
-
-        if is_favorite:
-            display_name = "⭐ " + display_name
-
-        item = QListWidgetItem(display_name)
-
-        # Load preview image
-        preview_path = asset_data.get("preview_path")
-        if preview_path and os.path.exists(preview_path):
-            item.setIcon(QIcon(preview_path))
+        model = self.asset_model
+        visible = self._visible_row_range()
+        tops = []  # (asset_id, viewport y) of the visible tiles, candidates for the anchor
+        if visible is not None:
+            tops = [(model.asset_at(row)["id"], self.visualRect(model.index(row)).top())
+                    for row in range(visible[0], visible[1] + 1)]
+        selected = self.selected_asset_ids()
+        current = self.currentIndex()
+        current_id = model.asset_at(current.row())["id"] if current.isValid() else None
+        self._stop_scrub()
+
+        if not model.apply_assets(assets):
+            self._select_assets([i for i in selected if model.asset(i) is not None], current_id)
+        anchor = next((top for top in tops if model.asset(top[0]) is not None), None)
+        self._anchor = anchor
+        if anchor is None:
+            self._drop_anchor()
+            self.scrollToTop()
         else:
-            # Placeholder or default icon based on type
-            item.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon))
-
-        # Store data
-        item.setData(Qt.ItemDataRole.UserRole, asset_data["file_path"])
-        item.setData(Qt.ItemDataRole.UserRole + 1, asset_data["id"])
-        item.setData(Qt.ItemDataRole.UserRole + 2, is_favorite)  # Store favorite status
-
-        self.addItem(item)
+            self._restore_anchor()
+
+    def sort_assets(self, asset_ids):
+        """Reorders the shown assets (ids in the new order) without reloading them; starts at the top."""
+        self._stop_scrub()
+        self._drop_anchor()
+        self.asset_model.reorder(asset_ids)
+        self.scrollToTop()
+
+    def asset_ids(self):
+        """Ids of every shown asset, in grid order."""
+        return self.asset_model.asset_ids()
+
+    def _select_assets(self, asset_ids, current_id=None):
+        """Selects these assets as one range per run of adjacent rows."""
+        model = self.asset_model
+        rows = sorted(model.index_for_asset(i).row() for i in asset_ids)
+        selection = QItemSelection()
+        start = 0
+        for i in range(1, len(rows) + 1):
+            if i == len(rows) or rows[i] != rows[i - 1] + 1:
+                selection.select(model.index(rows[start]), model.index(rows[i - 1]))
+                start = i
+        self.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+        current = model.index_for_asset(current_id)
+        if current.isValid():
+            self.selectionModel().setCurrentIndex(current, QItemSelectionModel.SelectionFlag.NoUpdate)
+
+    def _restore_anchor(self):
+        if self._anchor is None:
+            return
+        asset_id, top = self._anchor
+        index = self.asset_model.index_for_asset(asset_id)
+        if not index.isValid():
+            self._drop_anchor()
+            return
+        rect = self.visualRect(index)
+        if rect.isValid():
+            bar = self.verticalScrollBar()
+            target = bar.value() + rect.top() - top
+            bar.setValue(target)
+            if bar.value() == target:
+                self._drop_anchor()
+                return
+        # Not laid out yet, or the scroll range hasn't grown enough
+        self._anchor_timer.start()
+
+    def _drop_anchor(self, *args):
+        self._anchor = None
+        self._anchor_timer.stop()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._visible_timer.start()
+
+    def selectionChanged(self, selected, deselected):
+        super().selectionChanged(selected, deselected)
+        self.selection_changed.emit()
+
+    def selectAll(self):
+        # One range for everything; the default walks every row checking for hidden ones
+        count = self.asset_model.rowCount()
+        if count and self.selectionMode() == QAbstractItemView.SelectionMode.ExtendedSelection:
+            self.selectionModel().select(
+                QItemSelection(self.asset_model.index(0), self.asset_model.index(count - 1)),
+                QItemSelectionModel.SelectionFlag.ClearAndSelect,
+            )
+
+    def visualRegionForSelection(self, selection):
+        # Only on-screen tiles can need a repaint; QListView would compute a rect per selected row
+        return QRegion(self.viewport().rect())
+
+    def _selected_rows(self, limit=None):
+        """Asset dicts of the selection in grid order (ranges are walked, not per-index lists)."""
+        rows = []
+        ranges = sorted(self.selectionModel().selection(), key=lambda r: r.top())
+        for selection_range in ranges:
+            for row in range(selection_range.top(), selection_range.bottom() + 1):
+                rows.append(self.asset_model.asset_at(row))
+                if limit is not None and len(rows) >= limit:
+                    return rows
+        return rows
+
+    def selected_asset_ids(self, limit=None):
+        return [asset["id"] for asset in self._selected_rows(limit)]
+
+    def index_for_asset(self, asset_id):
+        return self.asset_model.index_for_asset(asset_id)
+
+    def set_asset_preview(self, asset_id, preview_path):
+        """Swaps in a freshly generated preview for an asset already in the grid."""
+        # A re-render may reuse the old path: drop the packed and decoded icons (and past failures)
+        self.thumbnail_store.invalidate(preview_path)
+        self.icon_loader.discard(preview_path)
+        self.asset_model.update_asset(asset_id, preview_path=preview_path, preview_state='ready')
+        self._previews_requested.discard(asset_id)
+
+    def set_asset_preview_state(self, asset_id, preview_state):
+        """Updates the placeholder of an asset still waiting for its preview."""
+        self.asset_model.update_asset(asset_id, preview_state=preview_state)
+
+    def set_asset_filmstrip(self, asset_id, filmstrip_path):
+        self.icon_loader.discard(filmstrip_path)  # Re-rendered sheets keep their path
+        self.asset_model.update_asset(asset_id, filmstrip_path=filmstrip_path)
+
+    def reset_evicted(self, preview_ids, filmstrip_ids):
+        """Assets whose cached preview or filmstrip was evicted: asked for again when next on screen."""
+        for asset_id in preview_ids:
+            self.asset_model.update_asset(asset_id, preview_state='pending')
+        for asset_id in filmstrip_ids:
+            self.asset_model.update_asset(asset_id, filmstrip_path=None)
+            self._filmstrips_requested.discard(asset_id)
+        self._visible_timer.start()
+
+    def set_asset_favorite(self, asset_id, is_favorite):
+        self.asset_model.update_asset(asset_id, is_favorite=is_favorite)
+
+    # --- Hover scrubbing ---
+    def _filmstrip_icons(self, filmstrip_path):
+        """
+        Per-frame pixmaps of a filmstrip sheet for the current view mode, or None
+        while the icon loader is still slicing it (the tile keeps its poster).
+        """
+        key = (self.view_mode, filmstrip_path)
+        icons = self.icon_loader.filmstrip(key)
+        if icons is None:
+            self.icon_loader.request_filmstrip(key, self.filmstrip_frames, self.iconSize())
+        return icons
+
+    def _on_filmstrip_ready(self, mode, filmstrip_path):
+        # Start scrubbing if the pointer is still resting on that tile
+        if mode == self.view_mode and self.viewport().underMouse():
+            self._scrub_at(self.viewport().mapFromGlobal(QCursor.pos()))
+
+    def _repaint_asset(self, asset_id):
+        index = self.asset_model.index_for_asset(asset_id)
+        if index.isValid():
+            self.update(index)
+
+    def _stop_scrub(self):
+        """Puts the poster back on the tile being scrubbed."""
+        asset_id = self._scrub_asset_id
+        self._scrub_asset_id = None
+        self._scrub_frames = None
+        self._scrub_frame = -1
+        if asset_id is not None:
+            self._repaint_asset(asset_id)
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        if event.buttons() != Qt.MouseButton.NoButton:
+            return
+        self._scrub_at(event.position().toPoint())
+
+    def _scrub_at(self, pos):
+        """Shows the filmstrip frame under pos (viewport coordinates) on its video tile."""
+        index = self.indexAt(pos)
+        asset = self.asset_model.asset_at(index.row()) if index.isValid() else None
+        if asset is None or asset["id"] != self._scrub_asset_id:
+            self._stop_scrub()
+        if asset is None or asset.get("file_type") != 'video':
+            return
 
-    def startDrag(self, supportedActions):
-        print("DEBUG: startDrag called")
-        items = self.selectedItems()
-        if not items:
+        if not asset.get("filmstrip_path"):
+            self._request_filmstrip(asset)
             return
 
-        drag = QDrag(self)
-        mime_data = QMimeData()
-        urls = []
-        is_setting_file = False
-        setting_content = ""
-
-        for item in items:
-            file_path = item.data(Qt.ItemDataRole.UserRole)
-            if file_path and os.path.exists(file_path):
-                # Ensure absolute path with forward slashes
-                abs_path = os.path.abspath(file_path).replace("\\", "/")
-                u = QUrl.fromLocalFile(abs_path)
-                urls.append(u)
-
-                # Check for .setting file content
-                if abs_path.lower().endswith(".setting"):
-                    is_setting_file = True
-                    try:
-                        with open(abs_path, "r", encoding="utf-8") as f:
-                            setting_content += f.read() + "\n"
-                    except:
-                        pass
-
-        if not urls:
+        icons = self._filmstrip_icons(asset.get("filmstrip_path"))
+        if not icons:
             return
+        rect = self.visualRect(index)
+        fraction = (pos.x() - rect.left()) / max(1, rect.width())
+        frame = min(len(icons) - 1, max(0, int(fraction * len(icons))))
+        self._scrub_asset_id = asset["id"]
+        self._scrub_frames = icons
+        if frame != self._scrub_frame:
+            self._scrub_frame = frame
+            self.update(index)
+
+    def leaveEvent(self, event):
+        self._stop_scrub()
+        super().leaveEvent(event)
+
+    def _visible_row_range(self):
+        """(first, last) rows of the tiles inside the viewport, or None."""
+        model = self.asset_model
+        count = model.rowCount()
+        if not count:
+            return None
+        viewport_rect = self.viewport().rect()
+
+        # Rows are laid out in order, so binary search the first row reaching the viewport.
+        # Rows the batched layout hasn't reached yet have no rect and count as below it.
+        lo, hi = 0, count - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            rect = self.visualRect(model.index(mid))
+            if rect.isValid() and rect.bottom() < viewport_rect.top():
+                lo = mid + 1
+            else:
+                hi = mid
+
+        first = last = None
+        for row in range(lo, count):
+            rect = self.visualRect(model.index(row))
+            if not rect.isValid() or rect.top() > viewport_rect.bottom():
+                break
+            if rect.intersects(viewport_rect):
+                if first is None:
+                    first = row
+                last = row
+        return (first, last) if first is not None else None
+
+    def visible_asset_ids(self):
+        """Returns asset ids of the tiles currently inside the viewport."""
+        visible = self._visible_row_range()
+        if visible is None:
+            return []
+        return [self.asset_model.asset_at(row)["id"] for row in range(visible[0], visible[1] + 1)]
 
-        mime_data.setUrls(urls)
+    def add_asset_item(self, asset_data):
+        """
+        Appends one asset to the grid.
+        asset_data: dict from DB (id, file_path, file_name, is_favorite, etc.)
+        Whole listings should go through set_assets (one model reset).
+        """
+        self.asset_model.append_asset(asset_data)
 
-        if is_setting_file and setting_content:
-            mime_data.setText(setting_content)
-        else:
-            # Fallback: Plain text list of files
-            mime_data.setText("\n".join([u.toLocalFile() for u in urls]))
+    def startDrag(self, supportedActions):
+        assets = self._selected_rows()
+        if not assets:
+            return
 
-        drag.setMimeData(mime_data)
+        # URLs and .setting text are only built when the drop target asks for them
+        drag = QDrag(self)
+        drag.setMimeData(AssetMimeData([asset["file_path"] for asset in assets], self.setting_cache))
 
-        if len(items) >= 1:
-            pixmap = items[0].icon().pixmap(100, 100)
-            drag.setPixmap(pixmap)
-            drag.setHotSpot(pixmap.rect().center())
+        pixmap = self._icon_for_row(assets[0]).scaled(
+            100, 100, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        )
+        drag.setPixmap(pixmap)
+        drag.setHotSpot(pixmap.rect().center())
 
         drag.exec(Qt.DropAction.CopyAction)
 
     def show_context_menu(self, position):
-        item = self.itemAt(position)
-        if not item:
+        index = self.indexAt(position)
+        if not index.isValid():
             return
+        asset = self.asset_model.asset_at(index.row())
 
         menu = QMenu()
+        selected = self._selected_rows()
+        # Favorite / install / move act on the whole selection when the clicked tile is part of it
+        targets = [a["id"] for a in selected] if any(a["id"] == asset["id"] for a in selected) else [asset["id"]]
+        count = f" ({len(targets)})" if len(targets) > 1 else ""
 
         # Favorites Option
-        is_favorite = item.data(Qt.ItemDataRole.UserRole + 2)
-        fav_text = "Remove from Favorites" if is_favorite else "Add to Favorites"
-        fav_action = menu.addAction(fav_text)
+        fav_text = "Remove from Favorites" if asset.get("is_favorite") else "Add to Favorites"
+        fav_action = menu.addAction(fav_text + count)
 
         menu.addSeparator()
 
         # Install option
-        install_action = menu.addAction("Install to DaVinci Resolve")
+        install_action = menu.addAction("Install to DaVinci Resolve" + count)
+        move_action = menu.addAction("Move to Folder" + count + "...")
+        lut_paths = [a["file_path"] for a in selected if a.get("file_type") == 'lut']
+        image_paths = [a["file_path"] for a in selected if a.get("file_type") == 'image']
+        compare_action = None
+        if lut_paths:
+            target = os.path.basename(image_paths[0]) if image_paths else "Reference"
+            compare_action = menu.addAction(f"Compare LUTs ({len(lut_paths)}) on {target}...")
+
+        similar_action = None
+        if asset.get("file_type") in ('image', 'video'):
+            similar_action = menu.addAction("Find Similar")
 
         menu.addSeparator()
         set_preview_action = menu.addAction("Set Preview Image...")
+        regenerate_action = menu.addAction(f"Regenerate Previews ({len(selected)})...")
         menu.addSeparator()
         delete_action = menu.addAction("Delete Asset")
         delete_selected_action = menu.addAction(
-            f"Delete Selected ({len(self.selectedItems())})"
+            f"Delete Selected ({len(selected)})"
         )
 
         action = menu.exec(self.mapToGlobal(position))
 
         if action == fav_action:
-            self.toggle_favorite(item)
+            self.batch_requested.emit("unfavorite" if asset.get("is_favorite") else "favorite", targets)
         elif action == install_action:
-            self.install_asset(item)
+            self.batch_requested.emit("install", targets)
+        elif action == move_action:
+            self.batch_requested.emit("move", targets)
+        elif compare_action is not None and action == compare_action:
+            self.lut_compare_requested.emit(lut_paths, image_paths[0] if image_paths else "")
+        elif similar_action is not None and action == similar_action:
+            self.find_similar_requested.emit(asset["id"])
+        elif action == regenerate_action:
+            self.regenerate_previews_requested.emit([a["id"] for a in selected] or [asset["id"]])
         elif action == set_preview_action:
-            self.set_manual_preview(item)
+            self.set_manual_preview(asset)
         elif action == delete_action:
-            self.delete_asset(item)
+            self.delete_asset(asset)
         elif action == delete_selected_action:
             self.delete_selected()
 
-    def toggle_favorite(self, item):
-        asset_id = item.data(Qt.ItemDataRole.UserRole + 1)
-        is_favorite = item.data(Qt.ItemDataRole.UserRole + 2)
-
-        # Access DB
-        parent = self.parent()
-        while parent and not hasattr(parent, "db"):
-            parent = parent.parent()
-
-        if parent and hasattr(parent, "db"):
-            parent.db.toggle_favorite(asset_id)
-
-            # Update Item UI immediately
-            new_status = 0 if is_favorite else 1
-            item.setData(Qt.ItemDataRole.UserRole + 2, new_status)
-
-            text = item.text()
-            if new_status:
-                if not text.startswith("⭐ "):
-                    item.setText("⭐ " + text)
-            else:
-                item.setText(text.replace("⭐ ", ""))
-            
-            # Notify MainWindow to update count
-            self.favorite_changed.emit(asset_id)
-        else:
-            print("DB not found")
-
-    def install_asset(self, item):
-        file_path = item.data(Qt.ItemDataRole.UserRole)
-        asset_id = item.data(Qt.ItemDataRole.UserRole + 1)
-
+    def _find_db(self):
         parent = self.parent()
         while parent and not hasattr(parent, "db"):
             parent = parent.parent()
+        return parent.db if parent else None
 
-        if parent and hasattr(parent, "db"):
-            asset_data = parent.db.get_asset_by_id(asset_id)
-            if asset_data:
-                success, msg = self.installer.install_asset(asset_data)
-                if success:
-                    QMessageBox.information(
-                        self,
-                        "Install Success",
-                        msg
-                        + "\n\nPlease restart DaVinci Resolve or switch pages to see it.",
-                    )
-                else:
-                    QMessageBox.warning(self, "Install Failed", msg)
-            else:
-                QMessageBox.warning(self, "Error", "Could not retrieve asset data.")
-        else:
-            QMessageBox.warning(self, "Error", "Database connection not found.")
-
-    def set_manual_preview(self, item):
+    def set_manual_preview(self, asset):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Select Preview Image", "", "Images (*.png *.jpg *.jpeg)"
         )
         if file_path:
-            asset_id = item.data(Qt.ItemDataRole.UserRole + 1)
-
-            parent = self.parent()
-            while parent and not hasattr(parent, "db"):
-                parent = parent.parent()
-
-            if parent and hasattr(parent, "db"):
-                parent.db.update_asset_preview(asset_id, file_path)
-                item.setIcon(QIcon(file_path))
+            db = self._find_db()
+            if db is not None:
+                db.update_asset_preview(asset["id"], file_path)
+                # The same file may have been picked before with other content
+                self.icon_loader.discard(file_path)
+                self.asset_model.update_asset(asset["id"], preview_path=file_path)
             else:
                 print("Could not find DB connection")
 
-    def delete_asset(self, item):
+    def remove_assets(self, asset_ids):
+        """Drops these assets' rows from the grid (the rest is left alone)."""
+        if self._scrub_asset_id in asset_ids:
+            self._stop_scrub()
+        self.asset_model.remove_assets(asset_ids)
+
+    def delete_asset(self, asset):
         confirm = QMessageBox.question(
             self,
             "Delete Asset",
-            f"Are you sure you want to delete '{item.text()}'?\nThis will remove it from the library and delete the file from storage.",
+            f"Are you sure you want to delete '{display_name(asset)}'?\nThis will remove it from the library and move the file to the trash (Ctrl+Z undoes it).",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
 
         if confirm == QMessageBox.StandardButton.Yes:
-            asset_id = item.data(Qt.ItemDataRole.UserRole + 1)
-            file_path = item.data(Qt.ItemDataRole.UserRole)
-
-            parent = self.parent()
-            while parent and not hasattr(parent, "db"):
-                parent = parent.parent()
-
-            if parent and hasattr(parent, "db"):
-                parent.db.delete_asset(asset_id)
-                try:
-                    if file_path and os.path.exists(file_path):
-                        os.remove(file_path)
-                except Exception as e:
-                    print(f"Error deleting file: {e}")
-
-                self.takeItem(self.row(item))
-            self.item_deleted.emit()
+            self.batch_requested.emit("delete", [asset["id"]])
 
     def delete_selected(self):
-        items = self.selectedItems()
-        if not items:
+        assets = self._selected_rows()
+        if not assets:
             return
 
         confirm = QMessageBox.question(
             self,
             "Delete Selected Assets",
-            f"Are you sure you want to delete {len(items)} selected asset(s)?\\nThis will permanently remove them.",
+            f"Are you sure you want to delete {len(assets)} selected asset(s)?\nThey can be restored with Ctrl+Z until the app is closed.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
 
         if confirm == QMessageBox.StandardButton.Yes:
-            parent = self.parent()
-            while parent and not hasattr(parent, "db"):
-                parent = parent.parent()
-
-            if parent and hasattr(parent, "db"):
-                for item in items:
-                    asset_id = item.data(Qt.ItemDataRole.UserRole + 1)
-                    file_path = item.data(Qt.ItemDataRole.UserRole)
-
-                    parent.db.delete_asset(asset_id)
-                    try:
-                        if file_path and os.path.exists(file_path):
-                            os.remove(file_path)
-                    except Exception as e:
-                        print(f"Error deleting file: {e}")
-
-                    self.takeItem(self.row(item))
-            self.item_deleted.emit()
+            self.batch_requested.emit("delete", [a["id"] for a in assets])
 
     def _is_media_file(self, file_path):
         """Check if file is a supported media format"""
@@ -373,9 +744,9 @@ class AssetGrid(QListWidget):
         ext = os.path.splitext(file_path)[1].lower()
         return ext in media_extensions
 
-    def on_item_double_clicked(self, item):
+    def on_item_double_clicked(self, index):
         """Handle double-click: Open file in default system viewer"""
-        file_path = item.data(Qt.ItemDataRole.UserRole)
+        file_path = index.data(FILE_PATH_ROLE)
         if file_path and os.path.exists(file_path):
             try:
                 os.startfile(file_path)
@@ -385,8 +756,8 @@ class AssetGrid(QListWidget):
     def keyPressEvent(self, event):
         """Handle Space key to open preview"""
         if event.key() == Qt.Key.Key_Space:
-            items = self.selectedItems()
-            if items:
-                self.on_item_double_clicked(items[0])
+            assets = self._selected_rows(limit=1)
+            if assets:
+                self.on_item_double_clicked(self.index_for_asset(assets[0]["id"]))
         else:
             super().keyPressEvent(event)
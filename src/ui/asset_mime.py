@@ -0,0 +1,95 @@
+import os
+from collections import OrderedDict
+
+from PyQt6.QtCore import QByteArray, QMimeData, QUrl
+
+SETTING_CACHE_BYTES = 16 * 1024 * 1024  # .setting texts kept for repeated drags
+URI_LIST = "text/uri-list"
+PLAIN_TEXT = "text/plain"
+
+
+class SettingTextCache:
+    """
+    Contents of .setting files (Fusion macros), keyed by path and checked
+    against size and mtime, so dragging the same macros again reads nothing.
+    Least recently used texts are dropped above budget_bytes.
+    """
+    def __init__(self, budget_bytes=SETTING_CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self._texts = OrderedDict()  # path -> (size, mtime_ns, text)
+        self._bytes = 0
+
+    def text(self, path):
+        """The file's text, or None if it can't be read."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entry = self._texts.get(path)
+        if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+            self._texts.move_to_end(path)
+            return entry[2]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Could not read {path}: {e}")
+            return None
+        self._store(path, (st.st_size, st.st_mtime_ns, text))
+        return text
+
+    def _store(self, path, entry):
+        old = self._texts.pop(path, None)
+        if old is not None:
+            self._bytes -= len(old[2])
+        self._texts[path] = entry
+        self._bytes += len(entry[2])
+        while self._bytes > self.budget_bytes and len(self._texts) > 1:
+            _, evicted = self._texts.popitem(last=False)
+            self._bytes -= len(evicted[2])
+
+
+class AssetMimeData(QMimeData):
+    """
+    Drag payload for assets. Only the paths are known when the drag starts:
+    the URL list (existing files) and the text (.setting contents, or else
+    the paths) are built the first time a drop target asks for them.
+    """
+    def __init__(self, file_paths, setting_cache):
+        super().__init__()
+        self._file_paths = file_paths
+        self._setting_cache = setting_cache
+        self._paths = None
+        self._text = None
+
+    def formats(self):
+        return [URI_LIST, PLAIN_TEXT]
+
+    def hasFormat(self, mime_type):
+        return mime_type in (URI_LIST, PLAIN_TEXT)
+
+    def retrieveData(self, mime_type, preferred_type):
+        if mime_type == URI_LIST:
+            return [QUrl.fromLocalFile(p) for p in self.paths()]
+        if mime_type == PLAIN_TEXT:
+            return QByteArray(self.text_payload().encode("utf-8"))
+        return None
+
+    def paths(self):
+        """Absolute paths (forward slashes) of the dragged files that exist."""
+        if self._paths is None:
+            self._paths = [
+                os.path.abspath(p).replace("\\", "/") for p in self._file_paths if p and os.path.exists(p)
+            ]
+        return self._paths
+
+    def text_payload(self):
+        if self._text is None:
+            settings = [p for p in self.paths() if p.lower().endswith(".setting")]
+            texts = [t for t in (self._setting_cache.text(p) for p in settings) if t is not None]
+            if texts:
+                # Resolve pastes dropped Fusion macros from their text
+                self._text = "".join(t + "\n" for t in texts)
+            else:
+                self._text = "\n".join(self.paths())
+        return self._text
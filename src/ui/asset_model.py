@@ -0,0 +1,230 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# Same role numbers the QListWidget items used
+FILE_PATH_ROLE = Qt.ItemDataRole.UserRole
+ASSET_ID_ROLE = Qt.ItemDataRole.UserRole + 1
+FAVORITE_ROLE = Qt.ItemDataRole.UserRole + 2
+PREVIEW_PATH_ROLE = Qt.ItemDataRole.UserRole + 3
+FILE_TYPE_ROLE = Qt.ItemDataRole.UserRole + 4
+FILMSTRIP_PATH_ROLE = Qt.ItemDataRole.UserRole + 5
+PREVIEW_STATE_ROLE = Qt.ItemDataRole.UserRole + 6
+
+# Each separate run of inserted/removed rows costs the view a pass over all rows:
+# past this many runs x rows a reset is cheaper than the diff
+MAX_DIFF_COST = 20000000
+
+_FIELD_ROLES = {
+    FILE_PATH_ROLE: "file_path",
+    ASSET_ID_ROLE: "id",
+    FILMSTRIP_PATH_ROLE: "filmstrip_path",
+    FILE_TYPE_ROLE: "file_type",
+    PREVIEW_STATE_ROLE: "preview_state",
+}
+
+
+def display_name(asset):
+    return "⭐ " + asset["file_name"] if asset.get("is_favorite") else asset["file_name"]
+
+
+def preview_path(asset):
+    """The asset's preview, or None while it has none to show."""
+    path = asset.get("preview_path")
+    if path == asset["file_path"] and asset.get("file_type") == "image":
+        # Legacy entry pointing at the full-size original; wait for the thumbnail instead
+        return None
+    return path
+
+
+class AssetListModel(QAbstractListModel):
+    """
+    The asset dicts from the DB, in display order, behind the asset grid.
+    Nothing is built per row: text and icons are produced in data() for the
+    rows the view actually paints. The icon comes from icon_provider(asset),
+    set by the view.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._assets = []
+        self._row_of = {}  # asset_id -> row
+        self.icon_provider = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._assets)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        asset = self._assets[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return display_name(asset)
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icon_provider(asset) if self.icon_provider else None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return asset["file_name"]
+        if role == FAVORITE_ROLE:
+            return asset.get("is_favorite", 0)
+        if role == PREVIEW_PATH_ROLE:
+            return preview_path(asset)
+        field = _FIELD_ROLES.get(role)
+        return asset.get(field) if field else None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    # --- Asset access ---
+    def asset_at(self, row):
+        return self._assets[row]
+
+    def asset(self, asset_id):
+        row = self._row_of.get(asset_id)
+        return self._assets[row] if row is not None else None
+
+    def index_for_asset(self, asset_id):
+        row = self._row_of.get(asset_id)
+        return self.index(row) if row is not None else QModelIndex()
+
+    # --- Changes ---
+    def set_assets(self, assets):
+        """Replaces the whole list in one reset (a folder switch, a search). Keeps the dicts, no copies."""
+        self.beginResetModel()
+        self._assets = list(assets)
+        self._row_of = {asset["id"]: row for row, asset in enumerate(self._assets)}
+        self.endResetModel()
+
+    def clear(self):
+        self.set_assets([])
+
+    def append_asset(self, asset_data):
+        row = len(self._assets)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._assets.append(asset_data)
+        self._row_of[asset_data["id"]] = row
+        self.endInsertRows()
+
+    def remove_assets(self, asset_ids):
+        rows = sorted((self._row_of[i] for i in set(asset_ids) if i in self._row_of), reverse=True)
+        if rows:
+            self._remove_rows(rows)
+            self._reindex(rows[-1])
+
+    def _remove_rows(self, rows):
+        """rows: descending. Removes contiguous runs from the bottom up so earlier row numbers stay valid."""
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            for removed in self._assets[start:end + 1]:
+                del self._row_of[removed["id"]]
+            del self._assets[start:end + 1]
+            self.endRemoveRows()
+            if row is not None:
+                start = end = row
+
+    def _reindex(self, start):
+        for row in range(start, len(self._assets)):
+            self._row_of[self._assets[row]["id"]] = row
+
+    @staticmethod
+    def _runs(flags):
+        """Number of separate True stretches in flags."""
+        return sum(1 for previous, flag in zip([False] + flags, flags) if flag and not previous)
+
+    def apply_assets(self, assets):
+        """
+        Shows exactly these assets like set_assets, but as row removals, insertions
+        and an update of the rows that stay, so the selection and the rows the
+        user is looking at survive. Falls back to a reset when the rows that stay
+        change order or the diff is scattered over too many places.
+        Returns False if it had to reset.
+        """
+        assets = list(assets)
+        old_order = [a["id"] for a in self._assets]
+        new_order = [a["id"] for a in assets]
+        if new_order == old_order:
+            # Same rows (a refresh): only repaint the ones whose data changed
+            changed = [row for row in range(len(assets)) if self._assets[row] != assets[row]]
+            self._assets = assets
+            if changed:
+                self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+            return True
+
+        new_ids = set(new_order)
+        removed = [asset_id not in new_ids for asset_id in old_order]
+        kept = [asset_id for asset_id in old_order if asset_id in new_ids]
+        kept_ids = set(kept)
+        inserted = [asset_id not in kept_ids for asset_id in new_order]
+        runs = self._runs(removed) + self._runs(inserted)
+        if ([asset_id for asset_id in new_order if asset_id in kept_ids] != kept
+                or runs * max(len(self._assets), len(assets)) > MAX_DIFF_COST):
+            self.set_assets(assets)
+            return False
+
+        rows = [row for row in range(len(removed) - 1, -1, -1) if removed[row]]
+        if rows:
+            self._remove_rows(rows)
+
+        # What is left is `kept`, in the new order: insert the new runs in between
+        changed = []
+        row = 0
+        while row < len(assets):
+            if not inserted[row]:
+                if self._assets[row] != assets[row]:  # Favorite, preview... changed meanwhile
+                    self._assets[row] = assets[row]
+                    changed.append(row)
+                row += 1
+                continue
+            end = row
+            while end < len(assets) and inserted[end]:
+                end += 1
+            self.beginInsertRows(QModelIndex(), row, end - 1)
+            self._assets[row:row] = assets[row:end]
+            self.endInsertRows()
+            row = end
+
+        self._reindex(0)
+        if changed:
+            self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+        return True
+
+    def asset_ids(self):
+        return [asset["id"] for asset in self._assets]
+
+    def reorder(self, asset_ids):
+        """
+        Puts the same rows in this order (a sort change) as one layout change,
+        so the selection and the current item move with their rows. Rows not in
+        asset_ids keep their relative order at the end.
+        """
+        order = [i for i in asset_ids if i in self._row_of]
+        if len(order) < len(self._assets):
+            listed = set(order)
+            order += [a["id"] for a in self._assets if a["id"] not in listed]
+        self.layoutAboutToBeChanged.emit()
+        old_assets = self._assets
+        self._assets = [old_assets[self._row_of[i]] for i in order]
+        self._reindex(0)
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(self._row_of[old_assets[index.row()]["id"]]) for index in persistent]
+        )
+        self.layoutChanged.emit()
+
+    def update_asset(self, asset_id, **fields):
+        """Sets asset fields (preview_path=..., is_favorite=...) and repaints its row."""
+        row = self._row_of.get(asset_id)
+        if row is None:
+            return False
+        self._assets[row].update(fields)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def refresh_icons(self):
+        """Icons depend on the view mode: tells the view every decoration changed."""
+        if self._assets:
+            self.dataChanged.emit(self.index(0), self.index(len(self._assets) - 1),
+                                  [Qt.ItemDataRole.DecorationRole])
@@ -0,0 +1,79 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _BatchJob(QRunnable):
+    def __init__(self, runner, task):
+        super().__init__()
+        self.runner = runner
+        self.task = task
+
+    def run(self):
+        runner = self.runner
+        error = None
+        try:
+            self.task.run(progress_callback=runner._progress.emit, should_stop=runner.is_cancelled)
+        except Exception as e:
+            error = e
+        # Queued to the GUI thread: the DB is only written there
+        runner._done.emit(self.task, error)
+
+
+class BatchRunner(QObject):
+    """
+    Runs one BatchTask at a time: its file work on a worker thread, then its
+    finish() (DB writes, journal) back on the GUI thread. finished carries
+    the task and what finish() returned (None if the work raised).
+    """
+    progress = pyqtSignal(int, int)  # done, total
+    finished = pyqtSignal(object, object)  # task, result
+    _progress = pyqtSignal(int, int)
+    _done = pyqtSignal(object, object)  # task, exception or None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._task = None
+        self._cancelled = False
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._progress.connect(self.progress)
+        self._done.connect(self._on_done)
+
+    def busy(self):
+        return self._task is not None
+
+    def start(self, task):
+        if self._task is not None:
+            raise RuntimeError("A batch is already running")
+        self._task = task
+        self._cancelled = False
+        self._pool.start(_BatchJob(self, task))
+
+    def cancel(self):
+        """Stops dispatching files; what was already done is still finished."""
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _on_done(self, task, error):
+        if task is not self._task:
+            return  # Already finished by shutdown()
+        self._task = None
+        if error is not None:
+            print(f"Batch {task.operation} failed: {error}")
+            result = None
+        else:
+            result = task.finish()
+        self.finished.emit(task, result)
+
+    def shutdown(self):
+        """Cancels the running batch and records what it got done before returning."""
+        self.cancel()
+        self._pool.waitForDone()
+        if self._task is not None:
+            # Its queued _done can't be delivered any more: finish it here
+            task, self._task = self._task, None
+            try:
+                task.finish()
+            except Exception as e:
+                print(f"Batch {task.operation} failed: {e}")
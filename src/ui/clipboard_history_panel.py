@@ -1,128 +1,327 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QListWidget, QListWidgetItem, 
+    QWidget, QVBoxLayout, QListView, QStyledItemDelegate,
     QLabel, QHBoxLayout, QPushButton, QStyle
 )
-from PyQt6.QtGui import QPixmap, QIcon, QDrag
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QMimeData, QUrl
+from PyQt6.QtGui import QPixmap, QDrag, QPainter, QColor, QFont, QPen, QCursor
+from PyQt6.QtCore import (
+    Qt, QSize, QRect, QEvent, pyqtSignal, QMimeData, QUrl, QAbstractListModel, QModelIndex,
+    QRunnable, QThreadPool, QTimer
+)
+from collections import OrderedDict
 import os
 import datetime
 
-class ClipboardItemWidget(QWidget):
+ITEM_ID_ROLE = Qt.ItemDataRole.UserRole + 1
+THUMB_MISSING_ROLE = Qt.ItemDataRole.UserRole + 2  # True once the image turned out unreadable
+FILE_PATH_ROLE = Qt.ItemDataRole.UserRole  # Same role the QListWidget items used
+PIXMAP_CACHE_SIZE = 300  # Decoded thumbnails kept for scrolling back
+ROW_SIZE = QSize(200, 110)
+BACKFILL_FLUSH_MS = 200  # Thumbnails made in the background are stored and repainted in batches
+
+
+def created_label(created_at):
+    # SQLite default is YYYY-MM-DD HH:MM:SS
+    try:
+        return datetime.datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S").strftime("%H:%M %d/%m")
+    except (TypeError, ValueError):
+        return created_at or ""
+
+
+class _ThumbnailBackfill(QRunnable):
+    """Makes the thumbnails of items saved before thumbnails existed, in the order given."""
+    def __init__(self, model, items):
+        super().__init__()
+        self.model = model
+        self.items = items  # (item_id, file_path)
+        self.cancelled = False
+        self.done = False
+
+    def run(self):
+        for item_id, file_path in self.items:
+            if self.cancelled:
+                break
+            try:
+                thumb_path = self.model.clipboard_manager.make_thumbnail(file_path)
+            except Exception as e:
+                print(f"Clipboard thumbnail for {file_path} failed: {e}")
+                thumb_path = None
+            # Queued to the GUI thread, which owns the rows and the DB connection
+            self.model._thumb_made.emit(item_id, thumb_path or "")
+        self.done = True
+
+
+class ClipboardHistoryModel(QAbstractListModel):
+    """
+    The history rows from the DB, newest first. New pastes are prepended,
+    deletes remove single rows; thumbnails are loaded only for the rows the
+    view paints. Items without one (saved before thumbnails existed) get it
+    from a background job, newest first, and show a placeholder meanwhile.
+    """
+    _thumb_made = pyqtSignal(int, str)  # item_id, thumb path ("" if the image is unreadable)
+
+    def __init__(self, clipboard_manager, parent=None):
+        super().__init__(parent)
+        self.clipboard_manager = clipboard_manager
+        self._items = []
+        self._by_id = {}
+        self._pixmaps = OrderedDict()  # thumb path -> QPixmap
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._backfills = []
+        self._made = []  # (item_id, thumb path) not yet stored
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(BACKFILL_FLUSH_MS)
+        self._flush_timer.timeout.connect(self._store_made)
+        self._thumb_made.connect(self._on_thumb_made)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self._items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{item.get('width', 0)} x {item.get('height', 0)}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return created_label(item.get("created_at"))
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.thumbnail(item)
+        if role == FILE_PATH_ROLE:
+            return item["file_path"]
+        if role == ITEM_ID_ROLE:
+            return item["id"]
+        if role == THUMB_MISSING_ROLE:
+            return "_missing" in item
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def thumbnail(self, item):
+        """The item's thumbnail pixmap, or None if the image is missing."""
+        thumb_path = item.get("thumb_path")
+        pixmap = self._pixmaps.get(thumb_path) if thumb_path else None
+        if pixmap is not None:
+            self._pixmaps.move_to_end(thumb_path)
+            return pixmap
+        if "_missing" in item or "_backfill" in item:
+            return None
+        thumb_path = self.clipboard_manager.thumbnail_path(item)
+        pixmap = QPixmap(thumb_path) if thumb_path else QPixmap()
+        if pixmap.isNull():
+            self._queue_backfill([item])  # Thumbnail deleted or unreadable: make it again
+            return None
+        self._pixmaps[thumb_path] = pixmap
+        if len(self._pixmaps) > PIXMAP_CACHE_SIZE:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def item_at(self, row):
+        return self._items[row]
+
+    def newest_id(self):
+        return max((item["id"] for item in self._items), default=None)
+
+    def set_items(self, items):
+        self._cancel_backfills()
+        self.beginResetModel()
+        self._items = list(items)
+        self._by_id = {item["id"]: item for item in self._items}
+        self._pixmaps.clear()
+        self.endResetModel()
+        self._queue_backfill([item for item in self._items if not item.get("thumb_path")])
+
+    def prepend_items(self, items):
+        if not items:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(items) - 1)
+        self._items[0:0] = items
+        self._by_id.update((item["id"], item) for item in items)
+        self.endInsertRows()
+        self._queue_backfill([item for item in items if not item.get("thumb_path")])
+
+    # --- Thumbnail backfill ---
+    def _queue_backfill(self, items):
+        if not items:
+            return
+        for item in items:
+            item["_backfill"] = True
+        job = _ThumbnailBackfill(self, [(item["id"], item["file_path"]) for item in items])
+        job.setAutoDelete(False)  # Kept for cancelling
+        self._backfills.append(job)
+        self._pool.start(job)
+
+    def _on_thumb_made(self, item_id, thumb_path):
+        item = self._by_id.get(item_id)
+        if item is None:
+            return  # Deleted meanwhile
+        item.pop("_backfill", None)
+        if thumb_path:
+            item["thumb_path"] = thumb_path
+            self._made.append((item_id, thumb_path))
+        else:
+            item["_missing"] = True
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _store_made(self):
+        made, self._made = self._made, []
+        db = self.clipboard_manager.db_manager
+        if made and db:
+            db.set_clipboard_thumbs(made)
+        self._backfills = [job for job in self._backfills if not job.done]
+        if self._items:
+            # Only the rows on screen are repainted
+            self.dataChanged.emit(self.index(0), self.index(len(self._items) - 1))
+
+    def _cancel_backfills(self):
+        for job in self._backfills:
+            job.cancelled = True
+        self._backfills = []
+        self._pool.clear()
+        self._pool.waitForDone()  # At most the image being decoded
+
+    def shutdown(self):
+        """Stops the backfill and stores what it made."""
+        self._cancel_backfills()
+        self._flush_timer.stop()
+        self._store_made()
+
+    def remove_item(self, item_id):
+        for row, item in enumerate(self._items):
+            if item["id"] == item_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._items[row]
+                self._by_id.pop(item_id, None)
+                self.endRemoveRows()
+                self._pixmaps.pop(item.get("thumb_path"), None)
+                return item
+        return None
+
+
+class ClipboardItemDelegate(QStyledItemDelegate):
     """
-    Custom widget for each clipboard history item.
-    [ Thumbnail ] [ Info: Size, Time ] [ Delete Btn ]
+    Paints each history row: [ Thumbnail ] [ Info: Size, Time ] [ Delete Btn ].
+    A click on the trash icon emits delete_clicked with the item id.
     """
-    delete_clicked = pyqtSignal(int) # Emits item_id
+    delete_clicked = pyqtSignal(int)  # Emits item_id
 
-    def __init__(self, item_data, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.item_data = item_data
-        self.item_id = item_data['id']
-        self.file_path = item_data['file_path']
-        
-        self.setFixedHeight(100)
-        self.setStyleSheet("background-color: #2b2b2b; border-radius: 6px; margin: 2px;")
-        
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(10, 10, 10, 10)
-        
+        self._trash_icon = None
+
+    def sizeHint(self, option, index):
+        return ROW_SIZE
+
+    @staticmethod
+    def _card_rect(option):
+        return option.rect.adjusted(2, 2, -2, -7)  # 5px gap under each row
+
+    def _delete_rect(self, option):
+        card = self._card_rect(option)
+        return QRect(card.right() - 40, card.center().y() - 15, 30, 30)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        card = self._card_rect(option)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#2b2b2b"))
+        painter.drawRoundedRect(card, 6, 6)
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(QColor("#007acc"), 1))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRoundedRect(card, 8, 8)
+
         # 1. Thumbnail
-        self.thumb_label = QLabel()
-        self.thumb_label.setFixedSize(120, 80)
-        self.thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.thumb_label.setStyleSheet("background-color: #1e1e1e; border: 1px solid #444;")
-        
-        if os.path.exists(self.file_path):
-            pixmap = QPixmap(self.file_path)
-            self.thumb_label.setPixmap(pixmap.scaled(
-                120, 80, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
-            ))
+        thumb_rect = QRect(card.left() + 10, card.top() + 10, 120, 80)
+        painter.setPen(QPen(QColor("#444"), 1))
+        painter.setBrush(QColor("#1e1e1e"))
+        painter.drawRect(thumb_rect)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None:
+            size = pixmap.size().scaled(thumb_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(thumb_rect.center())
+            painter.drawPixmap(target, pixmap)
         else:
-            self.thumb_label.setText("Missing")
-        
-        layout.addWidget(self.thumb_label)
-        
+            painter.setPen(QColor("#888"))
+            painter.drawText(thumb_rect, Qt.AlignmentFlag.AlignCenter,
+                             "Missing" if index.data(THUMB_MISSING_ROLE) else "…")
+
         # 2. Info
-        info_layout = QVBoxLayout()
-        width = item_data.get('width', 0)
-        height = item_data.get('height', 0)
-        created_at = item_data.get('created_at', '')
-        
-        # Parse date nicely
-        try:
-             # Depending on SQLite format, might need parsing. 
-             # SQLite default is YYYY-MM-DD HH:MM:SS
-             dt = datetime.datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")
-             created_str = dt.strftime("%H:%M %d/%m")
-        except:
-            created_str = created_at
-
-        size_lbl = QLabel(f"📏 {width} x {height}")
-        size_lbl.setStyleSheet("color: #ddd; font-weight: bold;")
-        
-        date_lbl = QLabel(f"🕒 {created_str}")
-        date_lbl.setStyleSheet("color: #888; font-size: 11px;")
-        
-        info_layout.addWidget(size_lbl)
-        info_layout.addWidget(date_lbl)
-        info_layout.addStretch()
-        
-        layout.addLayout(info_layout, 1)
-        
+        info_rect = QRect(thumb_rect.right() + 12, thumb_rect.top(), card.right() - thumb_rect.right() - 60, 20)
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#ddd"))
+        painter.drawText(info_rect, Qt.AlignmentFlag.AlignVCenter, f"📏 {index.data()}")
+        font.setBold(False)
+        font.setPixelSize(11)
+        painter.setFont(font)
+        painter.setPen(QColor("#888"))
+        painter.drawText(info_rect.translated(0, 22), Qt.AlignmentFlag.AlignVCenter,
+                         f"🕒 {index.data(Qt.ItemDataRole.ToolTipRole)}")
+
         # 3. Delete Button
-        del_btn = QPushButton()
-        del_btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TrashIcon))
-        del_btn.setFixedSize(30, 30)
-        del_btn.setToolTip("Delete this item")
-        del_btn.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #c42b1c;
-                border-radius: 4px;
-            }
-        """)
-        del_btn.clicked.connect(self._on_delete)
-        layout.addWidget(del_btn)
+        delete_rect = self._delete_rect(option)
+        view = self.parent()
+        if option.state & QStyle.StateFlag.State_MouseOver and view is not None:
+            if delete_rect.contains(view.viewport().mapFromGlobal(QCursor.pos())):
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(QColor("#c42b1c"))
+                painter.drawRoundedRect(delete_rect, 4, 4)
+        if self._trash_icon is None and view is not None:
+            self._trash_icon = view.style().standardIcon(QStyle.StandardPixmap.SP_TrashIcon)
+        if self._trash_icon is not None:
+            self._trash_icon.paint(painter, delete_rect.adjusted(7, 7, -7, -7))
+        painter.restore()
 
-    def _on_delete(self):
-        self.delete_clicked.emit(self.item_id)
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self._delete_rect(option).contains(event.position().toPoint())):
+            self.delete_clicked.emit(index.data(ITEM_ID_ROLE))
+            return True
+        return super().editorEvent(event, model, option, index)
 
 
-class ClipboardHistoryList(QListWidget):
+class ClipboardHistoryList(QListView):
     """
     Subclass to handle Drag and Drop from the list to Resolve.
     """
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setDragEnabled(True)
-        self.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)  # Hover state for the delete button
         self.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #1e1e1e;
                 outline: none;
                 border: none;
             }
-            QListWidget::item {
-                background-color: transparent;
-                margin-bottom: 5px;
-            }
-            QListWidget::item:selected {
-                background-color: transparent; 
-                border: 1px solid #007acc;
-                border-radius: 8px;
-            }
         """)
 
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        index = self.indexAt(event.position().toPoint())
+        if index.isValid():
+            self.update(index)  # Delete button hover follows the cursor
+
     def startDrag(self, supportedActions):
-        item = self.currentItem()
-        if not item:
+        index = self.currentIndex()
+        if not index.isValid():
             return
-            
+
         # Get stored file path
-        file_path = item.data(Qt.ItemDataRole.UserRole)
+        file_path = index.data(FILE_PATH_ROLE)
         if not file_path or not os.path.exists(file_path):
             return
 
@@ -131,14 +330,12 @@ class ClipboardHistoryList(QListWidget):
         url = QUrl.fromLocalFile(os.path.abspath(file_path))
         mime_data.setUrls([url])
         drag.setMimeData(mime_data)
-        
+
         # Set drag pixmap
-        widget = self.itemWidget(item)
-        if widget:
-            pixmap = widget.thumb_label.pixmap()
-            if pixmap:
-                drag.setPixmap(pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio))
-        
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap:
+            drag.setPixmap(pixmap.scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio))
+
         drag.exec(Qt.DropAction.CopyAction)
 
 
@@ -146,64 +343,58 @@ class ClipboardHistoryPanel(QWidget):
     def __init__(self, clipboard_manager, parent=None):
         super().__init__(parent)
         self.clipboard_manager = clipboard_manager
-        
+        self._loaded = False
+
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        
+
         # Header
         header_layout = QHBoxLayout()
         title = QLabel("CLIPBOARD HISTORY")
         title.setStyleSheet("color: #ccc; font-weight: bold; margin: 10px;")
-        
+
         clear_btn = QPushButton("Clear All")
         clear_btn.setStyleSheet("color: #ff6b6b; border: 1px solid #ff6b6b; padding: 4px 8px; border-radius: 4px;")
         clear_btn.clicked.connect(self.clear_all)
-        
+
         header_layout.addWidget(title)
         header_layout.addStretch()
         header_layout.addWidget(clear_btn)
         header_layout.setContentsMargins(5,5,10,0)
-        
+
         layout.addLayout(header_layout)
-        
-        # List
+
+        # List (one model row per item, painted by the delegate)
+        self.model = ClipboardHistoryModel(clipboard_manager, self)
         self.list_widget = ClipboardHistoryList()
+        self.list_widget.setModel(self.model)
+        self.delegate = ClipboardItemDelegate(self.list_widget)
+        self.delegate.delete_clicked.connect(self.delete_item)
+        self.list_widget.setItemDelegate(self.delegate)
         layout.addWidget(self.list_widget)
-        
+
         self.refresh_list()
 
     def refresh_list(self):
-        self.list_widget.clear()
-        if not self.clipboard_manager.db_manager:
+        """Loads the history once; later calls only prepend items saved since."""
+        db = self.clipboard_manager.db_manager
+        if not db:
             return
-
-        items = self.clipboard_manager.db_manager.get_clipboard_history()
-        for item_data in items:
-            self.add_item_to_list(item_data)
-
-    def add_item_to_list(self, item_data):
-        item = QListWidgetItem(self.list_widget)
-        item.setSizeHint(QSize(200, 110))
-        item.setData(Qt.ItemDataRole.UserRole, item_data['file_path'])
-        
-        widget = ClipboardItemWidget(item_data)
-        widget.delete_clicked.connect(self.delete_item)
-        
-        self.list_widget.addItem(item)
-        self.list_widget.setItemWidget(item, widget)
+        if not self._loaded:
+            self.model.set_items(db.get_clipboard_history(limit=None))
+            self._loaded = True
+        else:
+            self.model.prepend_items(db.get_clipboard_history(limit=None, after_id=self.model.newest_id()))
 
     def delete_item(self, item_id):
-        # Find item with this ID
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            widget = self.list_widget.itemWidget(item)
-            if widget.item_id == item_id:
-                # Remove from DB/Disk
-                self.clipboard_manager.delete_history_item(item_id, widget.file_path)
-                # Remove from UI
-                self.list_widget.takeItem(self.list_widget.row(item))
-                break
+        # Remove from UI, then from DB/Disk
+        item = self.model.remove_item(item_id)
+        if item:
+            self.clipboard_manager.delete_history_item(item_id, item["file_path"], item.get("thumb_path"))
 
     def clear_all(self):
+        self.model.set_items([])  # Stops the backfill before its files go
         self.clipboard_manager.clear_history()
-        self.list_widget.clear()
+
+    def shutdown(self):
+        self.model.shutdown()
@@ -0,0 +1,279 @@
+import os
+
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, QFileSystemWatcher, QTimer
+
+try:
+    from src.database.db_manager import natural_sort_key
+    from src.core.batch_operations import TRASH_DIR
+except ImportError:
+    # Fallback or running directly
+    import sys
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.database.db_manager import natural_sort_key
+    from src.core.batch_operations import TRASH_DIR
+
+FOLDER_PATH_ROLE = Qt.ItemDataRole.UserRole  # Same role the QTreeWidget items used
+WATCH_DEBOUNCE_MS = 200  # Imports touch a folder once per file: re-list it once they pause
+HIDDEN_FOLDER = "clipboard_history"  # Saved clipboard images are not library folders
+
+
+class DirectoryListingCache:
+    """
+    Subfolder names per directory, re-listed only when the directory's mtime
+    changes (creating, removing or renaming an entry updates it).
+    """
+    def __init__(self):
+        self._listings = {}  # directory -> (mtime_ns, sorted subfolder names)
+
+    def subfolders(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._listings.pop(directory, None)
+            return []
+        entry = self._listings.get(directory)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        try:
+            with os.scandir(directory) as entries:
+                names = sorted(e.name for e in entries if e.is_dir())
+        except OSError as e:
+            print(f"Could not list {directory}: {e}")
+            names = []
+        self._listings[directory] = (mtime, names)
+        return names
+
+    def forget(self, directory):
+        self._listings.pop(directory, None)
+
+
+class _FolderNode:
+    __slots__ = ("name", "path", "parent", "row", "children", "count", "expandable")
+
+    def __init__(self, name, path, parent, row):
+        self.name = name
+        self.path = path  # Category path ("a/b"); "" for the invisible root
+        self.parent = parent
+        self.row = row
+        self.children = None  # Not loaded until the folder is expanded
+        self.count = 0
+        self.expandable = None  # Whether the view was told it has subfolders (while not loaded)
+
+
+class FolderTreeModel(QAbstractItemModel):
+    """
+    The library's folders: the union of the categories in the DB and the
+    folders on disk. Children are loaded when a folder is expanded, and
+    refresh() diffs only the loaded folders against the DB and the (cached)
+    listings, so nodes are inserted and removed in place and the view keeps
+    its expansion and selection. Loaded folders are watched for changes made
+    outside the app.
+    """
+    def __init__(self, db, storage_dir, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.storage_dir = storage_dir
+        self.listings = DirectoryListingCache()
+        self._root = _FolderNode("", "", None, 0)
+        self._nodes = {}  # category path -> loaded or shown node
+        self._db_children = {}  # category path -> names of subfolders known to the DB
+        self._counts = {}
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._changed_dirs = set()
+        self._ending_change = False
+        self._watch_timer = QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._watch_timer.timeout.connect(self._apply_directory_changes)
+        self._read_db()
+        self._load(self._root, notify=False)
+
+    # --- Qt model interface ---
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if column != 0 or node.children is None or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent)
+        return len(node.children) if node.children is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if node.children is not None:
+            return bool(node.children)
+        node.expandable = bool(self._child_names(node.path))
+        return node.expandable
+
+    def canFetchMore(self, parent):
+        return self._node(parent).children is None
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if node.children is None:
+            if self._ending_change:
+                # Asked from a rowsInserted/rowsRemoved handler: insert once that change is over
+                QTimer.singleShot(0, lambda: self._fetch_later(node))
+                return
+            self._load(node, parent)
+
+    def _fetch_later(self, node):
+        if node.children is None and self._nodes.get(node.path) is node:
+            self._load(node, self.createIndex(node.row, 0, node))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{node.name} ({node.count})" if node.count > 0 else node.name
+        if role == FOLDER_PATH_ROLE:
+            return node.path
+        return None
+
+    # --- Folder contents ---
+    def directory(self, path):
+        return os.path.join(self.storage_dir, *path.split("/")) if path else self.storage_dir
+
+    def index_for_path(self, path):
+        node = self._nodes.get(path)
+        return self.createIndex(node.row, 0, node) if node else QModelIndex()
+
+    def _read_db(self):
+        children = {}
+        for category in self.db.get_all_categories():
+            parts = category.strip("/").split("/")
+            for depth in range(len(parts)):
+                children.setdefault("/".join(parts[:depth]), set()).add(parts[depth])
+        self._db_children = children
+        self._counts = self.db.get_category_counts()
+
+    def _child_names(self, path):
+        names = set(self._db_children.get(path, ()))
+        names.update(self.listings.subfolders(self.directory(path)))
+        if not path:
+            # Deleted files waiting for undo aren't a folder of the library
+            names.discard(TRASH_DIR)
+        return sorted((n for n in names if n and HIDDEN_FOLDER not in n), key=lambda n: (natural_sort_key(n), n))
+
+    def _new_node(self, name, parent, row):
+        node = _FolderNode(name, f"{parent.path}/{name}" if parent.path else name, parent, row)
+        node.count = self._counts.get(node.path, 0)
+        self._nodes[node.path] = node
+        return node
+
+    def _load(self, node, index=QModelIndex(), notify=True):
+        names = self._child_names(node.path)
+        node.children = []  # Loaded from here on: rowCount() is the old size while the insert begins
+        if notify and names:
+            self.beginInsertRows(index, 0, len(names) - 1)
+        node.children = [self._new_node(name, node, row) for row, name in enumerate(names)]
+        if notify and names:
+            self._end_change(self.endInsertRows)
+        self._watch(node)
+
+    def _end_change(self, end_rows):
+        self._ending_change = True
+        try:
+            end_rows()
+        finally:
+            self._ending_change = False
+
+    def _watch(self, node):
+        directory = self.directory(node.path)
+        if os.path.isdir(directory):
+            self._watcher.addPath(directory)
+
+    def _forget(self, node):
+        """Drops a removed node and everything below it."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self._nodes.pop(node.path, None)
+            if node.children is not None:
+                directory = self.directory(node.path)
+                self._watcher.removePath(directory)
+                self.listings.forget(directory)
+                stack.extend(node.children)
+
+    @staticmethod
+    def _renumber(node, start):
+        """Fixes the rows of node's children from start on, before the view hears of the change."""
+        for row in range(start, len(node.children)):
+            node.children[row].row = row
+
+    def _sync(self, node, index, recursive=True):
+        """Brings node's loaded children in line with the DB and the disk as row inserts/removals."""
+        if node.children is None:
+            if node.expandable is not None and node.expandable != bool(self._child_names(node.path)):
+                node.expandable = not node.expandable
+                self.dataChanged.emit(index, index)  # The expander appeared or went
+            return
+        names = self._child_names(node.path)
+        wanted = set(names)
+        for row in range(len(node.children) - 1, -1, -1):
+            child = node.children[row]
+            if child.name not in wanted:
+                self.beginRemoveRows(index, row, row)
+                del node.children[row]
+                self._forget(child)
+                self._renumber(node, row)
+                self._end_change(self.endRemoveRows)
+        existing = {child.name for child in node.children}
+        # What is left is in sort order: new names go in between
+        for row, name in enumerate(names):
+            if name not in existing:
+                self.beginInsertRows(index, row, row)
+                node.children.insert(row, self._new_node(name, node, row))
+                self._renumber(node, row + 1)
+                self._end_change(self.endInsertRows)
+        for row, child in enumerate(node.children):
+            count = self._counts.get(child.path, 0)
+            child_index = self.createIndex(row, 0, child)
+            if count != child.count:
+                child.count = count
+                self.dataChanged.emit(child_index, child_index)
+            if recursive:
+                self._sync(child, child_index)
+
+    def refresh(self):
+        """Re-reads the categories and counts (after imports, moves, deletes) and updates the loaded folders."""
+        self._read_db()
+        self._sync(self._root, QModelIndex())
+
+    def _on_directory_changed(self, directory):
+        self._changed_dirs.add(directory)
+        self._watch_timer.start()
+
+    def _apply_directory_changes(self):
+        changed, self._changed_dirs = self._changed_dirs, set()
+        by_directory = {self.directory(path): node for path, node in self._nodes.items()}
+        by_directory[self.storage_dir] = self._root
+        for directory in changed:
+            node = by_directory.get(directory)
+            if node is None or node.children is None or (node is not self._root and self._nodes.get(node.path) is not node):
+                continue  # Not loaded, or removed by an earlier change in this batch
+            if not os.path.isdir(directory):
+                self._watcher.removePath(directory)  # Its parent's listing drops it
+                continue
+            index = self.createIndex(node.row, 0, node) if node is not self._root else QModelIndex()
+            self._sync(node, index, recursive=False)
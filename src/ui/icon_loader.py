@@ -0,0 +1,176 @@
+import os
+from collections import OrderedDict, deque
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImageReader, QPixmap
+
+ICON_CACHE_BYTES = 128 * 1024 * 1024  # Decoded icons kept for repaints and scrolling back
+ICON_WORKERS = max(2, min(4, (os.cpu_count() or 2) // 2))
+FILMSTRIP_CACHE_SIZE = 32  # Sliced sheets kept in memory for scrubbing
+
+
+class _IconJob(QRunnable):
+    def __init__(self, loader, key):
+        super().__init__()
+        self.loader = loader
+        self.key = key
+
+    def run(self):
+        mode, preview_path = self.key
+        try:
+            image = self.loader.thumbnail_store.image(mode, preview_path)
+        except Exception as e:
+            print(f"Icon loader: {preview_path}: {e}")
+            image = None
+        # Queued to the GUI thread: pixmaps may only be made there
+        self.loader._decoded.emit(self.key, image)
+
+
+class _FilmstripJob(QRunnable):
+    def __init__(self, loader, key, frame_count, size):
+        super().__init__()
+        self.loader = loader
+        self.key = key
+        self.frame_count = frame_count
+        self.size = size
+
+    def run(self):
+        mode, filmstrip_path = self.key
+        frames = None
+        try:
+            image = QImageReader(filmstrip_path).read()
+            frame_width = image.width() // self.frame_count
+            if not image.isNull() and frame_width > 0:
+                frames = [image.copy(i * frame_width, 0, frame_width, image.height())
+                          .scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio,
+                                  Qt.TransformationMode.SmoothTransformation)
+                          for i in range(self.frame_count)]
+        except Exception as e:
+            print(f"Icon loader: {filmstrip_path}: {e}")
+        self.loader._sliced.emit(self.key, frames)
+
+
+class IconLoader(QObject):
+    """
+    Loads grid icons off the GUI thread. Keys are (view mode, preview path).
+    The grid asks for what it is about to paint with want(); anything not yet
+    started is dropped when the wanted set changes, so work follows the
+    viewport. Finished icons go into a byte-budgeted LRU of QPixmaps.
+    Filmstrip sheets for hover scrubbing are sliced on the same threads,
+    keyed by (view mode, filmstrip path), and kept in a small LRU of their own.
+    """
+    icon_ready = pyqtSignal(str, str)  # mode, preview_path
+    filmstrip_ready = pyqtSignal(str, str)  # mode, filmstrip_path
+    _decoded = pyqtSignal(object, object)  # key, QImage or None
+    _sliced = pyqtSignal(object, object)  # key, [QImage] or None
+
+    def __init__(self, thumbnail_store, budget_bytes=None, workers=ICON_WORKERS, parent=None):
+        super().__init__(parent)
+        self.thumbnail_store = thumbnail_store
+        self.budget_bytes = budget_bytes or ICON_CACHE_BYTES
+        self.workers = workers
+        self._cache = OrderedDict()  # key -> QPixmap, least recently used first
+        self._cache_bytes = 0
+        self._queue = deque()
+        self._queued = set()
+        self._in_flight = set()
+        self._failed = set()  # Unreadable previews; not retried until discard()
+        self._filmstrips = OrderedDict()  # key -> [QPixmap], least recently used first
+        self._slicing = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(workers)
+        self._decoded.connect(self._on_decoded)
+        self._sliced.connect(self._on_sliced)
+
+    def cached(self, key):
+        """The decoded icon for key, or None (without queueing anything)."""
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            self._cache.move_to_end(key)
+        return pixmap
+
+    def request(self, key):
+        """Queues one key first unless already wanted (a tile being painted right now)."""
+        if key in self._queued or key in self._cache or key in self._in_flight or key in self._failed:
+            return
+        self._queued.add(key)
+        self._queue.appendleft(key)
+        self._pump()
+
+    def want(self, keys):
+        """Replaces the queue with keys, most urgent first."""
+        self._queue.clear()
+        self._queued.clear()
+        for key in keys:
+            if key in self._queued or key in self._cache or key in self._in_flight or key in self._failed:
+                continue
+            self._queued.add(key)
+            self._queue.append(key)
+        self._pump()
+
+    def filmstrip(self, key):
+        """The sliced frames for key, or None (without queueing anything)."""
+        frames = self._filmstrips.get(key)
+        if frames is not None:
+            self._filmstrips.move_to_end(key)
+        return frames
+
+    def request_filmstrip(self, key, frame_count, size):
+        """
+        Slices a filmstrip sheet into frame_count frames scaled to size. Started
+        right away rather than queued behind the prefetch: the user is hovering it.
+        """
+        if key in self._filmstrips or key in self._slicing or key in self._failed:
+            return
+        self._slicing.add(key)
+        self._pool.start(_FilmstripJob(self, key, frame_count, size), 1)
+
+    def discard(self, preview_path):
+        """Forgets every mode's icon for a preview whose content changed."""
+        for key in [k for k in self._cache if k[1] == preview_path]:
+            self._cache_bytes -= self._cost(self._cache.pop(key))
+        for key in [k for k in self._filmstrips if k[1] == preview_path]:
+            del self._filmstrips[key]
+        self._failed = {k for k in self._failed if k[1] != preview_path}
+
+    def _pump(self):
+        while self._queue and len(self._in_flight) < self.workers:
+            key = self._queue.popleft()
+            self._queued.discard(key)
+            self._in_flight.add(key)
+            self._pool.start(_IconJob(self, key))
+
+    @staticmethod
+    def _cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+    def _on_decoded(self, key, image):
+        self._in_flight.discard(key)
+        if image is None or image.isNull():
+            self._failed.add(key)
+        else:
+            pixmap = QPixmap.fromImage(image)
+            self._cache[key] = pixmap
+            self._cache_bytes += self._cost(pixmap)
+            while self._cache_bytes > self.budget_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= self._cost(evicted)
+            self.icon_ready.emit(*key)
+        self._pump()
+
+    def _on_sliced(self, key, frames):
+        self._slicing.discard(key)
+        if not frames:
+            self._failed.add(key)
+            return
+        self._filmstrips[key] = [QPixmap.fromImage(frame) for frame in frames]
+        while len(self._filmstrips) > FILMSTRIP_CACHE_SIZE:
+            self._filmstrips.popitem(last=False)
+        self.filmstrip_ready.emit(*key)
+
+    def shutdown(self):
+        """Drops queued work and waits for running decodes (before the store is closed)."""
+        self._queue.clear()
+        self._queued.clear()
+        self._pool.clear()
+        self._pool.waitForDone()
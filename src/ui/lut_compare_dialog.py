@@ -0,0 +1,105 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QGridLayout, QLabel, QScrollArea,
+                             QWidget, QDialogButtonBox, QComboBox, QHBoxLayout)
+from PyQt6.QtGui import QPixmap, QImageReader
+from PyQt6.QtCore import Qt, QSize
+import os
+
+try:
+    from src.core.lut_engine import reference_still, rgb_to_qimage, qimage_to_rgb
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.core.lut_engine import reference_still, rgb_to_qimage, qimage_to_rgb
+
+
+class LutCompareDialog(QDialog):
+    """
+    Side-by-side comparison of several LUTs on one image (or the reference
+    still). The image is decoded once at tile size and every LUT is applied
+    to that small array, so dozens of tiles render in well under a second.
+    """
+    TILE_SIZE = QSize(360, 220)
+    COLUMNS = 3
+
+    def __init__(self, lut_engine, lut_paths, image_path=None, parent=None):
+        super().__init__(parent)
+        self.lut_engine = lut_engine
+        self.lut_paths = lut_paths
+        self.image_path = image_path
+
+        self.setWindowTitle("Compare LUTs")
+        self.resize(self.TILE_SIZE.width() * self.COLUMNS + 80, 640)
+
+        self.source = self._load_source()
+        self._init_ui()
+        self._render()
+
+    def _load_source(self):
+        if self.image_path:
+            reader = QImageReader(self.image_path)
+            reader.setAutoTransform(True)
+            size = reader.size()
+            if size.isValid():
+                reader.setScaledSize(size.scaled(self.TILE_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+            if not image.isNull():
+                return qimage_to_rgb(image)
+            print(f"LUT compare: could not read {self.image_path}, using the reference still")
+        return reference_still(self.TILE_SIZE.width(), self.TILE_SIZE.height() - 40)
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+
+        options = QHBoxLayout()
+        source_name = os.path.basename(self.image_path) if self.image_path else "Reference still"
+        options.addWidget(QLabel(f"Image: {source_name}"))
+        options.addStretch()
+        options.addWidget(QLabel("Interpolation:"))
+        self.method_combo = QComboBox()
+        self.method_combo.addItems(["tetrahedral", "trilinear"])
+        self.method_combo.currentTextChanged.connect(lambda _: self._render())
+        options.addWidget(self.method_combo)
+        layout.addLayout(options)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        container = QWidget()
+        self.tiles = QGridLayout(container)
+        self.tiles.setSpacing(10)
+        scroll.setWidget(container)
+        layout.addWidget(scroll)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _add_tile(self, index, pixmap, caption):
+        tile = QLabel()
+        tile.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        tile.setStyleSheet("background-color: #2b2b2b; border-radius: 6px;")
+        if pixmap is not None:
+            tile.setPixmap(pixmap)
+        else:
+            tile.setText("Could not load LUT")
+        label = QLabel(caption)
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        label.setStyleSheet("color: #ccc;")
+
+        row, column = divmod(index, self.COLUMNS)
+        self.tiles.addWidget(tile, row * 2, column)
+        self.tiles.addWidget(label, row * 2 + 1, column)
+
+    def _render(self):
+        while self.tiles.count():
+            widget = self.tiles.takeAt(0).widget()
+            if widget is not None:
+                widget.deleteLater()
+
+        method = self.method_combo.currentText()
+        self._add_tile(0, QPixmap.fromImage(rgb_to_qimage(self.source)), "Original")
+        for index, lut_path in enumerate(self.lut_paths, start=1):
+            lut = self.lut_engine.load(lut_path)
+            pixmap = None
+            if lut is not None:
+                pixmap = QPixmap.fromImage(rgb_to_qimage(lut.apply(self.source, method)))
+            self._add_tile(index, pixmap, os.path.basename(lut_path))
@@ -13,8 +13,7 @@ from PyQt6.QtWidgets import (
     QLabel,
     QFrame,
     QFileDialog,
-    QTreeWidget,
-    QTreeWidgetItem,
+    QTreeView,
     QMessageBox,
     QSplitter,
     QSplitter,
@@ -28,7 +27,7 @@ from PyQt6.QtGui import QShortcut, QKeySequence, QIcon, QAction
 
 try:
     from src.ui.asset_grid import AssetGrid
-    from src.database.db_manager import DBManager
+    from src.database.db_manager import DBManager, SORT_ORDERS
     from src.core.file_manager import FileManager
     from src.ui.preview_panel import PreviewPanel
     from src.ui.project_generator import ProjectGeneratorDialog
@@ -36,6 +35,19 @@ try:
     from src.core.clipboard_manager import ClipboardManager
     from src.ui.smart_paste_dialog import SmartPasteDialog
     from src.ui.clipboard_history_panel import ClipboardHistoryPanel
+    from src.core.copy_engine import format_throughput
+    from src.core.io_scheduler import IOScheduler
+    from src.core.config import ConfigManager
+    from src.core.preview_generator import PreviewGenerator
+    from src.core.thumbnail_service import ThumbnailService
+    from src.ui.lut_compare_dialog import LutCompareDialog
+    from src.core.preview_warmer import PreviewWarmer, format_eta
+    from src.core.image_hash import SimilarityIndex, image_hashes, to_signed
+    from src.core.color_palette import ColorIndex, palette_rows
+    from src.ui.search_controller import SearchController
+    from src.core.batch_operations import BatchOperations
+    from src.ui.batch_runner import BatchRunner
+    from src.ui.folder_tree_model import FolderTreeModel, FOLDER_PATH_ROLE
 
 except ImportError:
     # Handle running directly for testing
@@ -44,14 +56,35 @@ except ImportError:
 
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
     from src.ui.asset_grid import AssetGrid
-    from src.database.db_manager import DBManager
+    from src.database.db_manager import DBManager, SORT_ORDERS
     from src.core.file_manager import FileManager
     from src.ui.preview_panel import PreviewPanel
     from src.ui.project_generator import ProjectGeneratorDialog
     from src.core.resolve_api import ResolveAPI
     from src.core.clipboard_manager import ClipboardManager
     from src.ui.smart_paste_dialog import SmartPasteDialog
-
+    from src.core.copy_engine import format_throughput
+    from src.core.io_scheduler import IOScheduler
+    from src.core.config import ConfigManager
+    from src.core.preview_generator import PreviewGenerator
+    from src.core.thumbnail_service import ThumbnailService
+    from src.ui.lut_compare_dialog import LutCompareDialog
+    from src.core.preview_warmer import PreviewWarmer, format_eta
+    from src.core.image_hash import SimilarityIndex, image_hashes, to_signed
+    from src.core.color_palette import ColorIndex, palette_rows
+    from src.ui.search_controller import SearchController
+    from src.core.batch_operations import BatchOperations
+    from src.ui.batch_runner import BatchRunner
+    from src.ui.folder_tree_model import FolderTreeModel, FOLDER_PATH_ROLE
+
+# Sort selector entries: (label, SORT_ORDERS key)
+SORT_MODES = [
+    ("Name", "name"),
+    ("Date Added", "date"),
+    ("Type", "type"),
+    ("Size", "size"),
+    ("Duration", "duration"),
+]
 
 
 class MainWindow(QMainWindow):
@@ -85,20 +118,66 @@ class MainWindow(QMainWindow):
 
         # Initialize Core Systems
         self.db = DBManager()
-        self.file_manager = FileManager(self.db, storage_dir=self.storage_path)
+        self.config = ConfigManager()
+        self.io_scheduler = IOScheduler(
+            kind_limits=self.config.get("io_kind_limits"),
+            device_limits=self.config.get("io_device_limits"),
+        )
+        self.preview_generator = PreviewGenerator(
+            io_scheduler=self.io_scheduler,
+            max_cache_bytes=self.config.get("preview_cache_max_bytes"),
+            decoder=self.config.get("decoder_backend"),
+        )
+        self.file_manager = FileManager(
+            self.db,
+            storage_dir=self.storage_path,
+            io_scheduler=self.io_scheduler,
+            preview_generator=self.preview_generator,
+        )
+        self.thumbnail_service = ThumbnailService(
+            cache_dir=self.preview_generator.cache_dir,
+            io_scheduler=self.io_scheduler,
+            decoder=self.preview_generator.decoder.name,
+            max_cache_bytes=self.preview_generator.cache.max_bytes,
+            parent=self,
+        )
+        self.thumbnail_service.preview_ready.connect(self.on_preview_ready)
+        self.thumbnail_service.preview_failed.connect(self.on_preview_failed)
+        self.thumbnail_service.preview_retry_scheduled.connect(
+            lambda asset_id, attempts, delay_ms: self.db.set_preview_state(asset_id, 'pending', attempts)
+        )
+        self.thumbnail_service.filmstrip_ready.connect(self.on_filmstrip_ready)
+        self.thumbnail_service.hash_ready.connect(self.on_hash_ready)
+        self.thumbnail_service.palette_ready.connect(self.on_palette_ready)
+        self._similarity_index = None  # Built on the first "Find Similar", dropped when hashes change
+        self._color_index = None       # Same for the color filter and palettes
+        self.sort_mode = self.config.get("sort_mode", "name")
+        if self.sort_mode not in SORT_ORDERS:
+            self.sort_mode = "name"
+        self.search_controller = SearchController(self.db, sort=self.sort_mode, parent=self)
+        self.search_controller.results_ready.connect(self.on_search_results)
+        # Bulk delete / move / favorite / install over grid selections, with undo
+        self.batch_ops = BatchOperations(self.db, self.storage_path, io_scheduler=self.io_scheduler)
+        self.batch_ops.purge_trash()  # Leftovers of the last session can't be undone any more
+        self.batch_runner = BatchRunner(self)  # File work off the GUI thread, DB writes back on it
+        self.batch_runner.progress.connect(self._on_batch_progress)
+        self.batch_runner.finished.connect(self._on_batch_finished)
+        self._batch_progress = None
         self.resolve_api = ResolveAPI()
         self.clipboard_manager = ClipboardManager(db_manager=self.db)
         
         # Track current folder for imports
         self.current_category = None
+        self.showing_favorites = False
 
         # Setup UI
         self.setup_ui()
         self.setup_ui()
         self.sync_database_with_storage() # Auto-sync on startup
         self.load_assets()
-        self._populate_categories()
+        self.folder_model.refresh()
         self.update_favorites_count()
+        self.queue_missing_previews()
 
     def setup_ui(self):
         # Main Layout
@@ -148,6 +227,10 @@ class MainWindow(QMainWindow):
         all_btn = QPushButton("All Assets")
         all_btn.setProperty("filter_type", "all")
         all_btn.clicked.connect(lambda: self.filter_by_category(None))
+        all_btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        all_btn.customContextMenuRequested.connect(
+            lambda pos: self._show_library_menu(all_btn.mapToGlobal(pos))
+        )
         self._style_sidebar_button(all_btn)
         self.sidebar_layout.addWidget(all_btn)
 
@@ -173,30 +256,33 @@ class MainWindow(QMainWindow):
         )
         self.sidebar_layout.addWidget(cat_label)
 
-        # Folder Tree
-        self.folder_tree = QTreeWidget()
+        # Folder Tree (folders load when expanded; refresh() updates it in place)
+        self.folder_model = FolderTreeModel(self.db, self.storage_path, parent=self)
+        self.folder_tree = QTreeView()
+        self.folder_tree.setModel(self.folder_model)
         self.folder_tree.setHeaderHidden(True)
+        self.folder_tree.setUniformRowHeights(True)
         self.folder_tree.setStyleSheet(
             """
-            QTreeWidget {
+            QTreeView {
                 background-color: transparent;
                 border: none;
                 color: #ccc;
             }
-            QTreeWidget::item {
+            QTreeView::item {
                 padding: 4px;
                 border-radius: 4px;
             }
-            QTreeWidget::item:hover {
+            QTreeView::item:hover {
                 background-color: #333;
             }
-            QTreeWidget::item:selected {
+            QTreeView::item:selected {
                 background-color: #404040;
                 color: white;
             }
         """
         )
-        self.folder_tree.itemClicked.connect(self._on_folder_clicked)
+        self.folder_tree.clicked.connect(self._on_folder_clicked)
         # Context Menu for Delete
         self.folder_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.folder_tree.customContextMenuRequested.connect(
@@ -299,6 +385,16 @@ class MainWindow(QMainWindow):
         """)
         self.view_mode_combo.currentIndexChanged.connect(self.change_view_mode)
         top_layout.addWidget(self.view_mode_combo)
+
+        # Sort Order Selector (the DB sorts; see SORT_ORDERS)
+        self.sort_combo = QComboBox()
+        for label, mode in SORT_MODES:
+            self.sort_combo.addItem(label, mode)
+        self.sort_combo.setFixedWidth(120)
+        self.sort_combo.setStyleSheet(self.view_mode_combo.styleSheet())
+        self.sort_combo.setCurrentIndex(max(0, self.sort_combo.findData(self.sort_mode)))
+        self.sort_combo.currentIndexChanged.connect(self.change_sort_mode)
+        top_layout.addWidget(self.sort_combo)
         
         # Spacer
         top_layout.addSpacing(10)
@@ -319,9 +415,30 @@ class MainWindow(QMainWindow):
             }
         """
         )
-        self.search_in.textChanged.connect(self.load_assets)
+        self.search_in.textChanged.connect(self.search_controller.set_query)
         top_layout.addWidget(self.search_in)
 
+        # Color Filter
+        self.color_btn = QPushButton("🎨")
+        self.color_btn.setFixedSize(32, 32)
+        self.color_btn.setToolTip("Filter by color")
+        self._color_btn_style = """
+            QPushButton {
+                background-color: %s;
+                color: #ccc;
+                font-size: 16px;
+                border: 1px solid #333;
+                border-radius: 4px;
+            }
+            QPushButton::menu-indicator { image: none; }
+        """
+        self.color_btn.setStyleSheet(self._color_btn_style % "#2b2b2b")
+        color_menu = QMenu(self.color_btn)
+        color_menu.addAction("Pick Color...", self.pick_filter_color)
+        color_menu.addAction("Clear Color Filter", self.clear_color_filter)
+        self.color_btn.setMenu(color_menu)
+        top_layout.addWidget(self.color_btn)
+
         import_btn = QPushButton("Import Asset ▼")
         import_btn.setStyleSheet(
             """
@@ -381,7 +498,7 @@ class MainWindow(QMainWindow):
         self.splitter.setStyleSheet("QSplitter::handle { background-color: #333; }")
         
         # Asset Grid
-        self.grid = AssetGrid(self)
+        self.grid = AssetGrid(self, icon_cache_bytes=self.config.get("icon_cache_max_bytes"))
         self.splitter.addWidget(self.grid)
 
         # Preview Panel (Info Panel)
@@ -412,17 +529,22 @@ class MainWindow(QMainWindow):
         self.select_all_shortcut.activated.connect(self.grid.selectAll)
 
         # Connect grid selection to preview
-        # Use itemSelectionChanged to handle both selection and deselection (clicking empty space)
-        self.grid.itemSelectionChanged.connect(self.on_selection_changed)
+        # selection_changed fires on both selection and deselection (clicking empty space)
+        self.grid.selection_changed.connect(self.on_selection_changed)
         
-        # Listen for favorite changes from Grid (Context Menu)
-        self.grid.favorite_changed.connect(lambda _: self.update_favorites_count())
-        # Listen for deletions
-        self.grid.item_deleted.connect(lambda: self.update_favorites_count())
+        # Delete / install / move / favorite from the grid's context menu
+        self.grid.batch_requested.connect(self.run_batch_operation)
+        # Serve thumbnails for what is on screen first
+        self.grid.visible_assets_changed.connect(self.thumbnail_service.prioritize)
+        self.grid.filmstrip_requested.connect(self.thumbnail_service.request_filmstrip)
+        self.grid.preview_requested.connect(self.thumbnail_service.request)
+        self.grid.lut_compare_requested.connect(self.open_lut_compare)
+        self.grid.regenerate_previews_requested.connect(lambda ids: self.regenerate_previews(asset_ids=ids))
+        self.grid.find_similar_requested.connect(self.find_similar)
 
     def on_selection_changed(self):
-        items = self.grid.selectedItems()
-        if not items:
+        asset_ids = self.grid.selected_asset_ids(limit=1)
+        if not asset_ids:
             self.preview_panel.hide()
             # Collapse splitter section 1 (Preview) to 0
             sizes = self.splitter.sizes()
@@ -437,7 +559,7 @@ class MainWindow(QMainWindow):
             return
 
         # If has selection, update
-        self.on_asset_clicked(items[0])
+        self.on_asset_clicked(asset_ids[0])
 
     def _get_icon_btn_style(self):
         return """
@@ -472,9 +594,8 @@ class MainWindow(QMainWindow):
         """
         )
 
-    def on_asset_clicked(self, item):
+    def on_asset_clicked(self, asset_id):
         # Update preview panel
-        asset_id = item.data(Qt.ItemDataRole.UserRole + 1)
         asset_data = self.db.get_asset_by_id(asset_id)
         if asset_data:
             if not self.preview_panel.isVisible():
@@ -494,36 +615,245 @@ class MainWindow(QMainWindow):
     def on_favorite_toggled(self, asset_id):
         new_state = self.db.toggle_favorite(asset_id)
         # Update UI in Grid
-        # Find item in grid
-        for index in range(self.grid.count()):
-            item = self.grid.item(index)
-            if item.data(Qt.ItemDataRole.UserRole + 1) == asset_id:
-                # Update item display
-                name = item.text()
-                if new_state:
-                    if not name.startswith("⭐ "):
-                        item.setText("⭐ " + name)
-                else:
-                    if name.startswith("⭐ "):
-                        item.setText(name.replace("⭐ ", ""))
-                
-                item.setData(Qt.ItemDataRole.UserRole + 2, new_state)
-                break
-        
-        # If in Favorites view, refresh
-        fav_btn = self.sidebar_container.findChild(QPushButton, "Favorites")
-        if fav_btn and fav_btn.isChecked():
-                self.filter_by_favorites()
-        
+        self._favorites_changed([asset_id], new_state)
+
+    def _favorites_changed(self, asset_ids, is_favorite):
+        for asset_id in asset_ids:
+            self.grid.set_asset_favorite(asset_id, is_favorite)
+        if self.showing_favorites:
+            # Unstarred assets just leave the grid; nothing is reloaded
+            if is_favorite:
+                self.refresh_view()
+            else:
+                self.grid.remove_assets(asset_ids)
+
         # Update Favorites count
         self.update_favorites_count()
 
+    def run_batch_operation(self, operation, asset_ids):
+        """Starts a batch from the grid ('delete', 'install', 'move', 'favorite', 'unfavorite') in the background."""
+        if self.batch_runner.busy():
+            self.status_label.setText("Another batch is still running.")
+            return
+        if operation in ("favorite", "unfavorite"):
+            # One UPDATE, no files: nothing to wait for
+            entry = self.batch_ops.set_favorite(asset_ids, 1 if operation == "favorite" else 0)
+            if entry:
+                self.search_controller.invalidate()
+                self._favorites_changed(entry.records["ids"], entry.records["is_favorite"])
+                self.status_label.setText(f"{entry.label}. Ctrl+Z to undo.")
+            return
+
+        if operation == "move":
+            from PyQt6.QtWidgets import QInputDialog
+            folders = ["/"] + self.db.get_all_categories()
+            folder, ok = QInputDialog.getItem(
+                self, "Move to Folder", f"Move {len(asset_ids)} asset(s) to:", folders, 0, True
+            )
+            if not ok:
+                return
+            task = self.batch_ops.move_task(asset_ids, folder.strip().strip("/") or None)
+        elif operation == "delete":
+            task = self.batch_ops.delete_task(asset_ids)
+        else:
+            task = self.batch_ops.install_task(asset_ids)
+
+        labels = {"delete": "Deleting", "install": "Installing", "move": "Moving"}
+        self._start_batch(task, f"{labels[operation]} {len(asset_ids)} asset(s)...")
+
+    def _start_batch(self, task, label):
+        from PyQt6.QtWidgets import QProgressDialog
+        # Not modal: the window stays usable while the files are worked on
+        progress = QProgressDialog(label, "Cancel", 0, max(1, task.total), self)
+        progress.setMinimumDuration(500)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(self.batch_runner.cancel)
+        self._batch_progress = progress
+        self.status_label.setText(label)
+        self.batch_runner.start(task)
+
+    def _on_batch_progress(self, done, total):
+        if self._batch_progress is not None:
+            self._batch_progress.setMaximum(max(1, total))
+            self._batch_progress.setValue(done)
+
+    def _on_batch_finished(self, task, result):
+        if self._batch_progress is not None:
+            self._batch_progress.canceled.disconnect(self.batch_runner.cancel)
+            self._batch_progress.close()
+            self._batch_progress.deleteLater()
+            self._batch_progress = None
+        if task.operation == "install":
+            self._install_finished(*(result or ([], [])))
+        elif task.operation == "undo":
+            self._undo_finished(result)
+        else:
+            self._batch_finished(result)
+
+    def _install_finished(self, installed, failed):
+        self.status_label.setText(f"Installed {len(installed)} asset(s).")
+        if failed:
+            details = "\n".join(f"{row['file_name']}: {message}" for row, message in failed[:10])
+            more = f"\n... and {len(failed) - 10} more" if len(failed) > 10 else ""
+            QMessageBox.warning(
+                self, "Install Failed", f"Installed {len(installed)}, failed {len(failed)}:\n{details}{more}"
+            )
+        elif installed:
+            QMessageBox.information(
+                self,
+                "Install Success",
+                f"Installed {len(installed)} asset(s).\n\nPlease restart DaVinci Resolve or switch pages to see them.",
+            )
+
+    def _batch_finished(self, entry):
+        if entry is None:
+            self.status_label.setText("Nothing was changed.")
+            return
+        # Cached search results still hold the old rows: the next query must hit the DB
+        self.search_controller.invalidate()
+        if entry.operation == "delete":
+            self.grid.remove_assets([row["id"] for row in entry.records["rows"]])
+            self.update_favorites_count()
+        else:
+            self.refresh_view()
+            self.folder_model.refresh()
+        self.status_label.setText(f"{entry.label}. Ctrl+Z to undo.")
+
+    def undo_last_batch(self):
+        if self.batch_runner.busy():
+            self.status_label.setText("Another batch is still running.")
+            return
+        task = self.batch_ops.undo_task()
+        if task is None:
+            self.status_label.setText("Nothing to undo.")
+            return
+        if task.total:
+            self._start_batch(task, "Undoing...")
+        else:
+            self._undo_finished(task.finish())  # Favorites: nothing to wait for
+
+    def _undo_finished(self, entry):
+        if entry is None:
+            return
+        self.search_controller.invalidate()
+        if entry.operation == "favorite":
+            self._favorites_changed(entry.records["ids"], 0 if entry.records["is_favorite"] else 1)
+        else:
+            self.refresh_view()
+            self.update_favorites_count()
+            if entry.operation == "move":
+                self.folder_model.refresh()
+            else:
+                self.queue_missing_previews()  # Restored assets lost their palettes
+        self.status_label.setText(f"Undone: {entry.label}.")
+
+    def queue_missing_previews(self):
+        """Hands every asset without a preview (or its hash / palette) to the thumbnail service."""
+        self.reclaim_evicted_previews()
+        for asset in self.db.get_assets_without_preview():
+            self.thumbnail_service.request(asset["id"], asset["file_path"], asset["file_type"])
+        for asset in self.db.get_assets_without_hash():
+            self.thumbnail_service.request_hash(asset["id"], asset["preview_path"], asset["file_type"])
+        for asset in self.db.get_assets_without_palette():
+            self.thumbnail_service.request_palette(asset["id"], asset["preview_path"], asset["file_type"])
+        self.thumbnail_service.prioritize(self.grid.visible_asset_ids())
+
+    def reclaim_evicted_previews(self):
+        """Marks assets whose cache files the preview cache evicted, so they are rendered again when shown."""
+        paths = self.preview_generator.cache.take_evicted()
+        if paths:
+            preview_ids, filmstrip_ids = self.db.forget_cache_files(paths)
+            self.grid.reset_evicted(preview_ids, filmstrip_ids)
+
+    def on_preview_ready(self, asset_id, preview_path):
+        self.reclaim_evicted_previews()  # Storing this render may have pushed others out
+        self.db.update_asset_preview(asset_id, preview_path)
+        self.grid.set_asset_preview(asset_id, preview_path)
+        asset = self.db.get_asset_by_id(asset_id)
+        if asset and asset["file_type"] in ("image", "video"):
+            if asset["phash"] is None:
+                self.thumbnail_service.request_hash(asset_id, preview_path, asset["file_type"])
+            if not self.db.get_asset_palette(asset_id):
+                self.thumbnail_service.request_palette(asset_id, preview_path, asset["file_type"])
+
+    def on_hash_ready(self, asset_id, hashes):
+        self.db.update_asset_hashes(asset_id, to_signed(hashes[0]), to_signed(hashes[1]))
+        self._similarity_index = None
+
+    def on_palette_ready(self, asset_id, palette):
+        self.db.set_asset_palette(asset_id, palette_rows(palette))
+        self._color_index = None
+
+    def pick_filter_color(self):
+        from PyQt6.QtWidgets import QColorDialog
+
+        color = QColorDialog.getColor(parent=self, title="Filter by Color")
+        if color.isValid():
+            self.filter_by_color((color.red(), color.green(), color.blue()))
+
+    def clear_color_filter(self):
+        self.color_btn.setStyleSheet(self._color_btn_style % "#2b2b2b")
+        self.load_assets(self.search_in.text())
+
+    def filter_by_color(self, rgb):
+        """Shows images and videos with the color in their palette, closest (and most dominant) first."""
+        self.color_btn.setStyleSheet(self._color_btn_style % ("rgb(%d, %d, %d)" % rgb))
+        if self._color_index is None:
+            self._color_index = ColorIndex(self.db.get_palette_rows())
+        matches = self._color_index.search(rgb)
+
+        self.showing_favorites = False
+        self.grid.set_assets(self._assets_in_order(match_id for match_id, _ in matches))
+        self.status_label.setText(f"{len(matches)} assets matching color #{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}.")
+
+    def find_similar(self, asset_id):
+        """Shows assets whose preview looks like this asset's (resized copies, re-encodes, near duplicates)."""
+        asset = self.db.get_asset_by_id(asset_id)
+        if not asset:
+            return
+        if asset["phash"] is None:
+            # Not hashed yet (still queued): hash the small preview right here
+            hashes = image_hashes(asset.get("preview_path"))
+            if hashes is None:
+                self.status_label.setText(f"No preview to compare for {asset['file_name']}.")
+                return
+            asset["dhash"], asset["phash"] = to_signed(hashes[0]), to_signed(hashes[1])
+            self.db.update_asset_hashes(asset_id, asset["dhash"], asset["phash"])
+            self._similarity_index = None
+
+        if self._similarity_index is None:
+            self._similarity_index = SimilarityIndex(self.db.get_asset_hashes())
+        matches = self._similarity_index.search(asset["dhash"], asset["phash"])
+
+        self.showing_favorites = False
+        self.grid.set_assets(self._assets_in_order(match_id for match_id, _ in matches))
+        self.status_label.setText(f"{max(0, len(matches) - 1)} assets similar to {asset['file_name']}.")
+
+    def _assets_in_order(self, asset_ids):
+        """The rows for asset_ids in one batched query, in the order given (missing ids skipped)."""
+        asset_ids = list(asset_ids)
+        rows = {row["id"]: row for row in self.db.get_assets_by_ids(asset_ids)}
+        return [rows[asset_id] for asset_id in asset_ids if asset_id in rows]
+
+    def on_preview_failed(self, asset_id, reason):
+        print(f"Preview failed for asset {asset_id}: {reason}")
+        self.db.set_preview_state(asset_id, 'failed', self.thumbnail_service.max_attempts)
+        self.grid.set_asset_preview_state(asset_id, 'failed')
+
+    def open_lut_compare(self, lut_paths, image_path):
+        dialog = LutCompareDialog(self.preview_generator.lut_engine, lut_paths, image_path or None, self)
+        dialog.exec()
+
+    def on_filmstrip_ready(self, asset_id, filmstrip_path):
+        self.reclaim_evicted_previews()
+        self.db.update_asset_filmstrip(asset_id, filmstrip_path)
+        self.grid.set_asset_filmstrip(asset_id, filmstrip_path)
+
     def update_favorites_count(self):
         """Update the Favorites button label with current count."""
         try:
-             # Count manually or add a DB method. 
-             favorites = [a for a in self.db.get_all_assets() if a.get("is_favorite")]
-             count = len(favorites)
+             count = self.db.count_favorites()
              self.fav_btn.setText(f"⭐ Favorites ({count})")
         except Exception as e:
              print(f"Error updating fav count: {e}")
@@ -532,8 +862,17 @@ class MainWindow(QMainWindow):
         visible = self.sidebar_container.isVisible()
         self.sidebar_container.setVisible(not visible)
 
+    def refresh_view(self):
+        """Re-reads the current listing (favorites, search or folder) and applies it as a diff."""
+        if self.showing_favorites:
+            self.filter_by_favorites()
+        elif self.search_in.text():
+            self.load_assets(self.search_in.text())
+        else:
+            self.filter_by_category(self.current_category)
+
     def reload_library(self):
-        self._populate_categories()
+        self.folder_model.refresh()
         self.load_assets(self.search_in.text())
 
     def change_view_mode(self, index):
@@ -541,93 +880,114 @@ class MainWindow(QMainWindow):
         if 0 <= index < len(modes):
             self.grid.set_view_mode(modes[index])
 
-    def _populate_categories(self):
-        # Clear existing
-        self.folder_tree.clear()
-
-        # Load all unique folder paths from DB
-        db_categories = set(self.db.get_all_categories())
-
-        # Also scan physical storage for empty folders
-        storage_path = self.storage_path
-        physical_categories = set()
-        if os.path.exists(storage_path):
-            for root, dirs, files in os.walk(storage_path):
-                rel_path = os.path.relpath(root, storage_path)
-                if rel_path == ".":
-                    continue
-                # Exclude clipboard_history from the main folder tree
-                if "clipboard_history" in rel_path:
-                    continue
-                    
-                rel_path = rel_path.replace("\\", "/")
-                physical_categories.add(rel_path)
-
-        # Merge both sources
-        categories = sorted(list(db_categories.union(physical_categories)))
-        # Filter out clipboard_history if it came from DB
-        categories = [c for c in categories if "clipboard_history" not in c]
-
-        # Get DB counts
-
-        # Get DB counts
-        counts = self.db.get_category_counts()
-
-        # Build tree structure
-        tree_dict = {}
-        for path in categories:
-            parts = path.split("/")
-            current = tree_dict
-            for part in parts:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
-
-        # Helper to get recursive count if needed, or just specific category count
-        # For now, simplistic approach: match path to DB category count
-
-        # Recursively add to tree widget
-        def add_items(parent, d, path_so_far=""):
-            for name, children in sorted(d.items()):
-                full_path = f"{path_so_far}/{name}" if path_so_far else name
-
-                # Get count
-                count = counts.get(full_path, 0)
-                display_text = f"{name} ({count})" if count > 0 else name
-
-                item = QTreeWidgetItem([display_text])
-                item.setData(0, Qt.ItemDataRole.UserRole, full_path)
-
-                if parent is None:
-                    self.folder_tree.addTopLevelItem(item)
-                else:
-                    parent.addChild(item)
+    def change_sort_mode(self, index):
+        mode = self.sort_combo.itemData(index)
+        if not mode or mode == self.sort_mode:
+            return
+        self.sort_mode = mode
+        self.config.set("sort_mode", mode)
+        self.search_controller.set_sort(mode)
+        if mode == "duration":
+            self._fill_missing_durations()
+        # Same rows, new order: reordered in place, the selection stays
+        self.grid.sort_assets(self.db.get_sorted_ids(self.grid.asset_ids(), mode))
+
+    def _fill_missing_durations(self):
+        """Assets imported before durations were stored get probed once, on the first duration sort."""
+        missing = len(self.db.get_assets_without_duration())
+        if not missing:
+            return
+        from PyQt6.QtWidgets import QProgressDialog
+        progress = QProgressDialog("Reading durations...", "Cancel", 0, missing, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(500)
 
-                if children:
-                    add_items(item, children, full_path)
+        def update_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            QApplication.processEvents()
 
-        add_items(None, tree_dict)
-        self.folder_tree.expandAll()
+        self.file_manager.fill_missing_durations(progress_callback=update_progress, should_stop=progress.wasCanceled)
+        progress.setValue(progress.maximum())
 
-    def _on_folder_clicked(self, item, column):
+    def _on_folder_clicked(self, index):
         # Get the full path stored in item data
-        folder_path = item.data(0, Qt.ItemDataRole.UserRole)
+        folder_path = index.data(FOLDER_PATH_ROLE)
         self.filter_by_category(folder_path)
 
     def show_folder_context_menu(self, position):
-        item = self.folder_tree.itemAt(position)
-        if not item:
+        index = self.folder_tree.indexAt(position)
+        if not index.isValid():
             return
+        folder_path = index.data(FOLDER_PATH_ROLE)
 
         menu = QMenu()
+        regenerate_action = menu.addAction("Regenerate Previews...")
+        menu.addSeparator()
         delete_action = menu.addAction("Delete Folder")
         action = menu.exec(self.folder_tree.mapToGlobal(position))
 
         if action == delete_action:
-            self.delete_folder(item)
+            self.delete_folder(folder_path)
+        elif action == regenerate_action:
+            self.regenerate_previews(category=folder_path)
+
+    def _show_library_menu(self, global_pos):
+        menu = QMenu()
+        regenerate_action = menu.addAction("Regenerate All Previews...")
+        if menu.exec(global_pos) == regenerate_action:
+            self.regenerate_previews()
+
+    def regenerate_previews(self, asset_ids=None, category=None):
+        """Bulk (re)generates previews for a selection, a folder subtree or the whole library."""
+        warmer = PreviewWarmer(self.db, self.preview_generator)
+        assets = warmer.collect(asset_ids=asset_ids, category=category)
+        if not assets:
+            QMessageBox.information(self, "Regenerate Previews", "Nothing to regenerate here.")
+            return
+
+        answer = QMessageBox.question(
+            self,
+            "Regenerate Previews",
+            f"{len(assets)} asset(s) selected.\n\n"
+            "Yes: re-render every preview.\nNo: only missing or outdated previews.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
+            QMessageBox.StandardButton.No,
+        )
+        if answer == QMessageBox.StandardButton.Cancel:
+            return
+        force = answer == QMessageBox.StandardButton.Yes
+
+        from PyQt6.QtWidgets import QProgressDialog
+        progress = QProgressDialog("Checking previews...", "Cancel", 0, len(assets), self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.show()
+
+        def update_progress(done, total, eta):
+            progress.setMaximum(max(1, total))
+            progress.setValue(done)
+            progress.setLabelText(f"Rendering previews {done}/{total}\nETA {format_eta(eta)}")
+            QApplication.processEvents()
+
+        summary = warmer.run(assets, force=force, progress_callback=update_progress,
+                             should_stop=progress.wasCanceled)
+        progress.close()
+
+        # Forced re-renders overwrite the same files: the grid must drop the icons it made from them
+        for asset_id, preview_path in summary['previews'].items():
+            self.grid.set_asset_preview(asset_id, preview_path)
+        # Previews are content-keyed, so re-rendered files may have new paths (and need new hashes)
+        self.load_assets(self.search_in.text())
+        self.queue_missing_previews()
+        QMessageBox.information(
+            self,
+            "Regenerate Previews",
+            f"{summary['rendered']} rendered, {summary['skipped']} already up to date, "
+            f"{summary['failed']} failed in {summary['seconds']:.1f}s."
+            + ("\n(Cancelled)" if summary['cancelled'] else ""),
+        )
 
-    def delete_folder(self, item):
-        folder_path = item.data(0, Qt.ItemDataRole.UserRole)
+    def delete_folder(self, folder_path):
         confirm = QMessageBox.question(
             self,
             "Delete Folder",
@@ -670,29 +1030,20 @@ class MainWindow(QMainWindow):
 
     def filter_by_category(self, category_name):
         self.current_category = category_name # Track selection
-        self.grid.clear()
+        self.showing_favorites = False
         if category_name:
-            # Filter by prefix match (so clicking parent folder shows all children)
-            assets = [
-                a
-                for a in self.db.get_all_assets()
-                if (a.get("category_name") or "").startswith(category_name)
-            ]
+            # The folder and all of its subfolders, so clicking a parent shows the children too
+            assets = self.db.get_assets_in_category_tree(category_name, self.sort_mode)
         else:
-            assets = self.db.get_all_assets()
-        
-        # Sort assets by name
-        assets.sort(key=lambda x: x.get("file_name", "").lower())
+            assets = self.db.get_all_assets(self.sort_mode)
 
-        for asset in assets:
-            self.grid.add_asset_item(asset)
+        self.grid.apply_assets(assets)
         self.status_label.setText(f"{len(assets)} assets loaded.")
 
     def filter_by_favorites(self):
-        self.grid.clear()
-        assets = [a for a in self.db.get_all_assets() if a.get("is_favorite")]
-        for asset in assets:
-            self.grid.add_asset_item(asset)
+        assets = self.db.get_favorite_assets(self.sort_mode)
+        self.showing_favorites = True
+        self.grid.apply_assets(assets)
         self.status_label.setText(f"{len(assets)} favorites loaded.")
 
     def create_new_folder(self):
@@ -711,22 +1062,25 @@ class MainWindow(QMainWindow):
                     "Success",
                     f"Folder '{folder_name}' created.\n(Note: Empty folders might not appear until you add files)",
                 )
-                self._populate_categories()
+                self.folder_model.refresh()
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not create folder: {str(e)}")
 
     def load_assets(self, query=None):
-        self.grid.clear()
+        self.search_controller.invalidate()
+        self.showing_favorites = False
         if query:
-            assets = self.db.search_assets(query)
+            assets = self.db.search_assets(query, sort=self.sort_mode)
         else:
-            assets = self.db.get_all_assets()
-            
-        # Sort assets by name
-        assets.sort(key=lambda x: x.get("file_name", "").lower())
+            assets = self.db.get_all_assets(self.sort_mode)
 
-        for asset in assets:
-            self.grid.add_asset_item(asset)
+        # Only what changed is touched: after an import just the new rows are inserted
+        self.grid.apply_assets(assets)
+        self.status_label.setText(f"{len(assets)} assets loaded.")
+
+    def on_search_results(self, query, assets):
+        self.showing_favorites = False
+        self.grid.apply_assets(assets)
         self.status_label.setText(f"{len(assets)} assets loaded.")
 
     def import_assets(self):
@@ -734,7 +1088,7 @@ class MainWindow(QMainWindow):
             self,
             "Import Assets",
             "",
-            "All Files (*.*);;Videos (*.mp4 *.mov *.avi);;Images (*.png *.jpg);;DaVinci Files (*.drfx *.setting *.cube)",
+            "All Files (*.*);;Videos (*.mp4 *.mov *.avi);;Images (*.png *.jpg *.jpeg *.tif *.tiff *.bmp *.dpx);;DaVinci Files (*.drfx *.setting *.cube)",
         )
         if files:
             # Show progress for bulk file import
@@ -743,17 +1097,30 @@ class MainWindow(QMainWindow):
             progress.setWindowModality(Qt.WindowModality.WindowModal)
             progress.show()
             
-            count = 0
-            for i, file_path in enumerate(files):
-                if progress.wasCanceled():
-                    break
-                
-                if self.file_manager.import_file(file_path, category_path=self.current_category):
-                    count += 1
-                progress.setValue(i + 1)
+            def update_progress(current, total):
+                progress.setValue(current)
+                QApplication.processEvents()
+
+            def update_copy_progress(done, total, rate):
+                percent = int(done * 100 / total) if total else 100
+                progress.setLabelText(
+                    f"Importing {progress.value()}/{len(files)}...\n{percent}% - {format_throughput(rate)}"
+                )
+                QApplication.processEvents()
+
+            # Files are copied in parallel, limited per source/destination device
+            count = self.file_manager.import_files(
+                files,
+                category_path=self.current_category,
+                progress_callback=update_progress,
+                copy_progress_callback=update_copy_progress,
+                should_stop=progress.wasCanceled,
+            )
+            progress.setValue(len(files))
 
             self.load_assets()
-            self._populate_categories()
+            self.folder_model.refresh()
+            self.queue_missing_previews()
             QMessageBox.information(
                 self, "Import Complete", f"Successfully imported {count} assets."
             )
@@ -796,8 +1163,13 @@ class MainWindow(QMainWindow):
             progress.setValue(current)
             progress.setLabelText(f"Importing {current}/{total}...")
             QApplication.processEvents() # Keep UI alive
-            if progress.wasCanceled():
-                return
+
+        def update_copy_progress(done, total, rate):
+            percent = int(done * 100 / total) if total else 100
+            progress.setLabelText(
+                f"Importing {progress.value()}/{progress.maximum()}...\n{percent}% - {format_throughput(rate)}"
+            )
+            QApplication.processEvents()
         
         # Determine target category (create a container folder for the import)
         folder_name = os.path.basename(folder_path)
@@ -810,13 +1182,16 @@ class MainWindow(QMainWindow):
         count = self.file_manager.scan_directory(
             folder_path, 
             base_category=target_category,
-            progress_callback=update_progress
+            progress_callback=update_progress,
+            copy_progress_callback=update_copy_progress,
+            should_stop=progress.wasCanceled
         )
         
         progress.setValue(progress.maximum())
         
         self.load_assets()
-        self._populate_categories()
+        self.folder_model.refresh()
+        self.queue_missing_previews()
         
         QMessageBox.information(
             self, "Import Complete", f"Successfully imported {count} assets from folder."
@@ -845,10 +1220,29 @@ class MainWindow(QMainWindow):
         # Project folder created successfully
         pass
 
+    def closeEvent(self, event):
+        stats = self.preview_generator.cache.get_stats()
+        print(
+            f"Preview cache: {stats['entries']} entries, {stats['bytes'] / (1024 * 1024):.1f} MB, "
+            f"hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits / {stats['misses']} misses), "
+            f"{stats['evictions']} evictions"
+        )
+        self.preview_generator.cache.close()
+        self.thumbnail_service.shutdown()
+        self.search_controller.shutdown()
+        self.clipboard_panel.shutdown()
+        self.grid.icon_loader.shutdown()
+        self.grid.thumbnail_store.close()
+        self.batch_runner.shutdown()  # Before the trash goes: a delete still running must land in it
+        self.batch_ops.purge_trash()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         """Handle global shortcuts like Ctrl+V"""
         if event.key() == Qt.Key.Key_V and (event.modifiers() & Qt.KeyboardModifier.ControlModifier):
             self.handle_clipboard_paste()
+        elif event.key() == Qt.Key.Key_Z and (event.modifiers() & Qt.KeyboardModifier.ControlModifier):
+            self.undo_last_batch()
         else:
             super().keyPressEvent(event)
     
@@ -3,9 +3,17 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
 from PyQt6.QtGui import QIcon, QFont
 import os
-import subprocess
 import json
 
+try:
+    from src.ui.waveform_widget import WaveformWidget
+    from src.core.media_probe import probe
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.ui.waveform_widget import WaveformWidget
+    from src.core.media_probe import probe
+
 class PreviewPanel(QWidget):
     favorite_toggled = pyqtSignal(int) # Emits asset_id
 
@@ -70,6 +78,19 @@ class PreviewPanel(QWidget):
         line.setStyleSheet("background-color: #333;")
         layout.addWidget(line)
 
+        # Waveform with playhead (audio assets with peak data)
+        self.waveform = WaveformWidget()
+        self.waveform.position_changed.connect(
+            lambda seconds: self.position_label.setText(self._format_seconds(seconds))
+        )
+        self.position_label = QLabel("")
+        self.position_label.setStyleSheet("color: #888; font-size: 11px;")
+        self.position_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+        layout.addWidget(self.waveform)
+        layout.addWidget(self.position_label)
+        self.waveform.hide()
+        self.position_label.hide()
+
         # 2. Info Grid (Table-like look)
         self.info_layout = QVBoxLayout()
         self.info_layout.setSpacing(8)
@@ -77,6 +98,7 @@ class PreviewPanel(QWidget):
         self.type_label = self._create_info_row("Type", "-")
         self.size_label = self._create_info_row("Size", "-")
         self.len_label = self._create_info_row("Duration", "-")
+        self.res_label = self._create_info_row("Resolution", "-")
         self.date_label = self._create_info_row("Added", "-")
         
         layout.addLayout(self.info_layout)
@@ -107,8 +129,11 @@ class PreviewPanel(QWidget):
             self.name_label.setText("No Selection")
             self.type_label.setText("-")
             self.size_label.setText("-")
+            self.len_label.setText("-")
+            self.res_label.setText("-")
             self.date_label.setText("-")
             self._set_star_state(False)
+            self._show_waveform(None)
             return
 
         file_path = asset_data.get('file_path')
@@ -131,45 +156,53 @@ class PreviewPanel(QWidget):
         else:
             self.size_label.setText("File Missing")
 
-        # 5. Length (Duration)
-        if asset_data.get('file_type') in ['video', 'audio'] and file_path and os.path.exists(file_path):
-            duration = self._get_duration(file_path)
-            self.len_label.setText(duration)
+        # 5. Waveform + Length (Duration)
+        has_peaks = False
+        if asset_data.get('file_type') == 'audio':
+            has_peaks = self._show_waveform(asset_data.get('preview_path'))
+        else:
+            self._show_waveform(None)
+
+        # Header parse (no ffprobe process) for the common containers
+        info = None
+        if asset_data.get('file_type') in ['video', 'audio', 'image'] and file_path and os.path.exists(file_path):
+            info = probe(file_path)
+
+        if has_peaks:
+            # Stored with the peaks: no probing needed
+            self.len_label.setText(self._format_seconds(self.waveform.duration))
+        elif info and info['duration']:
+            self.len_label.setText(self._format_seconds(info['duration']))
         else:
             self.len_label.setText("-")
 
+        if info and info['width'] and info['height']:
+            self.res_label.setText(f"{info['width']} x {info['height']}")
+        elif info and info['sample_rate']:
+            channels = {1: " mono", 2: " stereo"}.get(info['channels'], f" {info['channels']} ch" if info['channels'] else "")
+            self.res_label.setText(f"{info['sample_rate'] / 1000:g} kHz{channels}")
+        else:
+            self.res_label.setText("-")
+
         # 6. Date
         date_str = asset_data.get('date_added', '')
         # SQLite often stores as string, simplistic display
         self.date_label.setText(str(date_str).split('.')[0]) 
     
-    def _get_duration(self, file_path):
-        """Get media duration using ffprobe."""
-        try:
-            cmd = [
-                'ffprobe', 
-                '-v', 'error', 
-                '-show_entries', 'format=duration', 
-                '-of', 'default=noprint_wrappers=1:nokey=1', 
-                file_path
-            ]
-            # On Windows, prevent cmd window from popping up
-            startupinfo = None
-            if os.name == 'nt':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, startupinfo=startupinfo)
-            if result.returncode == 0:
-                seconds = float(result.stdout.strip())
-                m, s = divmod(seconds, 60)
-                h, m = divmod(m, 60)
-                if h > 0:
-                     return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
-                return f"{int(m):02d}:{int(s):02d}"
-        except Exception:
-            pass
-        return "-" 
+    def _show_waveform(self, preview_path):
+        shown = bool(preview_path) and preview_path.endswith('.peaks') and \
+            self.waveform.set_peaks_file(preview_path)
+        self.waveform.setVisible(shown)
+        self.position_label.setVisible(shown)
+        self.position_label.setText(self._format_seconds(0))
+        return shown
+
+    def _format_seconds(self, seconds):
+        m, s = divmod(seconds, 60)
+        h, m = divmod(m, 60)
+        if h > 0:
+            return f"{int(h):02d}:{int(m):02d}:{int(s):02d}"
+        return f"{int(m):02d}:{int(s):02d}"
 
     def _set_star_state(self, is_favorite):
         if is_favorite:
@@ -0,0 +1,103 @@
+import sqlite3
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+SEARCH_DEBOUNCE_MS = 150  # Typing pause before a query runs
+
+# SQLite's LIKE folds ASCII letters only; in-memory refinement has to match it exactly
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def fold(text):
+    return text.translate(_ASCII_LOWER)
+
+
+class _SearchJob(QRunnable):
+    def __init__(self, controller, generation, query, sort):
+        super().__init__()
+        self.controller = controller
+        self.generation = generation
+        self.query = query
+        self.sort = sort
+
+    def run(self):
+        controller = self.controller
+        if self.generation != controller._generation:
+            return  # Superseded while waiting
+        try:
+            assets = controller.db.search_assets(self.query, controller._conn, self.sort)
+        except sqlite3.OperationalError as e:
+            if "interrupt" not in str(e):
+                print(f"Search '{self.query}' failed: {e}")
+            return
+        controller._done.emit(self.generation, self.query, assets)
+
+
+class SearchController(QObject):
+    """
+    Search-as-you-type for the asset grid. Keystrokes are debounced; a query
+    that only adds to the last one (its results are a subset) is filtered in
+    memory, anything else runs on a worker thread with its own connection, and
+    a newer query interrupts it. results_ready only ever carries the latest.
+    """
+    results_ready = pyqtSignal(str, object)  # query, list of assets in sort order
+    _done = pyqtSignal(int, str, object)
+
+    def __init__(self, db, sort='name', delay_ms=SEARCH_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.sort = sort  # A SORT_ORDERS key; SQL returns results in this order
+        self._conn = db.reader_connection()
+        self._generation = 0
+        self._query = ""
+        self._last_query = None  # Query whose complete results are in _last_results
+        self._last_results = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)  # One connection, used by one job at a time
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._run)
+        self._done.connect(self._on_done)
+
+    def set_query(self, text):
+        """Called on every keystroke; the query runs once typing pauses."""
+        self._query = text
+        self._generation += 1  # Anything still running is stale from now on
+        self._conn.interrupt()
+        self._timer.start()
+
+    def set_sort(self, sort):
+        """Later results come in this order (refinement keeps the order it filters)."""
+        self.sort = sort
+        self.invalidate()
+
+    def invalidate(self):
+        """The library changed: the next query can't be refined from old results."""
+        self._last_query = None
+        self._last_results = None
+
+    def _run(self):
+        query = self._query
+        self._generation += 1
+        if self._last_query is not None and fold(self._last_query) in fold(query):
+            needle = fold(query)
+            results = [a for a in self._last_results if needle in fold(a["file_name"])]
+            self._on_done(self._generation, query, results)
+            return
+        self._pool.start(_SearchJob(self, self._generation, query, self.sort))
+
+    def _on_done(self, generation, query, assets):
+        if generation != self._generation:
+            return
+        self._last_query = query
+        self._last_results = assets
+        self.results_ready.emit(query, assets)
+
+    def shutdown(self):
+        self._timer.stop()
+        self._generation += 1
+        self._conn.interrupt()
+        self._pool.clear()
+        self._pool.waitForDone()
+        self._conn.close()
@@ -0,0 +1,84 @@
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, pyqtSignal, QSize
+from PyQt6.QtGui import QPainter, QColor, QPen
+import os
+
+try:
+    from src.core.waveform import WaveformPeaks
+    from src.core.thumbnail_store import waveform_image
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+    from src.core.waveform import WaveformPeaks
+    from src.core.thumbnail_store import waveform_image
+
+
+class WaveformWidget(QWidget):
+    """
+    Draws an audio asset's stored peaks at the widget's size with a playhead.
+    Click or drag to move the playhead. Nothing is decoded; resizing only re-rasterizes peaks.
+    """
+    position_changed = pyqtSignal(float)  # Playhead position in seconds
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.peaks = None
+        self.position = 0.0
+        self._image = None
+        self.setMinimumHeight(60)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setCursor(Qt.CursorShape.IBeamCursor)
+
+    def sizeHint(self):
+        return QSize(270, 90)
+
+    def set_peaks_file(self, peaks_path):
+        """Loads a .peaks file; returns False if it can't be read."""
+        self.peaks = WaveformPeaks.load(peaks_path) if peaks_path else None
+        self.position = 0.0
+        self._image = None
+        self.update()
+        return self.peaks is not None
+
+    @property
+    def duration(self):
+        return self.peaks.duration if self.peaks else 0.0
+
+    def set_position(self, seconds):
+        self.position = min(max(0.0, seconds), self.duration)
+        self.update()
+
+    def _seek_to_x(self, x):
+        if not self.peaks or self.width() <= 0:
+            return
+        self.set_position(x / self.width() * self.duration)
+        self.position_changed.emit(self.position)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._seek_to_x(event.position().x())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self._seek_to_x(event.position().x())
+
+    def resizeEvent(self, event):
+        self._image = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        if not self.peaks:
+            painter.setPen(QColor("#666"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No waveform")
+            return
+
+        if self._image is None or self._image.size() != self.size():
+            self._image = waveform_image(self.peaks, self.width(), self.height())
+        painter.drawImage(0, 0, self._image)
+
+        if self.duration > 0:
+            x = int(self.position / self.duration * (self.width() - 1))
+            painter.setPen(QPen(QColor("#ffffff"), 1))
+            painter.drawLine(x, 0, x, self.height())